@@ -2,7 +2,14 @@ import streamlit as st
 from urllib.parse import quote, unquote
 
 # Pages
-from sections import intro, overview, deep_dives, conclusions, profiling
+from sections import intro, overview, deep_dives, conclusions, profiling, performance
+from utils import telemetry, warmup
+from utils.prefetch import start_background_prefetch
+
+# Remote assets (IVAC_DATA_URL / IVAC_GEOJSON_URL) download concurrently once per process
+start_background_prefetch()
+# Dataset-level caches are filled in the background before the first page needs them
+warmup.start_warmup()
 
 #pag
 st.set_page_config(
@@ -22,8 +29,11 @@ PAGES = {
     "Overview & Analysis": overview,
     "Deep Dives": deep_dives,
     "Conclusions": conclusions,
+    "Performance": performance,
 }
-LABELS = list(PAGES.keys())
+# Reachable only through ?page=... (not listed in the menu)
+HIDDEN_PAGES = {"Performance"}
+LABELS = [name for name in PAGES if name not in HIDDEN_PAGES]
 
 def set_query_page(name: str) -> None:
     """Update ?page= in the URL (no experimental API)."""
@@ -32,6 +42,24 @@ def set_query_page(name: str) -> None:
     except Exception:
         pass
 
+@st.fragment(run_every=1)
+def warmup_placeholder() -> None:
+    """Lightweight placeholder shown until the warm-up is done (polls every second)."""
+    if warmup.is_ready():
+        st.rerun()
+    state = warmup.status()
+    st.info("⏳ Preparing the IVAC dataset… / Préparation des données…")
+    st.progress(len(state["timings"]) / max(state["total"], 1), text=f"Step: {state['step'] or '…'}")
+
+
+def leave_hidden_page() -> None:
+    """Picking a menu entry leaves a hidden page: drop ?page= so the radio wins."""
+    try:
+        del st.query_params["page"]
+    except Exception:
+        pass
+
+
 def get_query_page() -> str | None:
     """Read current ?page= value from URL."""
     try:
@@ -58,14 +86,23 @@ selected = st.sidebar.radio(
     LABELS,
     index=LABELS.index(default_label),
     key="nav_page",  
+    on_change=leave_hidden_page,
 )
 
 #
-set_query_page(selected)
+if page_from_url in HIDDEN_PAGES:
+    selected = page_from_url
+else:
+    set_query_page(selected)
 st.session_state["page"] = selected  
 
+if not warmup.is_ready():
+    warmup_placeholder()
+    st.stop()
+
 try:
-    PAGES[selected].show()
+    with telemetry.span(f"page.{selected}"):
+        PAGES[selected].show()
 except Exception:
     st.error(f"⚠️ An error occurred while rendering **{selected}**.")
     with st.expander("Show technical details"):
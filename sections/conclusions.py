@@ -2,8 +2,10 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.io import load_data
-from utils.prep import make_tables
+from utils.cache import frame_resource
+from utils.i18n import compile_catalog, current_lang, language_selector
+from utils.io import DATA_SOURCE
+from utils.shared import load_tables
 
 TEXTS = {
     "en": {
@@ -212,19 +214,7 @@ Considérez ce tableau de bord comme un **point de départ du dialogue**, pas un
     },
 }
 
-# debut
-def _get_lang(default="fr") -> str:
-    try:
-        lang = st.query_params.get("lang", default)
-        return lang if lang in ("en", "fr") else default
-    except Exception:
-        return default
- 
-def _set_lang(lang: str):
-    try:
-        st.query_params["lang"] = lang
-    except Exception:
-        pass
+compile_catalog(TEXTS)
 
 
 def _fmt(x, fmt="{:.2f}", na="-"):
@@ -243,34 +233,10 @@ def _safe_corr(df, a, b):
         return None
 
 
-
-def show():
-    current = _get_lang()
-    st.sidebar.subheader(TEXTS[current]["language"])
-    choice = st.sidebar.radio(
-        label=" ",
-        options=["en", "fr"],
-        format_func=lambda x: TEXTS[x][x],
-        key="lang_selector_conclusions",
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-    if choice != current:
-        _set_lang(choice)
-        st.rerun()
-    T = TEXTS[choice]
-
-    #  Header & intro 
-    st.header(T["header"])
-    st.info(T["intro"])
-
-    # Load data  
-    try:
-        df_raw = load_data()
-        tables = make_tables(df_raw)
-    except Exception as e:
-        st.error(f"Data loading error: {e}")
-        return
+@frame_resource
+def conclusion_metrics(source: str = DATA_SOURCE) -> dict:
+    """Language-independent findings on the latest session (rendered by `show`)."""
+    tables = load_tables(source)
 
     df_over = tables.get("overview", pd.DataFrame())
     by_region = tables.get("by_region", pd.DataFrame())
@@ -294,9 +260,9 @@ def show():
     gap_va = None
     if isinstance(by_region, pd.DataFrame) and not by_region.empty and {"region_academique", "valeur_ajoutee"}.issubset(by_region.columns):
         if session_col and "session" in by_region.columns and latest_session is not None:
-            reg_latest = by_region[by_region["session"] == latest_session].copy()
+            reg_latest = by_region[by_region["session"] == latest_session]
         else:
-            reg_latest = by_region.copy()
+            reg_latest = by_region
         reg_latest = reg_latest.dropna(subset=["valeur_ajoutee"])
         if not reg_latest.empty:
             grp = reg_latest.groupby("region_academique", dropna=True)["valeur_ajoutee"].mean().sort_values(ascending=False)
@@ -330,6 +296,37 @@ def show():
         if len(ts_sorted) >= 2:
             delta_va = float(ts_sorted["valeur_ajoutee"].iloc[-1] - ts_sorted["valeur_ajoutee"].iloc[0])
 
+    return {
+        "has_latest": not df_latest.empty and "valeur_ajoutee" in df_latest.columns,
+        "mean_va": mean_va, "mean_rate": mean_rate, "sigma_va": sigma_va,
+        "n_schools": n_schools, "pos_va_pct": pos_va_pct,
+        "top_region": top_region, "top_va": top_va,
+        "bottom_region": bottom_region, "bottom_va": bottom_va, "gap_va": gap_va,
+        "sector_delta": sector_delta, "p_value": p_value,
+        "corr_rate_va": corr_rate_va, "delta_va": delta_va,
+    }
+
+
+def show():
+    T = language_selector(TEXTS)
+    choice = current_lang()
+
+    #  Header & intro 
+    st.header(T["header"])
+    st.info(T["intro"])
+
+    # Results are computed once per dataset, whatever the language
+    try:
+        m = conclusion_metrics()
+    except Exception as e:
+        st.error(f"Data loading error: {e}")
+        return
+    mean_va, sigma_va, n_schools, pos_va_pct = m["mean_va"], m["sigma_va"], m["n_schools"], m["pos_va_pct"]
+    top_region, top_va, bottom_region, bottom_va, gap_va = (
+        m["top_region"], m["top_va"], m["bottom_region"], m["bottom_va"], m["gap_va"]
+    )
+    sector_delta, p_value, corr_rate_va, delta_va = m["sector_delta"], m["p_value"], m["corr_rate_va"], m["delta_va"]
+
     st.markdown(f"## {T['key_findings_title']}")
 
     # Territorial disparities
@@ -456,7 +453,7 @@ def show():
     st.markdown(T["final_message"])
 
  
-    if not df_latest.empty and "valeur_ajoutee" in df_latest.columns:
+    if m["has_latest"]:
         st.markdown("---")
         st.markdown(f"### {T['quick_stats']}")
         col1, col2, col3, col4 = st.columns(4)
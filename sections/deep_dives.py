@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-from utils.io import load_data
-from utils.prep import make_tables
+from utils.cache import frame_resource
+from utils.i18n import compile_catalog, current_lang, language_selector
+from utils.search import search_index
+from utils.territory import territory_tree
+from utils.shared import load_tables
 from utils.viz import bar_chart, histogram, line_chart, scatter
 
 #commentaires pour le visuel (emojis)
@@ -13,6 +16,15 @@ TEXTS = {
         "session": "Session",
         "academy": "Academy",
         "school": "School",
+        "territory_title": "🧭 Territorial drill-down",
+        "territory_root": "France",
+        "territory_drill": "Drill into",
+        "territory_leaf": "School level reached: use the breadcrumb to go back up.",
+        "col_name": "Territory", "col_schools": "Schools", "col_va": "Avg VA", "col_rate": "Avg pass rate",
+        "search": "Search a school (name, commune or UAI)",
+        "search_results": "Matches",
+        "search_none": "No school matches this search.",
+        "search_selected": "Selected from the national search: {label}",
         "ranking_metric": "Ranking metric",
         "top_n": "Number of schools to show (Top/Bottom)",
         
@@ -59,6 +71,15 @@ They reveal **hidden dynamics** behind averages and pave the way for reflection
         "session": "Session",
         "academy": "Académie",
         "school": "Établissement",
+        "territory_title": "🧭 Exploration territoriale",
+        "territory_root": "France",
+        "territory_drill": "Descendre dans",
+        "territory_leaf": "Niveau établissement atteint : utilisez le fil d'Ariane pour remonter.",
+        "col_name": "Territoire", "col_schools": "Établissements", "col_va": "VA moyenne", "col_rate": "Taux de réussite moyen",
+        "search": "Rechercher un établissement (nom, commune ou UAI)",
+        "search_results": "Résultats",
+        "search_none": "Aucun établissement ne correspond à cette recherche.",
+        "search_selected": "Sélectionné via la recherche nationale : {label}",
         "ranking_metric": "Métrique de classement",
         "top_n": "Nombre d'établissements à afficher (Top/Bottom)",
         
@@ -100,11 +121,77 @@ Elles révèlent les **dynamiques cachées** derrière les moyennes et ouvrent l
     }
 }
 
-def _get_lang():
-    return st.session_state.get("lang_deepdives", "fr")
+compile_catalog(TEXTS)
+
+SIZE_BINS = [0, 50, 150, 1000]
+SIZE_CODES = ["small", "medium", "large"]
+# Display labels per size code: long form (method 1) and short form (method 2)
+SIZE_LABELS = {
+    "en": {"small": "Small (<50)", "medium": "Medium (50-150)", "large": "Large (>150)"},
+    "fr": {"small": "Petit (<50)", "medium": "Moyen (50-150)", "large": "Grand (>150)"},
+}
+SIZE_SHORT = {
+    "en": {"small": "Small", "medium": "Medium", "large": "Large"},
+    "fr": {"small": "Petit", "medium": "Moyen", "large": "Grand"},
+}
+RANK_METRICS = ["valeur_ajoutee", "taux_reussite_g", "nb_candidats_g"]
+
+
+@frame_resource(max_entries=256)
+def academy_results(acad_sel: str | None, session_sel: str | None) -> dict:
+    """Résultats académie x session indépendants de la langue (classements, tailles, outliers, départements)."""
+    df_acad = load_tables()["cleaned"]
+    if acad_sel and "academie" in df_acad.columns:
+        df_acad = df_acad.iloc[territory_tree().select("academie", [acad_sel])]
+    if session_sel and "session_str" in df_acad.columns:
+        df_acad_sess = df_acad[df_acad["session_str"] == session_sel]
+    else:
+        df_acad_sess = df_acad
+    cols = df_acad_sess.columns
+    res = {"subset": df_acad_sess}
+
+    # Classements par métrique
+    res["rankings"] = {
+        m: df_acad_sess.dropna(subset=[m, "nom_de_l_etablissement"]).sort_values(m, ascending=False)
+        for m in RANK_METRICS if m in cols and "nom_de_l_etablissement" in cols
+    }
+
+    # Méthode 1 : taille
+    if "nb_candidats_g" in cols and "valeur_ajoutee" in cols:
+        df_size = df_acad_sess.dropna(subset=["nb_candidats_g", "valeur_ajoutee"])
+        res["n_size"] = len(df_size)
+        df_size = df_size.assign(size_category=pd.cut(df_size["nb_candidats_g"], bins=SIZE_BINS, labels=SIZE_CODES))
+        res["size_summary"] = df_size.groupby("size_category", observed=True)["valeur_ajoutee"].mean().reset_index()
+
+    # Méthode 2 : secteur x taille
+    if "nb_candidats_g" in cols and "valeur_ajoutee" in cols and "secteur" in cols:
+        df_cross = df_acad_sess.dropna(subset=["nb_candidats_g", "valeur_ajoutee", "secteur"])
+        res["n_cross"] = len(df_cross)
+        df_cross = df_cross.assign(size_category=pd.cut(df_cross["nb_candidats_g"], bins=SIZE_BINS, labels=SIZE_CODES))
+        res["cross_summary"] = df_cross.groupby(["secteur", "size_category"], observed=True)["valeur_ajoutee"].mean().reset_index()
+
+    # Méthode 3 : outliers
+    if "valeur_ajoutee" in cols and "nom_de_l_etablissement" in cols:
+        df_outliers = df_acad_sess.dropna(subset=["valeur_ajoutee", "nom_de_l_etablissement"])
+        res["n_outliers"] = len(df_outliers)
+        res["top_outliers"] = df_outliers.nlargest(5, "valeur_ajoutee")
+        res["bottom_outliers"] = df_outliers.nsmallest(5, "valeur_ajoutee")
+
+    # Méthode 4 : départements (au moins 3 établissements par département)
+    if "departement" in cols and "valeur_ajoutee" in cols:
+        df_dept = df_acad_sess.dropna(subset=["departement", "valeur_ajoutee"])
+        res["n_dept"] = len(df_dept)
+        dept_summary = df_dept.groupby("departement")["valeur_ajoutee"].agg(['mean', 'count']).reset_index()
+        res["dept_summary"] = dept_summary[dept_summary['count'] >= 3].sort_values('mean', ascending=False)
+
+    # Nuage candidats x taux et distribution
+    if "nb_candidats_g" in cols and "taux_reussite_g" in cols:
+        res["corr"] = df_acad_sess[["nb_candidats_g", "taux_reussite_g"]].corr().iloc[0, 1] if len(df_acad_sess) > 3 else 0
+    if "taux_reussite_g" in cols:
+        rates = df_acad_sess["taux_reussite_g"]
+        res["rate_stats"] = (rates.mean(), rates.median(), rates.std())
+    return res
 
-def _set_lang(lang: str):
-    st.session_state["lang_deepdives"] = lang
 
 def show_explanatory_text(T: dict):
     """Affiche le texte explicatif pédagogique"""
@@ -144,65 +231,71 @@ def show_explanatory_text(T: dict):
     
     st.markdown("---")
 
-def show():
-    # Language switch
-    current = _get_lang()
-    st.sidebar.subheader(TEXTS[current]["language"])
-    choice = st.sidebar.radio(
-        label=" ",
-        options=["en", "fr"],
-        format_func=lambda x: TEXTS[x][x],
-        horizontal=True,
-        key="lang_selector_deepdives",
-        label_visibility="collapsed",
-    )
-    if choice != current:
-        _set_lang(choice)
-        st.rerun()
-    
-    T = TEXTS[current]
-    
-    # Titre principal
-    st.header(T["title"])
-    
-    # Afficher le texte explicatif
-    show_explanatory_text(T)
-    
-    # Charger les données
-    df_raw = load_data()
-    tables = make_tables(df_raw)
-    df_std = tables["cleaned"]
-
-    # Filtres
-    with st.sidebar:
-        st.subheader(T["filters"])
-        sessions = sorted(df_std["session_str"].dropna().unique().tolist()) if "session_str" in df_std.columns else []
-        session_sel = st.selectbox(T["session"], sessions, index=len(sessions) - 1 if sessions else 0)
-        academies = sorted(df_std["academie"].dropna().unique().tolist()) if "academie" in df_std.columns else []
-        acad_sel = st.selectbox(T["academy"], academies, index=0 if academies else None)
-        # Liste des établissements de l'académie sélectionnée
-        etabs = []
-        if acad_sel and "academie" in df_std.columns and "nom_de_l_etablissement" in df_std.columns:
-            etabs = sorted(df_std.loc[df_std["academie"] == acad_sel, "nom_de_l_etablissement"].dropna().unique().tolist())
-        etab_sel = st.selectbox(T["school"], etabs, index=0 if etabs else None)
-        # Contrôles d'affichage
-        metric_choices = [m for m in ["valeur_ajoutee", "taux_reussite_g", "nb_candidats_g"] if m in df_std.columns]
-        metric_sel = st.selectbox(T["ranking_metric"], metric_choices) if metric_choices else None
-        top_n = st.slider(T["top_n"], min_value=5, max_value=100, value=15, step=5)
-
-    # Sous-ensembles
-    df_acad = df_std.copy()
-    if acad_sel and "academie" in df_acad.columns:
-        df_acad = df_acad[df_acad["academie"] == acad_sel]
-    if session_sel and "session_str" in df_acad.columns:
-        df_acad_sess = df_acad[df_acad["session_str"] == session_sel]
+def _set_territory(node):
+    st.session_state["dd_territory"] = node
+
+
+def _drill_territory():
+    st.session_state["dd_territory"] = st.session_state["dd_territory_child"]
+    st.session_state["dd_territory_child"] = None
+
+
+@st.fragment
+def _territory_section(session_sel: str | None, T: dict):
+    """Fragment – entrée : session. Fil d'Ariane région → académie → département → commune → UAI, agrégats précalculés."""
+    tree = territory_tree()
+    if tree.nodes.empty:
+        return
+    st.subheader(T["territory_title"])
+    node = st.session_state.get("dd_territory")
+    trail = tree.path(node) if node is not None else []
+
+    # Fil d'Ariane : un bouton par niveau parcouru
+    crumbs = st.columns(len(trail) + 1)
+    crumbs[0].button(T["territory_root"], key="dd_crumb_root", on_click=_set_territory, args=(None,),
+                     disabled=node is None, use_container_width=True)
+    for i, n in enumerate(trail):
+        crumbs[i + 1].button(str(tree.nodes.at[n, "label"]), key=f"dd_crumb_{i}", on_click=_set_territory, args=(n,),
+                             disabled=n == node, use_container_width=True)
+
+    children = tree.stats(tree.children(node), session_sel)
+    if children.empty:
+        st.caption(T["territory_leaf"])
+        return
+    cols = {"label": T["col_name"], "n_schools": T["col_schools"], "valeur_ajoutee": T["col_va"], "taux_reussite_g": T["col_rate"]}
+    table = children[[c for c in cols if c in children.columns]].rename(columns=cols)
+    st.dataframe(table, use_container_width=True, hide_index=True, height=min(36 * (len(table) + 1), 400))
+    labels = dict(zip(children["node"], children["label"]))
+    st.selectbox(T["territory_drill"], list(labels), index=None, format_func=lambda n: labels.get(n, n),
+                 key="dd_territory_child", on_change=_drill_territory)
+
+
+@st.fragment
+def _school_section(df_std: pd.DataFrame, acad_sel: str | None, uai_sel: str | None, T: dict):
+    """Fragment – entrées : données nettoyées, académie, UAI choisi par la recherche. Porte le sélecteur d'établissement."""
+    if "nom_de_l_etablissement" not in df_std.columns or "session_str" not in df_std.columns:
+        return
+    st.subheader(T["school_evolution"])
+    if uai_sel and "uai" in df_std.columns:
+        # Établissement trouvé par la recherche nationale : prioritaire sur la liste de l'académie
+        df_etab = df_std.iloc[territory_tree().select("uai", [uai_sel])]
+        etab_sel = df_etab["nom_de_l_etablissement"].iloc[-1] if not df_etab.empty else None
+        st.caption(T["search_selected"].format(label=search_index().label_of(uai_sel)))
     else:
-        df_acad_sess = df_acad
-
-    # Évolution d'un établissement sur les sessions
-    if etab_sel and "nom_de_l_etablissement" in df_std.columns and "session_str" in df_std.columns:
-        st.subheader(T["school_evolution"])
-        df_etab = df_std[df_std["nom_de_l_etablissement"] == etab_sel]
+        # Établissements de l'académie : feuilles de l'arbre territorial (une par UAI)
+        tree = territory_tree()
+        schools = pd.DataFrame(columns=["node", "name", "label"])
+        if acad_sel and "academie" in df_std.columns:
+            acads = tree.at("academie")
+            leaves = [tree.at("uai", within=n) for n in acads.loc[acads["name"] == acad_sel, "node"]]
+            if leaves:
+                schools = pd.concat(leaves).sort_values("label")
+        labels = dict(zip(schools["name"], schools["label"]))
+        school_uai = st.selectbox(T["school"], list(labels), index=0 if labels else None,
+                                  format_func=lambda n: labels.get(n, n), key="dd_school")
+        df_etab = df_std.iloc[tree.select("uai", [school_uai])] if school_uai else df_std.iloc[:0]
+        etab_sel = df_etab["nom_de_l_etablissement"].iloc[-1] if not df_etab.empty else None
+    if etab_sel:
         
         # Labels bilingues pour les zones
         excellent_label = "Excellent" if T is TEXTS["en"] else "Excellent"
@@ -319,11 +412,19 @@ Comparez ce graphique avec celui de la valeur ajoutée ci-dessus. Si les taux so
         
         st.markdown("---")
 
-    # Comparaison intra-académie (Top/Bottom sur session)
+
+@st.fragment
+def _ranking_section(res: dict, T: dict):
+    """Fragment – entrées : résultats académie x session. Porte la métrique et le top N."""
+    df_acad_sess = res["subset"]
     st.subheader(T["intra_academy"])
+    c1, c2 = st.columns(2)
+    metric_choices = [m for m in ["valeur_ajoutee", "taux_reussite_g", "nb_candidats_g"] if m in df_acad_sess.columns]
+    metric_sel = c1.selectbox(T["ranking_metric"], metric_choices, key="dd_metric") if metric_choices else None
+    top_n = c2.slider(T["top_n"], min_value=5, max_value=100, value=15, step=5, key="dd_top_n")
     rank_metric = metric_sel if metric_sel else ("valeur_ajoutee" if "valeur_ajoutee" in df_acad_sess.columns else None)
     if not df_acad_sess.empty and rank_metric is not None and rank_metric in df_acad_sess.columns:
-        df_rank = df_acad_sess.dropna(subset=[rank_metric, "nom_de_l_etablissement"]).sort_values(rank_metric, ascending=False)
+        df_rank = res["rankings"].get(rank_metric, df_acad_sess.iloc[:0])
         
         if len(df_rank) > 0:
             top_title = f"Top {top_n} – {rank_metric}" if T is TEXTS["en"] else f"Top {top_n} – {rank_metric}"
@@ -399,26 +500,60 @@ Ces établissements démontrent des **performances exceptionnelles** au sein de
         no_data_msg = "No data available for this filter combination." if T is TEXTS["en"] else "Aucune donnée disponible pour cette combinaison de filtres."
         st.info(no_data_msg)
 
+
+def show():
+    T = language_selector(TEXTS)
+    lang = current_lang()
+    
+    # Titre principal
+    st.header(T["title"])
+    
+    # Afficher le texte explicatif
+    show_explanatory_text(T)
+    
+    # Charger les données
+    tables = load_tables()
+    df_std = tables["cleaned"]
+
+    # Filtres globaux (session + académie) : toute la page en dépend
+    with st.sidebar:
+        st.subheader(T["filters"])
+        sessions = sorted(df_std["session_str"].dropna().unique().tolist()) if "session_str" in df_std.columns else []
+        session_sel = st.selectbox(T["session"], sessions, index=len(sessions) - 1 if sessions else 0)
+        academies = territory_tree().names("academie")
+        acad_sel = st.selectbox(T["academy"], academies, index=0 if academies else None)
+
+        # Recherche nationale par trigrammes (index construit une fois par processus)
+        uai_sel = None
+        query = st.text_input(T["search"], key="dd_search")
+        if query:
+            index = search_index()
+            hits = index.search(query)
+            if hits.empty:
+                st.caption(T["search_none"])
+            else:
+                uai_sel = st.selectbox(T["search_results"], hits["uai"].tolist(),
+                                       format_func=index.label_of, key="dd_search_pick")
+
+    # Sous-ensembles et résultats (mis en cache indépendamment de la langue)
+    res = academy_results(acad_sel, session_sel)
+    df_acad_sess = res["subset"]
+
+    # Fragments : le territoire, l'établissement, la métrique et le top N ne relancent que leur section
+    _territory_section(session_sel, T)
+    _school_section(df_std, acad_sel, uai_sel, T)
+    _ranking_section(res, T)
+
     # Méthode 1 : Analyse par taille d'établissement
     st.markdown("---")
     method1_title = "**Method 1:** Analysis by School Size" if T is TEXTS["en"] else "**Méthode 1 :** Analyse par taille d'établissement"
     st.markdown(f"### {method1_title}")
     
     if "nb_candidats_g" in df_acad_sess.columns and "valeur_ajoutee" in df_acad_sess.columns:
-        # Catégoriser par taille
-        df_size = df_acad_sess.dropna(subset=["nb_candidats_g", "valeur_ajoutee"])
-        
-        if len(df_size) >= 3:
-            df_size["size_category"] = pd.cut(
-                df_size["nb_candidats_g"], 
-                bins=[0, 50, 150, 1000], 
-                labels=["Small (<50)" if T is TEXTS["en"] else "Petit (<50)", 
-                       "Medium (50-150)" if T is TEXTS["en"] else "Moyen (50-150)", 
-                       "Large (>150)" if T is TEXTS["en"] else "Grand (>150)"]
-            )
-            
-            # Moyenne par catégorie de taille
-            size_summary = df_size.groupby("size_category", observed=True)["valeur_ajoutee"].mean().reset_index()
+        # Moyenne par catégorie de taille
+        if res["n_size"] >= 3:
+            size_summary = res["size_summary"]
+            size_summary = size_summary.assign(size_category=size_summary["size_category"].map(SIZE_LABELS[lang]))
             
             if not size_summary.empty:
                 size_title = "Average added value by school size" if T is TEXTS["en"] else "Valeur ajoutée moyenne par taille d'établissement"
@@ -473,19 +608,10 @@ La taille compte, mais n'est pas déterministe. {"Les petits établissements peu
     st.markdown(f"### {method2_title}")
     
     if "nb_candidats_g" in df_acad_sess.columns and "valeur_ajoutee" in df_acad_sess.columns and "secteur" in df_acad_sess.columns:
-        df_cross = df_acad_sess.dropna(subset=["nb_candidats_g", "valeur_ajoutee", "secteur"])
-        
-        if len(df_cross) >= 6:  # Au moins 6 écoles pour avoir des données dans plusieurs catégories
-            df_cross["size_category"] = pd.cut(
-                df_cross["nb_candidats_g"], 
-                bins=[0, 50, 150, 1000], 
-                labels=["Small" if T is TEXTS["en"] else "Petit", 
-                       "Medium" if T is TEXTS["en"] else "Moyen", 
-                       "Large" if T is TEXTS["en"] else "Grand"]
-            )
-            
+        if res["n_cross"] >= 6:  # Au moins 6 écoles pour avoir des données dans plusieurs catégories
             # Moyenne par secteur et taille
-            cross_summary = df_cross.groupby(["secteur", "size_category"], observed=True)["valeur_ajoutee"].mean().reset_index()
+            cross_summary = res["cross_summary"]
+            cross_summary = cross_summary.assign(size_category=cross_summary["size_category"].map(SIZE_SHORT[lang]))
             
             if not cross_summary.empty:
                 cross_title = "Added value: Sector x Size" if T is TEXTS["en"] else "Valeur ajoutée : Secteur x Taille"
@@ -539,11 +665,10 @@ Les effets sectoriels interagissent avec la taille. {"L'avantage du privé n'est
     st.markdown(f"### {method3_title}")
     
     if "valeur_ajoutee" in df_acad_sess.columns and "nom_de_l_etablissement" in df_acad_sess.columns and not df_acad_sess.empty:
-        df_outliers = df_acad_sess.dropna(subset=["valeur_ajoutee", "nom_de_l_etablissement"])
-        if len(df_outliers) >= 10:
-            # Identifier les outliers (top 5 et bottom 5)
-            top_outliers = df_outliers.nlargest(5, "valeur_ajoutee")
-            bottom_outliers = df_outliers.nsmallest(5, "valeur_ajoutee")
+        if res["n_outliers"] >= 10:
+            # Outliers (top 5 et bottom 5)
+            top_outliers = res["top_outliers"]
+            bottom_outliers = res["bottom_outliers"]
             
             outliers_title_top = "Top 5 exceptional schools (highest VA)" if T is TEXTS["en"] else "Top 5 établissements exceptionnels (VA la plus haute)"
             outliers_title_bottom = "Bottom 5 schools needing attention (lowest VA)" if T is TEXTS["en"] else "Bottom 5 établissements nécessitant attention (VA la plus basse)"
@@ -609,7 +734,7 @@ Ces établissements nécessitent une **intervention immédiate** : financement d
 """)
 
         else:
-            no_data_msg = f"Not enough schools for outlier analysis (minimum 10 required, found {len(df_outliers)})." if T is TEXTS["en"] else f"Pas assez d'établissements pour l'analyse des outliers (minimum 10 requis, trouvé {len(df_outliers)})."
+            no_data_msg = f"Not enough schools for outlier analysis (minimum 10 required, found {res['n_outliers']})." if T is TEXTS["en"] else f"Pas assez d'établissements pour l'analyse des outliers (minimum 10 requis, trouvé {res['n_outliers']})."
             st.info(no_data_msg)
     else:
         no_data_msg = "Required columns not available or no data." if T is TEXTS["en"] else "Colonnes requises non disponibles ou pas de données."
@@ -621,12 +746,8 @@ Ces établissements nécessitent une **intervention immédiate** : financement d
     st.markdown(f"### {method4_title}")
     
     if "departement" in df_acad_sess.columns and "valeur_ajoutee" in df_acad_sess.columns:
-        df_dept = df_acad_sess.dropna(subset=["departement", "valeur_ajoutee"])
-        
-        if len(df_dept) >= 3:
-            dept_summary = df_dept.groupby("departement")["valeur_ajoutee"].agg(['mean', 'count']).reset_index()
-            dept_summary = dept_summary[dept_summary['count'] >= 3]  # Au moins 3 établissements par département
-            dept_summary = dept_summary.sort_values('mean', ascending=False)
+        if res["n_dept"] >= 3:
+            dept_summary = res["dept_summary"]
             
             if not dept_summary.empty and len(dept_summary) > 0:
                 dept_title = f"Average added value by department – {acad_sel}" if T is TEXTS["en"] else f"Valeur ajoutée moyenne par département – {acad_sel}"
@@ -686,7 +807,7 @@ Les stratégies au niveau académique doivent être **différenciées par dépar
                title=scatter_title)
         
         # ANALYSE SCATTER (boîte bleue)
-        corr = df_acad_sess[["nb_candidats_g", "taux_reussite_g"]].corr().iloc[0, 1] if len(df_acad_sess) > 3 else 0
+        corr = res["corr"]
         
         if T is TEXTS["en"]:
             st.info(f"""
@@ -720,9 +841,7 @@ Ne pas juger un établissement uniquement sur sa taille. {"Les petits peuvent ex
         histogram(df_acad_sess, x="taux_reussite_g", nbins=40, title=dist_title)
         
         # ANALYSE DISTRIBUTION (boîte bleue)
-        rate_mean = df_acad_sess["taux_reussite_g"].mean()
-        rate_median = df_acad_sess["taux_reussite_g"].median()
-        rate_std = df_acad_sess["taux_reussite_g"].std()
+        rate_mean, rate_median, rate_std = res["rate_stats"]
         
         if T is TEXTS["en"]:
             st.info(f"""
@@ -3,8 +3,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-from utils.io import load_data
-from utils.prep import clean_ivac, diff_columns_breakdown
+from utils.cache import frame_resource
+from utils.i18n import compile_catalog, language_selector
+from utils.io import DATA_SOURCE
+from utils.paging import paged_table
+from utils.prep import diff_columns_breakdown
+from utils.shared import load_tables, raw_stats
 
 LANG_TEXT = {
     # EN
@@ -44,7 +48,12 @@ LANG_TEXT = {
             "- Aggregations by **academic region** and **exam session**\n\n"
             "These transformations ensure the data is clean, comparable, and ready for interactive analysis."
         ),
-        "preview_title": "📋 Preview of the first 5 rows (standardized)",
+        "preview_title": "📋 Browse the standardized dataset",
+        "sort_by": "Sort by",
+        "sort_none": "Original order",
+        "descending": "Descending",
+        "page": "Page",
+        "rows_of": "Rows {start}–{end} of {total}",
         "checklist_title": "✅ Dataset Selection & Relevance Checklist",
         "checklist_table": (
             "| Criterion | Justification |\n"
@@ -115,7 +124,12 @@ LANG_TEXT = {
             "- Agrégations par **région académique** et **session**\n\n"
             "Ces transformations garantissent des comparaisons fiables et reproductibles."
         ),
-        "preview_title": "📋 Aperçu des 5 premières lignes (standardisées)",
+        "preview_title": "📋 Parcourir le jeu standardisé",
+        "sort_by": "Trier par",
+        "sort_none": "Ordre d’origine",
+        "descending": "Décroissant",
+        "page": "Page",
+        "rows_of": "Lignes {start}–{end} sur {total}",
         "checklist_title": "✅ Checklist - Choix du jeu de données",
         "checklist_table": (
             "| Critère | Justification |\n"
@@ -156,27 +170,28 @@ LANG_TEXT = {
     },
 }
 
-def _get_lang() -> str:
-    lang = st.query_params.get("lang", "en")
-    return lang if lang in ("en", "fr") else "en"
+compile_catalog(LANG_TEXT)
+
+
+@frame_resource
+def dataset_summary(source: str = DATA_SOURCE) -> dict:
+    """Language-independent figures shown on the intro page (raw vs cleaned dataset)."""
+    raw = raw_stats(source)
+    df_clean = load_tables(source)["cleaned"]
+    return {
+        "raw_shape": (raw["rows"], len(raw["columns"])),
+        "clean_shape": df_clean.shape,
+        # Only the column names are compared: an empty frame stands in for the raw data
+        "diff": diff_columns_breakdown(pd.DataFrame(columns=raw["columns"]), df_clean),
+        "raw_duplicates": raw["duplicates"],
+        "n_academies": df_clean["region_academique"].nunique() if "region_academique" in df_clean.columns else "N/A",
+        "n_schools": df_clean["uai"].nunique() if "uai" in df_clean.columns else "N/A",
+        "clean_columns": list(df_clean.columns),
+    }
+
 
-def _set_lang(lang: str):
-    st.query_params["lang"] = lang
 def show():
-    current_lang = _get_lang()
-    st.sidebar.subheader(LANG_TEXT[current_lang].get("language", "Language"))
-    choice = st.sidebar.radio(
-        label=" ",
-        options=["en", "fr"],
-        format_func=lambda x: LANG_TEXT[x].get(x, x.title()),
-        horizontal=True,
-        key="lang_selector_intro",
-        label_visibility="collapsed",
-    )
-    if choice and choice != current_lang:
-        _set_lang(choice)
-        st.rerun()
-    T = LANG_TEXT.get(choice or current_lang, LANG_TEXT["en"])
+    T = language_selector(LANG_TEXT)
 
     st.title(T.get("title", "IVAC – Added Value Indicators"))
     st.markdown(f"{T.get('hook1','')}\n\n{T.get('hook2','')}")
@@ -223,16 +238,16 @@ def show():
 
     # Load / clean / diff with error handling
     try:
-        df_raw = load_data()
-        df_clean = clean_ivac(df_raw)
-        diff = diff_columns_breakdown(df_raw, df_clean)
+        summary = dataset_summary()
+        diff = summary["diff"]
     except Exception as e:
         st.error(f"Erreur lors du chargement des données: {str(e)}")
         st.stop()
+    (raw_rows, raw_cols), (clean_rows, clean_cols) = summary["raw_shape"], summary["clean_shape"]
 
     #  KPIs
     c1, c2, c3, c4, c5 = st.columns(5)
-    c1.metric(T.get("metric_rows", "Rows"), f"{df_raw.shape[0]:,}".replace(",", " "))
+    c1.metric(T.get("metric_rows", "Rows"), f"{raw_rows:,}".replace(",", " "))
 
     engineered_count = len(diff.get("engineered", []))
     dropped_count    = len(diff.get("dropped", []))
@@ -244,18 +259,16 @@ def show():
     )
     c2.metric(
         f"{T.get('metric_cols','Columns')} (raw -> cleaned)",
-        f"{df_raw.shape[1]} -> {df_clean.shape[1]}",
+        f"{raw_cols} -> {clean_cols}",
         delta=delta_fmt.format(eng=engineered_count, drop=dropped_count, net=net_delta),
     )
 
-    c3.metric(T.get("metric_dups", "Duplicates"), str(df_raw.duplicated().sum()))
+    c3.metric(T.get("metric_dups", "Duplicates"), str(summary["raw_duplicates"]))
 
-    n_academies = df_clean["region_academique"].nunique() if "region_academique" in df_clean.columns else "N/A"
-    n_schools   = df_clean["uai"].nunique() if "uai" in df_clean.columns else "N/A"
-    c4.metric(T.get("metric_academies", "Academic regions"), n_academies)
-    c5.metric(T.get("metric_schools", "Unique schools (UAI)"), n_schools)
+    c4.metric(T.get("metric_academies", "Academic regions"), summary["n_academies"])
+    c5.metric(T.get("metric_schools", "Unique schools (UAI)"), summary["n_schools"])
     st.caption("Counts computed on the cleaned dataset (all sessions combined).")
-    raw_cols_count = df_raw.shape[1]
+    raw_cols_count = raw_cols
     kept_or_renamed_count = max(raw_cols_count - dropped_count, 0)
 
     donut_df = pd.DataFrame({
@@ -280,10 +293,10 @@ def show():
     )
     
 
-    if df_clean.shape[0] != df_raw.shape[0]:
-        st.warning(f"⚠️ Row count changed during cleaning: {df_raw.shape[0]} -> {df_clean.shape[0]}")
+    if clean_rows != raw_rows:
+        st.warning(f"⚠️ Row count changed during cleaning: {raw_rows} -> {clean_rows}")
     
-    missing_cols = [col for col in ["valeur_ajoutee", "nb_candidats_total", "row_id"] if col not in df_clean.columns]
+    missing_cols = [col for col in ["valeur_ajoutee", "nb_candidats_total", "row_id"] if col not in summary["clean_columns"]]
     if missing_cols:
         st.warning(f"⚠️ Expected columns missing after cleaning: {', '.join(missing_cols)}")
     
@@ -311,7 +324,7 @@ def show():
 
     if T.get("preview_title"):
         st.subheader(T["preview_title"])
-    st.dataframe(df_clean.head(), use_container_width=True)
+    paged_table(load_tables()["cleaned"], T, "intro_preview", f"{DATA_SOURCE}#cleaned")
     if T.get("std_note"):
         st.caption(T["std_note"])
 
@@ -5,10 +5,17 @@ import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
 
-from utils.io import load_data
-from utils.prep import make_tables, _ensure_session_str
-from utils.viz import bar_chart, histogram
-from utils.geo import load_geojson, map_chart
+from utils.cache import frame_resource
+from utils.i18n import compile_catalog, language_selector
+from utils.prep import _ensure_session_str, rollup_cube
+from utils.shared import load_cube, load_tables
+from utils.viz import bar_chart, histogram, trend_figure
+from utils.departments import department_dim, is_overseas, join_features
+from utils.geo import MAP_HEIGHT, animated_map_figure, load_map_geojson, resolution_for
+from utils.points import points_figure, school_bins, school_points, unplaced_schools
+from utils.territory import territory_tree
+from utils.spatial import CLUSTERS, PERMUTATIONS, cluster_map_figure, department_clusters
+from utils.artifacts import load_figure
 
 
 TEXTS = {
@@ -37,13 +44,26 @@ TEXTS = {
         # Trends
         "trend_title": "📈 Temporal Evolution",
         "trend_caption": "Rising line suggests national improvement; compare to latest session mean.",
-        "multi_title": "Joint evolution: VA & Pass rate",
         "multi_note": "**Reading guide:** Both up -> improvement | Pass rate up but VA flat -> grade inflation | VA up but pass rate flat -> qualitative improvement.",
         
         # Regional
         "regional_title": "🗺️ Territorial Disparities",
         "map_title": "Choropleth by department",
-        "map_caption": "**Reading:** Warm colors = lower performance | Cool colors = higher performance | Hover for details.",
+        "map_caption": "**Reading:** Warm colors = lower performance | Cool colors = higher performance | Hover for details | Slider or ▶ steps through sessions.",
+        "map_unmatched": "Not on the map ({n} departments without a shape): {codes}",
+        "map_overseas": "Overseas departments ({codes}) are not drawn: the map covers metropolitan France and Corsica.",
+        "map_mode": "Map", "mode_departments": "Departments", "mode_schools": "Schools", "mode_clusters": "Spatial clusters",
+        "clusters_title": "Do high / low value-added departments cluster?",
+        "moran_i": "Moran's I (VA)", "moran_p": "p-value ({n} permutations)",
+        "clusters_caption": "**Reading:** I > 0 with a small p-value = neighbouring departments have similar VA. Coloured departments are significant local clusters (LISA, p ≤ 0.05).",
+        "cluster_HH": "High-High (hot spot)", "cluster_LL": "Low-Low (cold spot)",
+        "cluster_HL": "High among low", "cluster_LH": "Low among high", "cluster_ns": "Not significant",
+        "schools_title": "Schools grouped by area",
+        "map_zoom": "Zoom level",
+        "map_sessions": "Sessions (all if empty)",
+        "schools_count": "Schools", "schools_mean": "Mean VA",
+        "schools_caption": "{n} schools in {bins} hexagons; bigger hexagons at lower zoom. Size = number of schools, colour = mean value added.",
+        "schools_unplaced": "{n} schools are not shown: their commune is missing from the commune coordinate table.",
         "top_regions": "Top 10 regions (VA)",
         "bottom_regions": "Bottom 10 regions (VA)",
         
@@ -109,13 +129,26 @@ TEXTS = {
         # Trends
         "trend_title": "📈 Évolution Temporelle",
         "trend_caption": "Courbe ascendante suggère une amélioration nationale ; comparez à la moyenne de la dernière session.",
-        "multi_title": "Évolution conjointe : VA & Taux de réussite",
         "multi_note": "**Lecture :** Les deux montent -> amélioration | Taux up mais VA plate -> inflation des notes | VA up mais taux stable -> amélioration qualitative.",
         
         # Regional
         "regional_title": "🗺️ Disparités Territoriales",
         "map_title": "Carte choroplèthe par département",
-        "map_caption": "**Lecture :** Couleurs chaudes = performance plus faible | Couleurs froides = performance plus élevée | Survolez pour détails.",
+        "map_caption": "**Lecture :** Couleurs chaudes = performance plus faible | Couleurs froides = performance plus élevée | Survolez pour détails | Curseur ou ▶ pour parcourir les sessions.",
+        "map_unmatched": "Absents de la carte ({n} départements sans contour) : {codes}",
+        "map_overseas": "Départements d’outre-mer ({codes}) non représentés : la carte couvre la métropole et la Corse.",
+        "map_mode": "Carte", "mode_departments": "Départements", "mode_schools": "Établissements", "mode_clusters": "Agrégats spatiaux",
+        "clusters_title": "Les départements à forte / faible valeur ajoutée se regroupent-ils ?",
+        "moran_i": "I de Moran (VA)", "moran_p": "p-valeur ({n} permutations)",
+        "clusters_caption": "**Lecture :** I > 0 avec une p-valeur faible = les départements voisins ont une VA proche. Les départements colorés sont des agrégats locaux significatifs (LISA, p ≤ 0,05).",
+        "cluster_HH": "Haut-Haut (point chaud)", "cluster_LL": "Bas-Bas (point froid)",
+        "cluster_HL": "Haut parmi bas", "cluster_LH": "Bas parmi hauts", "cluster_ns": "Non significatif",
+        "schools_title": "Établissements regroupés par zone",
+        "map_zoom": "Niveau de zoom",
+        "map_sessions": "Sessions (toutes si vide)",
+        "schools_count": "Établissements", "schools_mean": "VA moyenne",
+        "schools_caption": "{n} établissements dans {bins} hexagones ; hexagones plus grands à faible zoom. Taille = nombre d'établissements, couleur = valeur ajoutée moyenne.",
+        "schools_unplaced": "{n} établissements ne sont pas affichés : leur commune est absente de la table des coordonnées des communes.",
         "top_regions": "Top 10 régions (VA)",
         "bottom_regions": "Bottom 10 régions (VA)",
         
@@ -158,86 +191,255 @@ TEXTS = {
     }
 }
 
-def _get_lang() -> str:
-    try:
-        lang = st.query_params.get("lang", "fr")
-        return lang if lang in ("en", "fr") else "fr"
-    except Exception:
-        return "fr"
+compile_catalog(TEXTS)
 
-def _set_lang(lang: str):
-    try:
-        st.query_params["lang"] = lang
-    except Exception:
-        pass
+# Correlation matrix columns and their display labels
+CORR_COLS = ["valeur_ajoutee", "taux_reussite_g", "nb_candidats_total",
+             "taux_brut_reussite_g", "effectif_presents_g", "effectif_admis_g"]
+CORR_LABELS = {
+    "fr": {
+        "valeur_ajoutee": "Valeur ajoutée",
+        "taux_reussite_g": "Taux réussite",
+        "nb_candidats_total": "Nb candidats",
+        "taux_brut_reussite_g": "Taux brut",
+        "effectif_presents_g": "Effectif présents",
+        "effectif_admis_g": "Effectif admis"
+    },
+    "en": {
+        "valeur_ajoutee": "Added value",
+        "taux_reussite_g": "Pass rate",
+        "nb_candidats_total": "Candidates",
+        "taux_brut_reussite_g": "Raw pass rate",
+        "effectif_presents_g": "Present",
+        "effectif_admis_g": "Admitted"
+    },
+}
 
-def show(df_raw=None, tables=None):
-    # Language switcher
-    current = _get_lang()
-    st.sidebar.subheader(TEXTS[current]["language"])
-    choice = st.sidebar.radio(
-        label=" ",
-        options=["en", "fr"],
-        format_func=lambda x: TEXTS[x][x],
-        key="lang_selector_overview",
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-    if choice != current:
-        _set_lang(choice)
-        st.rerun()
-    T = TEXTS[choice]
+@st.fragment
+def _trend_section(ts: pd.DataFrame | None, T: dict):
+    """Fragment – inputs: national time series."""
+    st.subheader(T["trend_title"])
+    if ts is not None and not ts.empty and "valeur_ajoutee" in ts.columns and "session_str" in ts.columns:
+        ts_valid = ts["valeur_ajoutee"].dropna()
+        if len(ts_valid) >= 2:
+            lang = "en" if T is TEXTS["en"] else "fr"
+            fig = load_figure(f"trend_{lang}") or trend_figure(ts, lang)
+            st.plotly_chart(fig, use_container_width=True, key="trend_chart")
+            st.caption(T["multi_note"])
+        else:
+            st.info(T["insufficient_data"])
+    else:
+        st.warning(T["no_data"])
 
-    # Header
-    st.header(T["header"])
-    st.info(T["intro"])
+    st.divider()
 
-    # Load data
-    df_raw = load_data()
-    tables = make_tables(df_raw)
 
-    ts = _ensure_session_str(tables.get("timeseries"))
-    by_region = _ensure_session_str(tables.get("by_region"))
-    by_dep = tables.get("by_departement", pd.DataFrame()).copy()
-    df_over = tables.get("overview", pd.DataFrame()).copy()
+@frame_resource
+def map_by_session() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Agrégats session x département issus du cube, joints aux contours : (présents, absents de la carte)."""
+    by_session = rollup_cube(load_cube(), ["session_str", "code_departement"])
+    return join_features(by_session, department_dim())
 
-    # Sidebar filters
-    with st.sidebar:
-        st.subheader(T["filters_title"])
-        
-        # Session
-        sessions = sorted(ts["session_str"].unique().tolist()) if (ts is not None and not ts.empty and "session_str" in ts.columns) else []
-        selected_session = st.selectbox(T["filter_session"], sessions, index=len(sessions) - 1 if sessions else 0) if sessions else None
-        
-        # Regions
-        regions = (
-            sorted(by_region["region_academique"].dropna().unique().tolist())
-            if (by_region is not None and not by_region.empty and "region_academique" in by_region.columns) else []
-        )
-        selected_regions = st.multiselect(T["filter_regions"], regions, default=regions[:5] if regions else [])
-        
-        # Sector
-        sector_sel = st.selectbox(
-            T["filter_sector"], 
-            [T["sector_all"], "PU", "PR"],
-            index=0
-        ) if "secteur" in df_over.columns else T["sector_all"]
+
+@st.fragment
+def _map_section(T: dict):
+    """Fragment – no inputs: the map covers every session, stepped through in the browser."""
+    # Le mode établissements n'est proposé qu'avec une table de coordonnées des communes
+    modes = ["departments", "schools", "clusters"] if not school_points().empty else ["departments", "clusters"]
+    mode = st.radio(T["map_mode"], modes, horizontal=True,
+                    format_func=lambda m: T[f"mode_{m}"], key="overview_map_mode")
+    if mode != "departments":
+        if mode == "schools":
+            _schools_map(T)
+        else:
+            _clusters_map(T)
+        st.divider()
+        return
+
+    st.markdown(f"#### {T['map_title']}")
+    prebuilt = load_figure("map")
+    if prebuilt is not None:
+        st.plotly_chart(prebuilt, use_container_width=True)
+        st.caption(T["map_caption"])
+    else:
+        # Raw codes -> GeoJSON ids through the department dimension; unmatched ones are reported
+        by_session, unmatched = map_by_session()
+        value_col = "taux_reussite_g" if "taux_reussite_g" in by_session.columns else "valeur_ajoutee"
+        if not by_session.empty and value_col in by_session.columns:
+            # Geometry simplified to the map's pixel size (~180 KB instead of 3.4 MB), sent once for all sessions
+            geojson = load_map_geojson(resolution_for(MAP_HEIGHT), codes=by_session["code_departement"].unique())
+            if geojson:
+                fig = animated_map_figure(by_session, geojson, value_col=value_col,
+                                          height=MAP_HEIGHT, session_label=T["filter_session"])
+                st.plotly_chart(fig, use_container_width=True, key="map_chart")
+                st.caption(T["map_caption"])
+                # Outre-mer : absent des contours par construction ; les autres codes sont des anomalies
+                missing = sorted(unmatched["code_departement"].unique())
+                overseas = [c for c in missing if is_overseas(c)]
+                other = [c for c in missing if not is_overseas(c)]
+                if overseas:
+                    st.caption(T["map_overseas"].format(codes=", ".join(overseas)))
+                if other:
+                    st.caption(T["map_unmatched"].format(n=len(other), codes=", ".join(other)))
+        else:
+            st.info(T["no_data"])
+
+    st.divider()
+
+
+@frame_resource(max_entries=64)
+def session_clusters(session: str) -> dict | None:
+    """I de Moran et LISA de la VA pour une session : les permutations tournent une fois par session et par processus."""
+    by_session, _ = map_by_session()
+    return department_clusters(by_session[by_session["session_str"] == session], "valeur_ajoutee")
+
+
+def _clusters_map(T: dict):
+    """Autocorrélation spatiale de la VA par session : I de Moran global et couche LISA."""
+    st.markdown(f"#### {T['clusters_title']}")
+    by_session, _ = map_by_session()
+    if by_session.empty or "valeur_ajoutee" not in by_session.columns:
+        st.info(T["no_data"])
+        return
+    sessions = sorted(by_session["session_str"].dropna().unique())
+    session = st.selectbox(T["filter_session"], sessions, index=len(sessions) - 1, key="clusters_session")
+    result = session_clusters(session)
+    if result is None:
+        st.info(T["insufficient_data"])
+        return
+
+    c1, c2 = st.columns(2)
+    c1.metric(T["moran_i"], f"{result['I']:+.3f}")
+    c2.metric(T["moran_p"].format(n=PERMUTATIONS), f"{result['p']:.3f}")
+    local = result["local"]
+    geojson = load_map_geojson(resolution_for(MAP_HEIGHT), codes=local["code"].unique())
+    if geojson:
+        labels = {c: T[f"cluster_{c}"] for c in (*CLUSTERS, "ns")}
+        st.plotly_chart(cluster_map_figure(local, geojson, labels), use_container_width=True, key="clusters_map")
+    st.caption(T["clusters_caption"])
+
+
+def _schools_map(T: dict):
+    """Carte des établissements : agrégation en hexagones côté serveur, taille liée au zoom."""
+    st.markdown(f"#### {T['schools_title']}")
+    points = school_points()
+    sessions = sorted(points["session_str"].dropna().unique()) if "session_str" in points.columns else []
+    c1, c2 = st.columns([2, 1])
+    chosen = c1.multiselect(T["map_sessions"], sessions, key="schools_map_sessions")
+    zoom = c2.slider(T["map_zoom"], min_value=4, max_value=10, value=5, key="schools_map_zoom")
+
+    # Seuls les centres d'hexagones sont envoyés au navigateur (quelques centaines de points au plus)
+    bins = school_bins(zoom, tuple(chosen))
+    fig = points_figure(bins, zoom, height=MAP_HEIGHT,
+                        count_label=T["schools_count"], mean_label=T["schools_mean"])
+    st.plotly_chart(fig, use_container_width=True, key="schools_map")
+    st.caption(T["schools_caption"].format(n=int(bins["count"].sum()), bins=len(bins)))
+    missing = unplaced_schools()
+    if missing:
+        st.caption(T["schools_unplaced"].format(n=missing))
+
+
+@frame_resource(max_entries=256)
+def overview_results(session: str | None, regions: tuple[str, ...], sector: str) -> dict:
+    """
+    Language-independent results of the filtered analysis (KPIs, regional ranking,
+    sector t-test, correlations, synthesis), cached per filter combination.
+    `sector` is "all", "PU" or "PR".
+    """
+    tables = load_tables()
+    df_over = tables.get("overview", pd.DataFrame())
+    by_region = _ensure_session_str(tables.get("by_region"))
 
     # Apply filters
-    df_view = df_over.copy()
-    if selected_session and "session_str" in df_view.columns:
-        df_view = df_view[df_view["session_str"] == selected_session]
-    if selected_regions and "region_academique" in df_view.columns:
-        df_view = df_view[df_view["region_academique"].isin(selected_regions)]
-    if sector_sel != T["sector_all"] and "secteur" in df_view.columns:
-        df_view = df_view[df_view["secteur"] == sector_sel]
+    df_view = df_over
+    if session and "session_str" in df_view.columns:
+        df_view = df_view[df_view["session_str"] == session]
+    if regions and "region_academique" in df_view.columns:
+        df_view = df_view[df_view["region_academique"].isin(regions)]
+    if sector != "all" and "secteur" in df_view.columns:
+        df_view = df_view[df_view["secteur"] == sector]
 
     # Regional view
-    reg_view = by_region.copy() if (by_region is not None) else pd.DataFrame()
-    if selected_session and not reg_view.empty and "session_str" in reg_view.columns:
-        reg_view = reg_view[reg_view["session_str"] == selected_session]
-    if selected_regions and not reg_view.empty and "region_academique" in reg_view.columns:
-        reg_view = reg_view[reg_view["region_academique"].isin(selected_regions)]
+    reg_view = by_region if (by_region is not None) else pd.DataFrame()
+    if session and not reg_view.empty and "session_str" in reg_view.columns:
+        reg_view = reg_view[reg_view["session_str"] == session]
+    if regions and not reg_view.empty and "region_academique" in reg_view.columns:
+        reg_view = reg_view[reg_view["region_academique"].isin(regions)]
+
+    has_va = "valeur_ajoutee" in df_view.columns and not df_view.empty
+    res = {"n": len(df_view), "has_va": has_va, "has_sector": "secteur" in df_view.columns}
+
+    # KPIs
+    if not df_view.empty:
+        res["mean_va"] = df_view["valeur_ajoutee"].mean() if "valeur_ajoutee" in df_view.columns else 0.0
+        res["mean_rate"] = df_view["taux_reussite_g"].mean() if "taux_reussite_g" in df_view.columns else 0.0
+        res["std_va"] = df_view["valeur_ajoutee"].std() if "valeur_ajoutee" in df_view.columns else 0.0
+
+    # Regional disparities
+    res["reg_sorted"] = None
+    if not reg_view.empty and "valeur_ajoutee" in reg_view.columns and "region_academique" in reg_view.columns:
+        res["reg_sorted"] = reg_view.sort_values("valeur_ajoutee", ascending=False)
+
+    # Distribution (only the plotted column is kept)
+    res["va"] = df_view[["valeur_ajoutee"]] if has_va else None
+
+    # Sector comparison
+    res["sector"] = None
+    res["ttest"] = None
+    if res["has_sector"] and has_va:
+        df_sector = df_view.loc[df_view["secteur"].isin(["PU", "PR"]), ["secteur", "valeur_ajoutee"]]
+        res["sector"] = df_sector
+        pu = df_sector.loc[df_sector["secteur"] == "PU", "valeur_ajoutee"].dropna()
+        pr = df_sector.loc[df_sector["secteur"] == "PR", "valeur_ajoutee"].dropna()
+        if len(pu) > 3 and len(pr) > 3:
+            from scipy import stats
+            t_stat, p_value = stats.ttest_ind(pu, pr)
+            res["ttest"] = {"t": float(t_stat), "p": float(p_value), "delta": float(pr.mean() - pu.mean())}
+
+    # Correlation matrix
+    available_cols = [col for col in CORR_COLS if col in df_view.columns]
+    res["corr_cols"] = available_cols
+    res["corr"] = None
+    if len(available_cols) >= 2:
+        corr_data = df_view[available_cols].dropna()
+        if not corr_data.empty and len(corr_data) >= 3:
+            res["corr"] = corr_data.corr()
+
+    # Synthesis
+    if has_va:
+        res["best_region"] = res["worst_region"] = "-"
+        if "region_academique" in df_view.columns:
+            reg_mean = df_view.groupby("region_academique")["valeur_ajoutee"].mean().dropna()
+            if not reg_mean.empty:
+                res["best_region"] = reg_mean.idxmax()
+                res["worst_region"] = reg_mean.idxmin()
+        res["sector_gap"] = None
+        if "secteur" in df_view.columns:
+            pu = df_view.loc[df_view["secteur"] == "PU", "valeur_ajoutee"].dropna()
+            pr = df_view.loc[df_view["secteur"] == "PR", "valeur_ajoutee"].dropna()
+            if len(pu) > 0 and len(pr) > 0:
+                res["sector_gap"] = pr.mean() - pu.mean()
+    return res
+
+
+@st.fragment
+def _filtered_analysis(sessions: list[str], regions: list[str], has_sector: bool, T: dict):
+    """Fragment – inputs: filter options; owns the session/region/sector filters, results come from `overview_results`."""
+    # Filters (session, regions, sector): only this fragment reruns when they change
+    st.subheader(T["filters_title"])
+    f1, f2, f3 = st.columns([1, 3, 1])
+    selected_session = f1.selectbox(T["filter_session"], sessions, index=len(sessions) - 1 if sessions else 0, key="ov_session") if sessions else None
+    selected_regions = f2.multiselect(T["filter_regions"], regions, default=regions[:5] if regions else [], key="ov_regions")
+    # Option values are language-neutral so the selection survives a language switch
+    sector_sel = f3.selectbox(
+        T["filter_sector"],
+        ["all", "PU", "PR"],
+        index=0,
+        format_func=lambda v: T["sector_all"] if v == "all" else v,
+        key="ov_sector",
+    ) if has_sector else "all"
+
+    res = overview_results(selected_session, tuple(selected_regions), sector_sel)
 
     # section 1: KPIs
     st.markdown(f"### {T['exec_title']}")
@@ -269,16 +471,14 @@ def show(df_raw=None, tables=None):
 - **sigma > 6** : Forte inégalité (disparités territoriales marquées)
 """)
     
-    if not df_view.empty:
-        mean_va = df_view["valeur_ajoutee"].mean() if "valeur_ajoutee" in df_view.columns else 0.0
-        mean_rate = df_view["taux_reussite_g"].mean() if "taux_reussite_g" in df_view.columns else 0.0
-        std_va = df_view["valeur_ajoutee"].std() if "valeur_ajoutee" in df_view.columns else 0.0
+    if res["n"]:
+        mean_va, mean_rate, std_va = res["mean_va"], res["mean_rate"], res["std_va"]
 
         c1, c2, c3, c4 = st.columns(4)
         c1.metric(T["kpi_rate"], f"{mean_rate:.1f}%")
         c2.metric(T["kpi_va"], f"{mean_va:+.2f}")
         c3.metric(T["kpi_sigma"], f"{std_va:.2f}")
-        c4.metric(T["kpi_n"], f"{len(df_view):,}")
+        c4.metric(T["kpi_n"], f"{res['n']:,}")
 
         st.markdown("---")
         if mean_va > 2:
@@ -292,57 +492,11 @@ def show(df_raw=None, tables=None):
 
     st.divider()
 
-    # section 2: TRENDS
-    st.subheader(T["trend_title"])
-    if ts is not None and not ts.empty and "valeur_ajoutee" in ts.columns and "session_str" in ts.columns:
-        ts_valid = ts["valeur_ajoutee"].dropna()
-        if len(ts_valid) >= 2:
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=ts["session_str"], y=ts["valeur_ajoutee"],
-                name=T["kpi_va"], mode="lines+markers",
-                line=dict(color="#3b82f6", width=4), marker=dict(size=10, line=dict(width=2, color='white'))
-            ))
-            if "taux_reussite_g" in ts.columns:
-                fig.add_trace(go.Scatter(
-                    x=ts["session_str"], y=ts["taux_reussite_g"],
-                    name=T["kpi_rate"], mode="lines+markers",
-                    line=dict(color="#10b981", width=4, dash="dash"),
-                    marker=dict(size=8), yaxis="y2"
-                ))
-            
-            fig.update_layout(
-                title=T["multi_title"],
-                yaxis=dict(title=T["kpi_va"], side="left", color="#2E86AB"),
-                yaxis2=dict(title=T["kpi_rate"], side="right", overlaying="y", color="#A23B72"),
-                hovermode="x unified", height=450,
-                annotations=[
-                    dict(
-                        x=0.02, y=0.98,
-                        xref="paper", yref="paper",
-                        text="📈 Rising = Improvement<br>📉 Falling = Decline",
-                        showarrow=False,
-                        bgcolor="rgba(255,255,255,0.8)",
-                        bordercolor="gray",
-                        borderwidth=1
-                    )
-                ]
-            )
-            st.plotly_chart(fig, use_container_width=True, key="trend_chart")
-            st.caption(T["multi_note"])
-        else:
-            st.info(T["insufficient_data"])
-    else:
-        st.warning(T["no_data"])
-
-    st.divider()
-
     # section 3: REGIONAL DISPARITIES
     st.subheader(T["regional_title"])
 
-    if not reg_view.empty and "valeur_ajoutee" in reg_view.columns and "region_academique" in reg_view.columns:
-        reg_sorted = reg_view.sort_values("valeur_ajoutee", ascending=False)
-        
+    reg_sorted = res["reg_sorted"]
+    if reg_sorted is not None:
         col1, col2 = st.columns(2)
         with col1:
             top_10 = reg_sorted.head(10)
@@ -355,41 +509,13 @@ def show(df_raw=None, tables=None):
             if not bottom_10.empty:
                 bar_chart(bottom_10, x="region_academique", y="valeur_ajoutee", 
                          title=T["bottom_regions"], sign_color=True)
-    
-    # Map
-    st.markdown(f"#### {T['map_title']}")
-    if not by_dep.empty and "code_departement" in by_dep.columns:
-        # Normalize codes
-        by_dep["code_departement"] = (
-            by_dep["code_departement"]
-            .astype(str)
-            .str.replace(r"\.0$", "", regex=True)
-            .str.zfill(2)
-            .replace({"201": "2A", "202": "2B"})
-        )
-        
-        value_col = "taux_reussite_g" if "taux_reussite_g" in by_dep.columns else "valeur_ajoutee"
-        if value_col in by_dep.columns:
-            geojson = load_geojson("assets/assets/fr_departements.geojson")
-            if geojson:
-                map_chart(
-                    by_departement=by_dep,
-                    geojson=geojson,
-                    featureidkey="properties.code",
-                    dep_code_col="code_departement",
-                    value_col=value_col,
-                    title=T["map_title"],
-                )
-                st.caption(T["map_caption"])
-        else:
-            st.info(T["no_data"])
 
     st.divider()
 
     # section 4: DISTRIBUTION
     st.subheader(T["dist_title"])
-    if "valeur_ajoutee" in df_view.columns and not df_view.empty:
-        va_valid = df_view["valeur_ajoutee"].dropna()
+    if res["has_va"]:
+        va_valid = res["va"]["valeur_ajoutee"].dropna()
         if len(va_valid) >= 5:
             va_mean = float(va_valid.mean())
             va_max = float(va_valid.max())
@@ -402,7 +528,7 @@ def show(df_raw=None, tables=None):
             if va_min < -5:
                 zones.append({"x0": va_min, "x1": -5, "color": "red", "opacity": 0.15, "label": T["weak_zone"]})
             
-            histogram(df_view, x="valeur_ajoutee", nbins=40, title=T["dist_title"],
+            histogram(res["va"], x="valeur_ajoutee", nbins=40, title=T["dist_title"],
                      ref_x=va_mean, ref_label=T["mean_label"],
                      threshold_zones=zones if zones else None)
             st.caption(T["dist_caption"])
@@ -415,8 +541,8 @@ def show(df_raw=None, tables=None):
 
     #section 5: SECTOR COMPARISON
     st.subheader(T["sector_title"])
-    if "secteur" in df_view.columns and "valeur_ajoutee" in df_view.columns and not df_view.empty:
-        df_sector = df_view[df_view["secteur"].isin(["PU", "PR"])].copy()
+    df_sector = res["sector"]
+    if df_sector is not None:
         if not df_sector.empty:
             fig = px.box(
                 df_sector, x="secteur", y="valeur_ajoutee",
@@ -426,25 +552,20 @@ def show(df_raw=None, tables=None):
             fig.update_traces(marker=dict(size=8))
             st.plotly_chart(fig, use_container_width=True)
         
-            from scipy import stats
-            pu = df_sector[df_sector["secteur"] == "PU"]["valeur_ajoutee"].dropna()
-            pr = df_sector[df_sector["secteur"] == "PR"]["valeur_ajoutee"].dropna()
-            
-            if len(pu) > 3 and len(pr) > 3:
-                t_stat, p_value = stats.ttest_ind(pu, pr)
+            ttest = res["ttest"]
+            if ttest is not None:
                 st.markdown(f"#### {T['sector_test']}")
                 
                 col1, col2, col3 = st.columns(3)
-                col1.metric("t-stat", f"{t_stat:.3f}")
-                col2.metric("p-value", f"{p_value:.4f}")
+                col1.metric("t-stat", f"{ttest['t']:.3f}")
+                col2.metric("p-value", f"{ttest['p']:.4f}")
                 
-                if p_value < 0.05:
-                    col3.success(T["stat_sig"].format(p=p_value))
+                if ttest["p"] < 0.05:
+                    col3.success(T["stat_sig"].format(p=ttest["p"]))
                 else:
-                    col3.info(T["stat_nsig"].format(p=p_value))
+                    col3.info(T["stat_nsig"].format(p=ttest["p"]))
                 
-                delta = pr.mean() - pu.mean()
-                st.markdown(T["sector_delta"].format(delta=delta))
+                st.markdown(T["sector_delta"].format(delta=ttest["delta"]))
                 st.caption(T["sector_caption"])
         else:
             st.info(T["no_data"])
@@ -455,36 +576,10 @@ def show(df_raw=None, tables=None):
 
     # section 6: CORRELATION MATRIX
     st.subheader(T["corrmatrix_title"])
-    numeric_cols = ["valeur_ajoutee", "taux_reussite_g", "nb_candidats_total", 
-                    "taux_brut_reussite_g", "effectif_presents_g", "effectif_admis_g"]
-    available_cols = [col for col in numeric_cols if col in df_view.columns]
-    
-    if len(available_cols) >= 2:
-        corr_data = df_view[available_cols].dropna()
-        if not corr_data.empty and len(corr_data) >= 3:
-            corr_matrix = corr_data.corr()
-            
-            # Labels
-            if T is TEXTS["fr"]:
-                label_map = {
-                    "valeur_ajoutee": "Valeur ajoutée",
-                    "taux_reussite_g": "Taux réussite",
-                    "nb_candidats_total": "Nb candidats",
-                    "taux_brut_reussite_g": "Taux brut",
-                    "effectif_presents_g": "Effectif présents",
-                    "effectif_admis_g": "Effectif admis"
-                }
-            else:
-                label_map = {
-                    "valeur_ajoutee": "Added value",
-                    "taux_reussite_g": "Pass rate",
-                    "nb_candidats_total": "Candidates",
-                    "taux_brut_reussite_g": "Raw pass rate",
-                    "effectif_presents_g": "Present",
-                    "effectif_admis_g": "Admitted"
-                }
-            
-            display_labels = [label_map.get(col, col) for col in corr_matrix.columns]
+    if len(res["corr_cols"]) >= 2:
+        corr_matrix = res["corr"]
+        if corr_matrix is not None:
+            display_labels = [CORR_LABELS["fr" if T is TEXTS["fr"] else "en"].get(col, col) for col in corr_matrix.columns]
             
             # Heatmap
             fig = go.Figure(data=go.Heatmap(
@@ -518,10 +613,10 @@ def show(df_raw=None, tables=None):
 
     # section 7: SYNTHESIS
     st.markdown(f"### {T['synthesis_title']}")
-    if not df_view.empty and "valeur_ajoutee" in df_view.columns:
-        mean_va = df_view["valeur_ajoutee"].mean()
-        std_va = df_view["valeur_ajoutee"].std()
-        mean_rate = df_view["taux_reussite_g"].mean() if "taux_reussite_g" in df_view.columns else None
+    if res["has_va"]:
+        mean_va = res["mean_va"]
+        std_va = res["std_va"]
+        mean_rate = res["mean_rate"]
         
         # VA interpretation
         if mean_va < -0.5:
@@ -531,23 +626,10 @@ def show(df_raw=None, tables=None):
         else:
             va_interp = T["va_above"]
         
-        # Best/worst 
-        best_region = worst_region = "-"
-        if "region_academique" in df_view.columns:
-            reg_mean = df_view.groupby("region_academique")["valeur_ajoutee"].mean().dropna()
-            if not reg_mean.empty:
-                best_region = reg_mean.idxmax()
-                worst_region = reg_mean.idxmin()
-        
-        # Sector gap
-        sector_gap = None
+        sector_gap = res["sector_gap"]
         sector_direction = ""
-        if "secteur" in df_view.columns:
-            pu = df_view.loc[df_view["secteur"] == "PU", "valeur_ajoutee"].dropna()
-            pr = df_view.loc[df_view["secteur"] == "PR", "valeur_ajoutee"].dropna()
-            if len(pu) > 0 and len(pr) > 0:
-                sector_gap = pr.mean() - pu.mean()
-                sector_direction = T["advantage"] if sector_gap > 0 else T["lag"]
+        if sector_gap is not None:
+            sector_direction = T["advantage"] if sector_gap > 0 else T["lag"]
         
         # Build synthesis
         st.markdown(T["synthesis_intro"].format(
@@ -559,8 +641,8 @@ def show(df_raw=None, tables=None):
         ))
         
         st.markdown(T["synthesis_regional"].format(
-            best=best_region,
-            worst=worst_region
+            best=res["best_region"],
+            worst=res["worst_region"]
         ))
         
         if sector_gap is not None:
@@ -572,3 +654,27 @@ def show(df_raw=None, tables=None):
         st.info(T["synthesis_conclusion"].format(session=selected_session or "2024"))
     else:
         st.warning(T["no_data"])
+
+
+def show(df_raw=None, tables=None):
+    T = language_selector(TEXTS)
+
+    # Header
+    st.header(T["header"])
+    st.info(T["intro"])
+
+    # Load data
+    tables = load_tables()
+
+    ts = _ensure_session_str(tables.get("timeseries"))
+    df_over = tables.get("overview", pd.DataFrame())
+
+    sessions = sorted(ts["session_str"].unique().tolist()) if (ts is not None and not ts.empty and "session_str" in ts.columns) else []
+    regions = territory_tree().names("region_academique")
+
+    # Sections are fragments; their arguments are their declared inputs.
+    # The national trend and map take no filter, so filter changes never re-render them.
+    # The map's session slider is client-side (Plotly frames), not a Streamlit widget.
+    _trend_section(ts, T)
+    _map_section(T)
+    _filtered_analysis(sessions, regions, "secteur" in df_over.columns, T)
@@ -0,0 +1,90 @@
+# sections/performance.py
+# Hidden diagnostics page (?page=Performance): not listed in the sidebar menu.
+import os
+import time
+
+import pandas as pd
+import streamlit as st
+
+from utils import oplog, session_store, telemetry, warmup
+
+# Per-session start of the view: "Reset view" hides older spans here only (the buffer is shared)
+SINCE_KEY = "perf_since"
+
+
+def show():
+    st.title("⏱️ Performance")
+    st.caption(
+        f"Process-wide telemetry (pid {os.getpid()}, last {telemetry.BUFFER_SIZE} spans) · "
+        f"RSS {telemetry.rss_bytes() / 2**20:.0f} MB"
+    )
+    if not telemetry.ENABLED:
+        st.info("Telemetry is disabled (IVAC_TELEMETRY=0).")
+        return
+
+    since = st.session_state.get(SINCE_KEY, 0.0)
+    spans = [s for s in telemetry.records() if s["ts"] >= since]
+    if since:
+        c1, c2 = st.columns([3, 1])
+        c1.caption(f"Spans since {time.strftime('%H:%M:%S', time.localtime(since))} (this view only).")
+        if c2.button("Show all spans"):
+            del st.session_state[SINCE_KEY]
+            st.rerun()
+    if not spans:
+        st.info("No spans recorded yet: browse a few pages first.")
+        return
+
+    df = pd.DataFrame(spans)
+    names = sorted(df["name"].unique().tolist())
+    c1, c2 = st.columns([3, 1])
+    selected = c1.multiselect("Spans", names, default=[], placeholder="All spans")
+    window = c2.selectbox("Window", ["All", "Last 5 min", "Last hour"], index=0)
+    if selected:
+        df = df[df["name"].isin(selected)]
+    if window != "All":
+        horizon = 300 if window == "Last 5 min" else 3600
+        df = df[df["ts"] >= pd.Timestamp.now().timestamp() - horizon]
+
+    k1, k2, k3 = st.columns(3)
+    pages = df[df["name"].str.startswith("page.")]
+    k1.metric("Spans", f"{len(df):,}")
+    k2.metric("Page renders p95", f"{pages['wall_ms'].quantile(0.95):.0f} ms" if not pages.empty else "N/A")
+    cached = df["cache"].dropna()
+    k3.metric("Cache hit ratio", f"{(cached == 'hit').mean():.0%}" if not cached.empty else "N/A")
+
+    st.subheader("Per-span latency")
+    st.dataframe(telemetry.summary(df.to_dict("records")), use_container_width=True, hide_index=True)
+
+    st.subheader("Recent spans")
+    recent = df.sort_values("ts", ascending=False).head(200).assign(
+        ts=lambda d: pd.to_datetime(d["ts"], unit="s").dt.strftime("%H:%M:%S")
+    )
+    st.dataframe(recent, use_container_width=True, hide_index=True)
+
+    st.subheader("Memory")
+    store, sandbox = session_store.totals(), oplog.cache_info()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Sessions with stored state", store["sessions"])
+    m2.metric("Session state in memory", f"{store['memory_bytes'] / 2**20:.1f} MB",
+              help=f"Largest session {store['max_session_bytes'] / 2**20:.1f} MB, budget {store['budget_bytes'] / 2**20:.0f} MB each")
+    m3.metric("Spilled to disk", f"{store['spilled_bytes'] / 2**20:.1f} MB",
+              help=f"{store['spills']} spills, {store['evictions']} evictions")
+    m4.metric("Sandbox result cache", f"{sandbox['bytes'] / 2**20:.1f} MB",
+              help=f"{sandbox['entries']}/{sandbox['max_entries']} entries, shared by all sessions")
+
+    state = warmup.status()
+    if state["timings"]:
+        st.subheader("Warm-up")
+        st.dataframe(pd.Series(state["timings"], name="seconds").to_frame(), use_container_width=True)
+
+    d1, d2 = st.columns([1, 1])
+    # Serialized on click only, not on every rerun
+    d1.download_button(
+        "⬇️ Export JSON",
+        data=lambda: telemetry.export_json(df.to_dict("records"), extra={"session_store": store, "sandbox_cache": sandbox}),
+        file_name="ivac_telemetry.json",
+        mime="application/json",
+    )
+    if d2.button("Reset view", help="Hide the spans recorded so far, in this session only"):
+        st.session_state[SINCE_KEY] = time.time()
+        st.rerun()
@@ -3,10 +3,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-from utils.io import load_data
+from utils.cache import frame_resource
+from utils import export, jobs, oplog
+from utils.session_store import session_store
+from utils.i18n import compile_catalog, current_lang, language_selector
+from utils.io import DATA_SOURCE
+from utils.knn import knn_impute
+from utils.paging import paged_table, positional_indexes, select_positions
+from utils.shared import load_tables, raw_stats
 from utils.prep import (
-    clean_ivac, info_table, validity_checks,
-    impute_numeric, impute_categorical,
+    info_table, validity_checks,
+    impute_numeric, impute_categorical, impute_grouped, group_levels, GROUP_HIERARCHY,
     drop_exact_duplicates, drop_key_duplicates
 )
 
@@ -74,10 +81,16 @@ TEXTS = {
         "filter_session": "Session",
         "filter_region": "Academic region",
         "filter_sector": "Sector",
-        "filter_rows": "Rows to display",
+        "filter_rows": "Rows per page",
+        "sort_by": "Sort by",
+        "sort_none": "Original order",
+        "descending": "Descending",
+        "page": "Page",
+        "rows_of": "Rows {start}–{end} of {total}",
         "filtered_rows": "Rows after filtering: **{n}**",
         "preview_note": "This preview reflects the standardized frame (before sandbox operations).",
-        "download_btn": "Download filtered CSV",
+        "download_btn": "Download filtered data",
+        "download_fmt": "Export format",
 
         # Sandbox
         "sandbox_title": "🧼 Interactive cleaning (apply & preview)",
@@ -93,9 +106,19 @@ TEXTS = {
         "applied_ok": "Actions applied. NA cells handled: {fixed}. Rows: {before} -> {after} (change {after_minus_before:+d}).",
         "save_btn": "Save preview (session)",
         "reset_btn": "Reset preview",
-        "save_ok": "Saved to session (key: ivac_cleaned_preview).",
+        "save_ok": "Operation log saved to session (key: ivac_cleaned_preview).",
         "reset_ok": "Preview reset.",
         "sandbox_legend": "Operations are ephemeral (kept only in the current app session).",
+        "job_queued": "Waiting for a free worker…",
+        "job_running": "Running: {step}",
+        "job_cancel": "Cancel",
+        "job_cancelling": "Cancelling…",
+        "job_cancelled": "Cleaning cancelled; the step was undone (Redo runs it again).",
+        "job_stopped": "Cleaning stopped for the current log; change a filter or use Undo / Redo to run it again.",
+        "job_failed": "Cleaning failed: {error}",
+        "undo_btn": "Undo",
+        "redo_btn": "Redo",
+        "log_line": "Operation log ({n} ops, #{hash}): {ops}",
 
         # Distributions
         "quick_title": "Quick distributions (post-cleaning preview)",
@@ -176,10 +199,16 @@ TEXTS = {
         "filter_session": "Session",
         "filter_region": "Région académique",
         "filter_sector": "Secteur",
-        "filter_rows": "Lignes à afficher",
+        "filter_rows": "Lignes par page",
+        "sort_by": "Trier par",
+        "sort_none": "Ordre d’origine",
+        "descending": "Décroissant",
+        "page": "Page",
+        "rows_of": "Lignes {start}–{end} sur {total}",
         "filtered_rows": "Lignes après filtres : **{n}**",
         "preview_note": "Cet aperçu reflète le cadre standardisé (avant la sandbox).",
-        "download_btn": "Télécharger le CSV filtré",
+        "download_btn": "Télécharger les données filtrées",
+        "download_fmt": "Format d’export",
 
         # Sandbox
         "sandbox_title": "🧼 Nettoyage interactif (appliquer & prévisualiser)",
@@ -195,9 +224,19 @@ TEXTS = {
         "applied_ok": "Actions appliquées. Cellules manquantes traitées : {fixed}. Lignes : {before} -> {after} (variation {after_minus_before:+d}).",
         "save_btn": "Sauvegarder l’aperçu (session)",
         "reset_btn": "Réinitialiser l’aperçu",
-        "save_ok": "Sauvegardé en session (clé : ivac_cleaned_preview).",
+        "save_ok": "Journal d’opérations sauvegardé en session (clé : ivac_cleaned_preview).",
         "reset_ok": "Aperçu réinitialisé.",
         "sandbox_legend": "Opérations éphémères (valables dans la session de l’app).",
+        "job_queued": "En attente d’un worker libre…",
+        "job_running": "En cours : {step}",
+        "job_cancel": "Annuler",
+        "job_cancelling": "Annulation…",
+        "job_cancelled": "Nettoyage annulé ; l’étape a été retirée (Rétablir la relance).",
+        "job_stopped": "Nettoyage interrompu pour ce journal ; modifiez un filtre ou utilisez Annuler / Rétablir pour le relancer.",
+        "job_failed": "Échec du nettoyage : {error}",
+        "undo_btn": "Annuler l’étape",
+        "redo_btn": "Rétablir",
+        "log_line": "Journal d’opérations ({n} op., #{hash}) : {ops}",
 
         # Distributions
         "quick_title": "Distributions rapides (aperçu post-nettoyage)",
@@ -217,17 +256,7 @@ TEXTS = {
     },
 }
 
-def _get_lang():
-    try:
-        return st.query_params.get("lang", "en") if st.query_params.get("lang", "en") in ("en", "fr") else "en"
-    except Exception:
-        return "en"
-
-def _set_lang(v: str):
-    try:
-        st.query_params["lang"] = v
-    except Exception:
-        pass
+compile_catalog(TEXTS)
 
 def _green_badge(text: str):
     st.markdown(
@@ -249,7 +278,7 @@ def _green_badge(text: str):
 def advanced_validity_checks(df: pd.DataFrame) -> dict:
     """Contrôles métier supplémentaires (bornes, logique, formats)."""
     issues = {}
-    d = df.copy()
+    d = df
 
     if "taux_reussite_g" in d.columns:
         bad = d["taux_reussite_g"].apply(pd.to_numeric, errors="coerce")
@@ -274,7 +303,7 @@ def advanced_validity_checks(df: pd.DataFrame) -> dict:
 def cross_validation_checks(df: pd.DataFrame) -> dict:
     """Cohérence inter-colonnes (somme candidats, format session...)."""
     issues = {}
-    d = df.copy()
+    d = df
 
     if {"nb_candidats_g", "nb_candidats_p", "nb_candidats_total"}.issubset(d.columns):
         g = pd.to_numeric(d["nb_candidats_g"], errors="coerce").fillna(0)
@@ -361,30 +390,34 @@ def quality_alerts(df: pd.DataFrame, T: dict) -> list[str]:
     return alerts
 
 
-try:
-    from sklearn.impute import KNNImputer
-    HAS_SK = True
-except Exception:
-    HAS_SK = False
+@frame_resource
+def dataset_checks(source: str = DATA_SOURCE) -> dict:
+    """Résultats de profilage au niveau du jeu complet, calculés une fois par processus."""
+    df_base = load_tables(source)["cleaned"]
+    return {
+        "raw_duplicates": raw_stats(source)["duplicates"],
+        "info": info_table(df_base),
+        "validity": validity_checks(df_base),
+        "advanced": advanced_validity_checks(df_base),
+        "cross": cross_validation_checks(df_base),
+        "score": calculate_quality_score(df_base),
+        "base_duplicates": int(df_base.duplicated().sum()),
+    }
+
 
 def impute_by_group(df: pd.DataFrame, col: str, group_by: str) -> pd.DataFrame:
-    """Impute col avec la médiane par groupe (ex: par académie)."""
-    d = df.copy()
-    if group_by in d.columns and col in d.columns:
-        d[col] = d.groupby(group_by)[col].transform(lambda x: x.fillna(x.median()))
-    return d
+    """Impute col avec la médiane par groupe (ex: par académie), repli sur les niveaux supérieurs."""
+    return impute_grouped(df, [col], group_levels(group_by), strategy="median")
 
-def apply_imputation(df: pd.DataFrame, num_cols: list[str], strategy: str, group_by: str | None):
-    """Applique diverses stratégies d'imputation sur num_cols."""
-    d = df.copy()
+def apply_imputation(df: pd.DataFrame, num_cols: list[str], strategy: str, group_by: str | None, progress=None):
+    """Applique diverses stratégies d'imputation sur num_cols (`progress(done, total)` pour le KNN)."""
+    d = df.copy(deep=False)
     if not num_cols:
         return d
 
     if group_by and group_by in d.columns and strategy in {"median", "mean"}:
-        # Imputation par groupe 
-        for c in num_cols:
-            d = impute_by_group(d, c, group_by)
-        return d
+        # Imputation par groupe : toutes les colonnes en un seul groupby, repli académie -> région -> national
+        return impute_grouped(d, num_cols, group_levels(group_by), strategy=strategy)
 
     if strategy in {"median", "mean"}:
         return impute_numeric(d, num_cols, strategy=strategy)
@@ -403,41 +436,183 @@ def apply_imputation(df: pd.DataFrame, num_cols: list[str], strategy: str, group
     if strategy == "bfill":
         return d.sort_index().fillna(method="bfill")
 
-    if strategy == "knn" and HAS_SK:
-        # Imputation KNN sur les colonnes numériques sélectionnées
-        work = d[num_cols].apply(pd.to_numeric, errors="coerce")
-        imputer = KNNImputer(n_neighbors=5, weights="distance")
-        imputed = imputer.fit_transform(work)
-        d[num_cols] = imputed
-        return d
+    if strategy == "knn":
+        # KNN par blocs académie x session (KD-tree), repli sur des blocs plus larges
+        blocks = [c for c in ("academie", "session_str") if c in d.columns]
+        return knn_impute(d, num_cols, blocks=blocks, n_neighbors=5, progress=progress)
 
-    # Si stratégie non reconnue / indisponible (ex: knn sans sklearn)
+    # Si stratégie non reconnue
     return d
 
 
-def show():
-    current = _get_lang()
-    st.sidebar.subheader(TEXTS[current]["language"])
-    choice = st.sidebar.radio(
-        label=" ",
-        options=["en", "fr"],
-        format_func=lambda x: TEXTS[x][x],
-        key="lang_selector_prof",
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-    if choice != current:
-        _set_lang(choice)
+IMPUTE_STRATEGIES = [None, "median", "mean", "mode", "ffill", "bfill", "knn"]
+# Clés de session de la sandbox : journal d'opérations et journal sauvegardé (session_store, budget
+# mémoire par session), job en cours (hash, job, journal poussé ou None) et hash d'un rejeu interrompu
+# directement en session_state
+LOG_KEY, JOB_KEY, SAVED_KEY, STOPPED_KEY = "sandbox_log", "sandbox_job", "ivac_cleaned_preview", "sandbox_stopped"
+
+
+def apply_op(df: pd.DataFrame, op: oplog.Op, progress=None) -> pd.DataFrame:
+    """Exécute une opération du journal de la sandbox (filter, impute, impute_cat, dedupe)."""
+    kind, params = op
+    p = dict(params)
+    if kind == "filter":
+        for col, values in (("session", p["session"]), ("region_academique", p["region"]), ("secteur", p["sector"])):
+            if values and col in df.columns:
+                df = df[df[col].isin(values)]
+        return df
+    if kind == "impute":
+        num_cols = df.select_dtypes("number").columns.tolist()
+        return apply_imputation(df, num_cols, p["strategy"], p["group_by"], progress=progress)
+    if kind == "impute_cat":
+        return impute_categorical(df, df.select_dtypes(exclude="number").columns.tolist())
+    if kind == "dedupe":
+        return drop_key_duplicates(df) if p["by"] == "key" else drop_exact_duplicates(df)
+    raise ValueError(f"Unknown sandbox op: {kind}")
+
+
+def _replay_job(job: jobs.Job, base: pd.DataFrame, ops: tuple) -> None:
+    """Rejoue le journal en tâche de fond ; le résultat va dans le cache partagé (pas en session)."""
+    oplog.replay(DATA_SOURCE, base, ops, apply_op, report=job.report)
+
+
+def saved_preview(base: pd.DataFrame) -> pd.DataFrame | None:
+    """Aperçu sauvegardé, reconstruit depuis son journal (cache partagé, sinon rejeu) ; None sans sauvegarde."""
+    ops = session_store().get(SAVED_KEY)
+    if not ops:
+        return None
+    return oplog.replay(DATA_SOURCE, base, ops, apply_op)
+
+
+@st.fragment(run_every=0.5)
+def _sandbox_job_status(T: dict):
+    """Progression du job de la sandbox (rafraîchie seule) ; relance la page quand il se termine."""
+    entry = st.session_state.get(JOB_KEY)
+    if entry is None:
+        return
+    job = entry[1]
+    if job.finished:
         st.rerun()
-    T = TEXTS[choice]
+    label = T["job_queued"] if job.state == "queued" else T["job_running"].format(step=job.step or "…")
+    st.progress(job.progress, text=T["job_cancelling"] if job.cancelling else label)
+    if st.button(T["job_cancel"], key="sandbox_cancel", disabled=job.cancelling):
+        job.cancel()
+
+
+def _sandbox_section(df_base: pd.DataFrame, df_view: pd.DataFrame, filter_op: oplog.Op, sample_n: int, T: dict) -> pd.DataFrame:
+    """
+    Sandbox de nettoyage. La session ne garde que le journal d'opérations (undo/redo) ;
+    les résultats sont rejoués depuis la base partagée et mis en cache par hash du journal.
+    Renvoie l'aperçu courant.
+    """
+    st.subheader(T["sandbox_title"])
+    st.caption(T["sandbox_note"])
+    store = session_store()
+    log = store.get(LOG_KEY, oplog.OpLog())
+
+    # Un job terminé est récupéré ici. S'il venait d'« Appliquer » et que le journal n'a pas bougé,
+    # une annulation ou un échec retire l'étape poussée (rejouable via redo) ; un rejeu (filtre,
+    # undo/redo) garde le journal de l'utilisateur et n'est pas relancé tant que le journal est le même
+    entry = st.session_state.get(JOB_KEY)
+    if entry is not None and entry[1].finished:
+        del st.session_state[JOB_KEY]
+        key, job, pushed = entry
+        entry = None
+        if job.state in ("cancelled", "failed"):
+            if pushed is not None and pushed == log:
+                log = log.undo()
+                if job.state == "cancelled":
+                    st.info(T["job_cancelled"])
+            else:
+                st.session_state[STOPPED_KEY] = key
+            if job.state == "failed":
+                st.error(T["job_failed"].format(error=job.error))
+
+    c1, c2 = st.columns(2)
+    strategy = c1.selectbox(T["imp_num"], IMPUTE_STRATEGIES, format_func=lambda s: s or T["imp_none"], key="sandbox_strategy")
+    groups = [None] + [g for g in GROUP_HIERARCHY if g in df_view.columns]
+    group_by = c2.selectbox(T["group_by"], groups, format_func=lambda g: g or T["group_none"], key="sandbox_group")
+    c3, c4, c5 = st.columns(3)
+    impute_cat = c3.checkbox(T["imp_cat"], key="sandbox_imp_cat")
+    drop_exact = c4.checkbox(T["drop_exact"], key="sandbox_drop_exact")
+    drop_key = c5.checkbox(T["drop_key"], key="sandbox_drop_key")
+
+    b1, b2, b3, b4, b5 = st.columns(5)
+    pushed = None
+    if b1.button(T["apply_btn"], type="primary"):
+        ops = []
+        if strategy:
+            ops.append(oplog.make_op("impute", strategy=strategy, group_by=group_by))
+        if impute_cat:
+            ops.append(oplog.make_op("impute_cat"))
+        if drop_exact:
+            ops.append(oplog.make_op("dedupe", by="exact"))
+        if drop_key:
+            ops.append(oplog.make_op("dedupe", by="key"))
+        log = log.push(ops)
+        pushed = log if ops else None
+    if b2.button(T["undo_btn"], disabled=not log.can_undo):
+        log = log.undo()
+    if b3.button(T["redo_btn"], disabled=not log.can_redo):
+        log = log.redo()
+    save = b4.button(T["save_btn"])
+    if b5.button(T["reset_btn"]):
+        log = oplog.OpLog()
+        store.pop(SAVED_KEY)
+        st.info(T["reset_ok"])
+    store.put(LOG_KEY, log)
+
+    preview = df_view
+    if log.ops:
+        ops = (filter_op,) + log.ops
+        key = oplog.log_hash(DATA_SOURCE, ops)
+        st.caption(T["log_line"].format(n=len(log.ops), hash=key[:8], ops=" -> ".join(map(oplog.describe, log.ops))))
+        result = oplog.cached(DATA_SOURCE, ops)
+        if result is None:
+            # Résultat absent du cache : (re)lancer le rejeu, en remplaçant un job devenu obsolète
+            if entry is not None and entry[0] != key:
+                entry[1].cancel()
+                del st.session_state[JOB_KEY]
+                entry = None
+            if entry is None and st.session_state.get(STOPPED_KEY) == key:
+                st.info(T["job_stopped"])
+            else:
+                if entry is None:
+                    st.session_state.pop(STOPPED_KEY, None)
+                    st.session_state[JOB_KEY] = (key, jobs.submit("sandbox", _replay_job, df_base, ops), pushed)
+                _sandbox_job_status(T)
+        else:
+            if entry is not None:
+                entry[1].cancel()
+                del st.session_state[JOB_KEY]
+            preview = result
+            st.success(T["applied_ok"].format(
+                fixed=int(df_view.isna().sum().sum() - result.isna().sum().sum()),
+                before=len(df_view), after=len(result), after_minus_before=len(result) - len(df_view),
+            ))
+            paged_table(result, T, "sandbox_preview", key, page_size=sample_n)
+            if save:
+                store.put(SAVED_KEY, ops)
+                st.success(T["save_ok"])
+    elif entry is not None:
+        entry[1].cancel()
+        del st.session_state[JOB_KEY]
+    st.caption(T["sandbox_legend"])
+    return preview
+
+
+def show():
+    T = language_selector(TEXTS)
+    choice = current_lang()
 
     st.header(T["title"])
     st.markdown(T["intro"])
 
     #  Load + clean baseline
-    df_raw = load_data()
-    df_base = clean_ivac(df_raw)
-    rows_raw, cols_raw = df_raw.shape
+    raw = raw_stats()
+    df_base = load_tables()["cleaned"]
+    checks = dataset_checks()
+    rows_raw, cols_raw = raw["rows"], len(raw["columns"])
     rows_clean, cols_clean = df_base.shape
 
 
@@ -450,9 +625,9 @@ def show():
         s = _re.sub(r"_+", "_", s).strip("_")
         return s
 
-    raw_norm = {_to_snake(c): c for c in df_raw.columns}
+    raw_norm = {_to_snake(c): c for c in raw["columns"]}
     added = [c for c in df_base.columns if c not in raw_norm]
-    dropped = [c for c in df_raw.columns if _to_snake(c) not in set(df_base.columns)]
+    dropped = [c for c in raw["columns"] if _to_snake(c) not in set(df_base.columns)]
     renamed = [(raw_norm[c], c) for c in df_base.columns if c in raw_norm and raw_norm[c] != c]
 
     # KPIs
@@ -461,7 +636,7 @@ def show():
     with c2:
         st.metric(T["kpi_cols"], f"{cols_raw} -> {cols_clean}")
         _green_badge(T["badge_label"].format(added=len(added), dropped=len(dropped), net=cols_clean - cols_raw))
-    c3.metric(T["kpi_dups"], f"{int(df_raw.duplicated().sum())}")
+    c3.metric(T["kpi_dups"], f"{checks['raw_duplicates']}")
     c4.metric(T["kpi_uai"], str(df_base["uai"].nunique()) if "uai" in df_base.columns else "N/A")
    
     # Donut colonne
@@ -491,7 +666,7 @@ def show():
 
     #  Schema (types & non-null)
     st.subheader(T["schema_only_title"])
-    schema = info_table(df_base)[["Non-Null Count", "Null Count", "Dtype", "Null_Pct"]]
+    schema = checks["info"][["Non-Null Count", "Null Count", "Dtype", "Null_Pct"]]
     st.dataframe(schema, use_container_width=True)
     st.caption(T["schema_legend"])
 
@@ -511,7 +686,7 @@ def show():
 
     # Validity (
     st.subheader(T["valid_title"])
-    base_checks = validity_checks(df_raw)
+    base_checks = checks["validity"]
     total_issues = sum(base_checks["summary"].values())
     if total_issues == 0:
         st.success(T["valid_ok"])
@@ -525,7 +700,7 @@ def show():
 
     st.subheader(T["adv_valid_title"])
     st.caption(T["adv_valid_note"])
-    adv = advanced_validity_checks(df_base)
+    adv = checks["advanced"]
     if len(adv) == 0:
         st.success(T["valid_ok"])
     else:
@@ -537,7 +712,7 @@ def show():
 
     st.subheader(T["cross_title"])
     st.caption(T["cross_note"])
-    cross = cross_validation_checks(df_base)
+    cross = checks["cross"]
     if len(cross) == 0:
         st.success(T["valid_ok"])
     else:
@@ -551,7 +726,7 @@ def show():
 
     
     st.subheader(T["quality_title"])
-    score = calculate_quality_score(df_base)
+    score = checks["score"]
     st.metric(T["quality_title"], f"{score}/100")
     alerts = quality_alerts(df_base, T)
     if alerts:
@@ -576,17 +751,31 @@ def show():
     sel_sector  = colf3.multiselect(T["filter_sector"], sectors)
     sample_n    = colf4.slider(T["filter_rows"], min_value=50, max_value=500, value=200, step=50)
 
-    df_view = df_base.copy()
-    if sel_session: df_view = df_view[df_view["session"].isin(sel_session)]
-    if sel_region:  df_view = df_view[df_view["region_academique"].isin(sel_region)]
-    if sel_sector:  df_view = df_view[df_view["secteur"].isin(sel_sector)]
+    filter_op = oplog.make_op("filter", session=sel_session, region=sel_region, sector=sel_sector)
+    df_view = apply_op(df_base, filter_op)
 
     st.caption(T["filtered_rows"].format(n=f"{len(df_view):,}".replace(",", " ")))
-    st.dataframe(df_view.head(sample_n), use_container_width=True)
+    # Aperçu paginé côté serveur : positions via l'index positionnel, seule la page visible est envoyée
+    selection = oplog.log_hash(DATA_SOURCE, (filter_op,))
+    positions = select_positions(df_base, positional_indexes(), {
+        "session_str": sel_session, "region_academique": sel_region, "secteur": sel_sector,
+    })
+    paged_table(df_base, T, "profiling_preview", selection, positions, page_size=sample_n)
     st.caption(T["preview_note"])
 
-    csv_bytes = df_view.to_csv(index=False).encode("utf-8")
-    st.download_button(T["download_btn"], data=csv_bytes, file_name="ivac_filtered.csv", mime="text/csv")
+    # Export à la demande : rien n'est sérialisé avant le clic, fichier mis en cache par sélection
+    cd1, cd2 = st.columns([1, 3])
+    fmt = cd1.selectbox(T["download_fmt"], list(export.FORMATS), key="export_fmt", label_visibility="collapsed")
+    cd2.download_button(
+        T["download_btn"],
+        data=export.download_data(selection, lambda: df_view, fmt),
+        file_name=export.file_name("ivac_filtered", fmt),
+        mime=export.mime(fmt),
+    )
+
+    st.divider()
+
+    df_preview = _sandbox_section(df_base, df_view, filter_op, sample_n, T)
 
     st.divider()
 
@@ -633,11 +822,11 @@ def show():
 
     cols = st.columns(2)
     with cols[0]:
-        if "valeur_ajoutee" in df_view.columns:
-            plot_hist(df_view["valeur_ajoutee"], T["dist_va"])
+        if "valeur_ajoutee" in df_preview.columns:
+            plot_hist(df_preview["valeur_ajoutee"], T["dist_va"])
     with cols[1]:
-        if "nb_candidats_total" in df_view.columns:
-            plot_hist(df_view["nb_candidats_total"], T["dist_total"])
+        if "nb_candidats_total" in df_preview.columns:
+            plot_hist(df_preview["nb_candidats_total"], T["dist_total"])
 
     st.caption(T["dist_legend"])
 
@@ -673,9 +862,9 @@ def show():
             "Value": [
                 len(df),
                 len(df.columns),
-                int(df.duplicated().sum()),
+                checks["base_duplicates"],
                 f"{miss_pct:.1f}%",
-                calculate_quality_score(df),
+                checks["score"],
             ]
         })
 
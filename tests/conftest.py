@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# Run from anywhere: the app modules are imported as `utils.*` / `sections.*`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
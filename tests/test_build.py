@@ -0,0 +1,52 @@
+# tests/test_build.py
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utils.artifacts import LATEST, SCHEMA_VERSION, read_manifest, read_tables, resolve_bundle
+from utils.build import TABLES, _sha256, build_bundle
+from utils.io import DATA_SOURCE, load_data
+from utils.prep import build_tables, clean_ivac
+from utils.viz import TREND_TEXTS, trend_figure
+
+pytestmark = pytest.mark.skipif(not Path(DATA_SOURCE).exists(), reason="IVAC dataset not available")
+
+
+def _nulls_as_none(df: pd.DataFrame) -> pd.DataFrame:
+    """Parquet reads missing strings back as None; compare values, not the null spelling."""
+    return df.astype(object).where(df.notna(), None)
+
+
+@pytest.fixture(scope="module")
+def bundle(tmp_path_factory) -> Path:
+    return build_bundle(tmp_path_factory.mktemp("artifacts"), DATA_SOURCE)
+
+
+def test_manifest_is_resolved_from_the_artifacts_root(bundle):
+    assert (bundle.parent / LATEST).read_text(encoding="utf-8") == bundle.name
+    assert resolve_bundle(bundle.parent) == bundle
+    manifest = read_manifest(bundle)
+    assert manifest["schema_version"] == SCHEMA_VERSION
+    assert manifest["tables"] == list(TABLES)
+    for name, entry in manifest["files"].items():
+        path = bundle / entry["path"]
+        assert path.stat().st_size == entry["bytes"] and _sha256(path) == entry["sha256"], name
+    assert not list(bundle.parent.glob(".*.tmp"))
+
+
+def test_read_tables_loads_back_the_built_tables(bundle):
+    expected = build_tables(clean_ivac(load_data.__wrapped__(DATA_SOURCE)))
+    tables = read_tables(bundle)
+    assert set(tables) == set(TABLES) | {"overview"}
+    for name in TABLES:
+        pd.testing.assert_frame_equal(_nulls_as_none(tables[name]), _nulls_as_none(expected[name].reset_index(drop=True)))
+    assert read_manifest(bundle)["rows"]["cleaned"] == len(tables["cleaned"])
+
+
+def test_trend_figures_match_the_live_builder(bundle):
+    ts = read_tables(bundle)["timeseries"]
+    for lang in TREND_TEXTS:
+        baked = json.loads((bundle / "figures" / f"trend_{lang}.json").read_text(encoding="utf-8"))
+        assert baked == json.loads(trend_figure(ts, lang).to_json())
@@ -0,0 +1,44 @@
+# tests/test_departments.py
+import pandas as pd
+import pytest
+
+from utils.departments import build_department_dim, canonical_code, is_overseas, join_features
+
+
+@pytest.mark.parametrize("raw, code", [
+    ("01", "01"), ("1", "01"), (1, "01"), ("1.0", "01"), ("075", "75"), (75, "75"),
+    ("2A", "2A"), ("2b", "2B"), ("201", "2A"), ("202", "2B"), ("20A", "2A"),
+    ("971", "971"), ("976", "976"), ("20", "20"),
+])
+def test_canonical_code(raw, code):
+    assert canonical_code(raw) == code
+
+
+def test_overseas_codes():
+    assert is_overseas("971") and is_overseas("976")
+    assert not is_overseas("97") and not is_overseas("2A") and not is_overseas("75")
+
+
+def test_join_features_splits_matched_and_unmatched_rows():
+    features = ["01", "2A", "2B", "75"]
+    frame = pd.DataFrame({
+        "code_departement": ["1", "01", "201", "2B", "075", "971", "20", "99"],
+        "valeur_ajoutee": range(8),
+    })
+    dim = build_department_dim(frame["code_departement"], features)
+
+    # One integer key per canonical department, whatever the spelling
+    keys = dim.set_index("raw_code")["dep_key"]
+    assert keys["1"] == keys["01"] and keys["201"] != keys["2B"]
+
+    matched, unmatched = join_features(frame, dim)
+    assert matched["code_departement"].tolist() == ["01", "01", "2A", "2B", "75"]
+    assert matched["valeur_ajoutee"].tolist() == [0, 1, 2, 3, 4]
+    assert unmatched["code_departement"].tolist() == ["971", "20", "99"]
+
+
+def test_codes_missing_from_the_dimension_are_unmatched():
+    dim = build_department_dim(["01"], ["01"])
+    matched, unmatched = join_features(pd.DataFrame({"code_departement": ["01", "02"]}), dim)
+    assert matched["code_departement"].tolist() == ["01"]
+    assert unmatched["code_departement"].tolist() == ["02"]
@@ -0,0 +1,80 @@
+# tests/test_export.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import export
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(export, "CHUNK_ROWS", 3)  # several chunks even for a small frame
+    return tmp_path
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "uai": [f"0750{i:03d}A" for i in range(10)],
+        "session": np.arange(2014, 2024),
+        "valeur_ajoutee": np.linspace(-3, 3, 10),
+        "commune": ["Paris", "Évry", np.nan, "Lyon", "Nice", "Metz", "Caen", "Lille", "Brest", "Pau"],
+    })
+
+
+@pytest.mark.parametrize("fmt, read", [
+    ("csv", lambda p: pd.read_csv(p, dtype={"uai": str})),
+    ("csv.gz", lambda p: pd.read_csv(p, compression="gzip", dtype={"uai": str})),
+    ("parquet", lambda p: pd.read_parquet(p).fillna({"commune": np.nan})),
+])
+def test_export_round_trip(df, fmt, read):
+    path = export.export_file("sel", lambda: df, fmt)
+    pd.testing.assert_frame_equal(read(path), df, check_dtype=False)
+
+
+def test_export_is_written_once_per_selection(df):
+    calls = []
+
+    def frame():
+        calls.append(1)
+        return df
+
+    first = export.export_file("sel", frame, "csv.gz")
+    assert export.export_file("sel", frame, "csv.gz") == first
+    assert len(calls) == 1
+    assert export.download_data("sel", frame, "csv.gz")() == first.read_bytes()
+    assert len(calls) == 1
+
+
+def test_failed_write_leaves_no_export_nor_temp_file(df, cache_dir, monkeypatch):
+    def broken(frame, fmt, path):
+        path.write_text("partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(export, "_write", broken)
+    with pytest.raises(OSError):
+        export.export_file("sel", lambda: df, "csv")
+    assert list(cache_dir.iterdir()) == []
+
+    monkeypatch.undo()
+    monkeypatch.setattr(export, "CACHE_DIR", cache_dir)
+    assert export.export_file("sel", lambda: df, "csv").exists()
+
+
+def test_unknown_format_is_rejected(df):
+    with pytest.raises(ValueError):
+        export.export_file("sel", lambda: df, "xlsx")
+
+
+def test_prune_keeps_the_most_recent_files(df, cache_dir, monkeypatch):
+    monkeypatch.setattr(export, "MAX_FILES", 2)
+    paths = []
+    for i in range(4):
+        path = export.export_file(f"sel{i}", lambda: df, "csv")
+        os.utime(path, (1_000_000 + i, 1_000_000 + i))
+        paths.append(path)
+    export._prune()
+    assert sorted(cache_dir.glob("*.export")) == sorted(paths[2:])
@@ -0,0 +1,78 @@
+# tests/test_geo.py
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.geo import MAP_SPAN_DEG, RESOLUTIONS, load_geojson, resolution_for, simplify_geojson
+
+ASSET = Path(__file__).resolve().parent.parent / "assets" / "assets" / "fr_departements.geojson"
+
+
+@pytest.mark.parametrize("height, level", [(200, "low"), (400, "low"), (600, "medium"), (1000, "high"), (4000, "high")])
+def test_resolution_for_picks_the_coarsest_level_within_1_5_px(height, level):
+    assert resolution_for(height) == level
+    tolerance = RESOLUTIONS[level][0]
+    assert tolerance <= 1.5 * MAP_SPAN_DEG / height or level == "high"
+
+
+def _wiggly_grid(n: int = 3, steps: int = 40) -> dict:
+    """n x n unit cells whose shared borders are the same noisy polylines (many vertices)."""
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 1, steps)
+    taper = np.sin(np.pi * t)  # corners stay on the unit grid
+    vertical = {i: rng.normal(scale=0.01, size=steps) * taper * (0 < i < n) for i in range(n + 1)}
+    horizontal = {j: rng.normal(scale=0.01, size=steps) * taper * (0 < j < n) for j in range(n + 1)}
+    features = []
+    for i in range(n):
+        for j in range(n):
+            bottom = [(i + s, j + horizontal[j][k]) for k, s in enumerate(t)]
+            right = [(i + 1 + vertical[i + 1][k], j + s) for k, s in enumerate(t)]
+            top = [(i + s, j + 1 + horizontal[j + 1][k]) for k, s in enumerate(t)][::-1]
+            left = [(i + vertical[i][k], j + s) for k, s in enumerate(t)][::-1]
+            ring = bottom + right[1:] + top[1:] + left[1:]
+            features.append({
+                "type": "Feature",
+                "properties": {"code": f"{i}{j}"},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _shapes(geojson: dict) -> list:
+    from shapely.geometry import shape
+    return [shape(f["geometry"]) for f in geojson["features"]]
+
+
+def _assert_coverage_kept(original: dict, simplified: dict) -> None:
+    import shapely
+
+    before, after = _shapes(original), _shapes(simplified)
+    assert [f["properties"] for f in simplified["features"]] == [f["properties"] for f in original["features"]]
+    assert all(g.is_valid and not g.is_empty for g in after)
+    # Edge-matched and non-overlapping: no gaps opened between neighbours
+    assert shapely.coverage_is_valid(after)
+    union = shapely.union_all(after)
+    assert abs(sum(g.area for g in after) - union.area) < 1e-9 * union.area
+    # Neighbours still share an edge (not just a corner)
+    tree = shapely.STRtree(before)
+    left, right = tree.query(before, predicate="touches")
+    for a, b in zip(left, right):
+        if before[a].intersection(before[b]).length > 0:
+            assert after[a].intersection(after[b]).length > 0
+
+
+def test_coverage_simplification_keeps_shared_edges():
+    grid = _wiggly_grid()
+    simplified = simplify_geojson(grid, 0.05, decimals=4)
+    _assert_coverage_kept(grid, simplified)
+    vertices = sum(len(f["geometry"]["coordinates"][0]) for f in simplified["features"])
+    assert vertices < sum(len(f["geometry"]["coordinates"][0]) for f in grid["features"]) / 4
+
+
+@pytest.mark.skipif(not ASSET.exists(), reason="department GeoJSON not available")
+@pytest.mark.parametrize("level", list(RESOLUTIONS))
+def test_department_shapes_keep_shared_borders(level):
+    geojson = load_geojson.__wrapped__(str(ASSET))
+    tolerance, decimals = RESOLUTIONS[level]
+    _assert_coverage_kept(geojson, simplify_geojson(geojson, tolerance, decimals=decimals))
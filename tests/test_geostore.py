@@ -0,0 +1,59 @@
+# tests/test_geostore.py
+import json
+from pathlib import Path
+
+import pytest
+import shapely
+from shapely.geometry import shape
+
+from utils.geo import load_geojson
+from utils.geostore import GeometryStore, write_store
+
+ASSET = Path(__file__).resolve().parent.parent / "assets" / "assets" / "fr_departements.geojson"
+
+
+def _collection() -> dict:
+    squares = {"01": (0, 0), "2A": (1, 0), "971": (5, 5)}
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"code": code, "nom": f"Département {code}"},
+            "geometry": shapely.geometry.mapping(shapely.box(x, y, x + 1, y + 1)),
+        }
+        for code, (x, y) in squares.items()
+    ]
+    features.append({
+        "type": "Feature",
+        "properties": {"code": "29", "nom": "Finistère"},
+        "geometry": shapely.geometry.mapping(shapely.MultiPolygon([shapely.box(2, 0, 3, 1), shapely.box(2, 2, 2.5, 2.5)])),
+    })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def test_wkb_store_round_trips_codes_properties_and_shapes(tmp_path):
+    geojson = _collection()
+    store = GeometryStore(write_store(geojson, tmp_path / "store.parquet"))
+
+    assert len(store) == 4
+    assert list(store.codes) == ["01", "2A", "971", "29"]
+    out = store.geojson()
+    for before, after in zip(geojson["features"], out["features"]):
+        assert after["properties"] == before["properties"]
+        assert shape(after["geometry"]).equals(shape(before["geometry"]))
+    # Plotly-ready: plain JSON-serializable dicts
+    json.dumps(out)
+
+
+def test_geojson_subset_by_code(tmp_path):
+    store = GeometryStore(write_store(_collection(), tmp_path / "store.parquet"))
+    subset = store.geojson(["29", "01", "unknown"])
+    assert [f["properties"]["code"] for f in subset["features"]] == ["01", "29"]
+    assert store.geojson([])["features"] == []
+
+
+@pytest.mark.skipif(not ASSET.exists(), reason="department GeoJSON not available")
+def test_department_store_keeps_every_feature_code(tmp_path):
+    geojson = load_geojson.__wrapped__(str(ASSET))
+    store = GeometryStore(write_store(geojson, tmp_path / "departements.parquet"))
+    assert list(store.codes) == [str(f["properties"]["code"]) for f in geojson["features"]]
+    assert all(a.equals(shape(f["geometry"])) for a, f in zip(store.geometries, geojson["features"]))
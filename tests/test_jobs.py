@@ -0,0 +1,97 @@
+# tests/test_jobs.py
+import threading
+
+import pytest
+
+from utils import jobs
+
+TIMEOUT = 5
+
+
+def _steps(job, n, started, proceed):
+    """Fake job: reports after each step and blocks on `proceed` after the first one."""
+    for i in range(n):
+        job.report(i / n, f"step {i}")
+        if i == 0:
+            started.set()
+            assert proceed.wait(TIMEOUT)
+    job.report(1.0, "done")
+    return n * 10
+
+
+def _wait(job):
+    job._future.result(timeout=TIMEOUT)
+    return job
+
+
+def test_job_runs_to_done_with_progress_and_result():
+    started, proceed = threading.Event(), threading.Event()
+    job = jobs.submit("fake", _steps, 4, started, proceed)
+    assert started.wait(TIMEOUT)
+    assert job.state == "running" and job.step == "step 0" and job.progress == 0.0
+    assert not job.finished and not job.cancelling
+
+    proceed.set()
+    _wait(job)
+    assert job.state == "done" and job.finished
+    assert job.progress == 1.0 and job.step == "done"
+    assert job.result == 40 and job.error is None
+    assert job.finished_at >= job.submitted_at
+
+
+def test_cancel_raises_at_the_next_report():
+    started, proceed = threading.Event(), threading.Event()
+    job = jobs.submit("fake", _steps, 4, started, proceed)
+    assert started.wait(TIMEOUT)
+    job.cancel()
+    assert job.cancelling and job.state == "running"
+
+    proceed.set()
+    _wait(job)
+    assert job.state == "cancelled" and job.finished and not job.cancelling
+    assert job.step == "step 0"  # the report after cancel() raised before recording anything
+    assert job.result is None
+
+
+def test_report_clamps_and_raises_after_cancel():
+    job = jobs.Job("direct")
+    job.report(1.5)
+    assert job.progress == 1.0
+    job.report(-1, "start")
+    assert (job.progress, job.step) == (0.0, "start")
+    job.cancel()
+    with pytest.raises(jobs.JobCancelled):
+        job.report(0.5)
+    assert job.progress == 0.0
+
+
+def test_failed_job_keeps_the_error():
+    def boom(job):
+        job.report(0.5)
+        raise ValueError("bad input")
+
+    job = _wait(jobs.submit("boom", boom))
+    assert job.state == "failed" and job.finished
+    assert job.error == "ValueError: bad input" and job.progress == 0.5
+
+
+def test_job_cancelled_while_queued_never_starts():
+    blocker, release = threading.Event(), threading.Event()
+
+    def hold(job):
+        blocker.set()
+        release.wait(TIMEOUT)
+
+    ran = []
+    holders = [jobs.submit("hold", hold) for _ in range(jobs.MAX_WORKERS)]
+    try:
+        assert blocker.wait(TIMEOUT)
+        queued = jobs.submit("queued", lambda job: ran.append(1))
+        assert queued.state == "queued"
+        queued.cancel()
+        assert queued.state == "cancelled" and queued.finished
+    finally:
+        release.set()
+    for h in holders:
+        _wait(h)
+    assert ran == []
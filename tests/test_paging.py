@@ -0,0 +1,50 @@
+# tests/test_paging.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.paging import fetch_page, select_positions, sorted_positions
+from utils.prep import build_indexes
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "session": [2022, 2023, 2022, 2024, 2023, 2023],  # non-string labels
+        "region_academique": ["Bretagne", "Occitanie", "Occitanie", "Bretagne", "Bretagne", None],
+        "secteur": ["PU", "PR", "PU", "PU", "PR", "PU"],
+        "valeur_ajoutee": [1.0, np.nan, -2.0, 3.0, 0.5, -1.0],
+    })
+
+
+@pytest.fixture
+def indexes(df):
+    return build_indexes(df, cols=("session", "region_academique"))
+
+
+def test_non_string_labels_match_through_the_index(df, indexes):
+    assert list(indexes["session"]["value"]) == ["2022", "2023", "2024"]
+    assert list(select_positions(df, indexes, {"session": [2023]})) == [1, 4, 5]
+    assert list(select_positions(df, indexes, {"session": ["2022", 2024]})) == [0, 2, 3]
+
+
+def test_filters_combine_index_and_mask(df, indexes):
+    positions = select_positions(df, indexes, {"session": [2023], "region_academique": ["Bretagne"], "secteur": ["PR"]})
+    assert list(positions) == [4]
+    # Same answer as a plain boolean mask
+    mask = df["session"].eq(2023) & df["region_academique"].eq("Bretagne") & df["secteur"].eq("PR")
+    assert list(positions) == list(np.flatnonzero(mask))
+
+
+def test_empty_filters_mean_all_rows(df, indexes):
+    assert select_positions(df, indexes, {"session": [], "unknown": ["x"]}) is None
+    assert len(select_positions(df, indexes, {"session": [1999]})) == 0
+
+
+def test_sorted_positions_and_pages(df):
+    order = sorted_positions.__wrapped__("k", "valeur_ajoutee", True, df, np.array([0, 1, 2, 3]))
+    assert list(order) == [2, 0, 3, 1]  # NaN last
+    assert list(sorted_positions.__wrapped__("k", None, True, df, None)) == list(range(len(df)))
+    descending = sorted_positions.__wrapped__("k", "valeur_ajoutee", False, df, None)
+    assert list(fetch_page(df, descending, 1, size=2).index) == [3, 0]
+    assert list(fetch_page(df, descending, 3, size=2).index) == [2, 1]
@@ -0,0 +1,83 @@
+# tests/test_points.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import points
+from utils.points import hexbin
+
+SIZE = 0.5
+
+
+def _centre(q, r):
+    """Centre of axial hexagon (q, r) in the projected plane."""
+    return SIZE * (np.sqrt(3) * q + np.sqrt(3) / 2 * r), SIZE * 1.5 * r
+
+
+def _bin(lon, lat, values=None) -> pd.DataFrame:
+    """hexbin on points placed symmetrically around lat 0, so the projection is the identity."""
+    values = np.full(len(lon), np.nan) if values is None else np.asarray(values, dtype="float64")
+    out = hexbin(np.asarray(lon, dtype="float64"), np.asarray(lat, dtype="float64"), values, SIZE)
+    return out.round(9).sort_values(["lat", "lon"]).reset_index(drop=True)
+
+
+def test_points_on_centres_keep_their_hexagon():
+    cells = [(0, 0), (0, 0), (1, 0), (0, 1), (0, -1)]
+    lon, lat = zip(*[_centre(q, r) for q, r in cells])
+    out = _bin(lon, lat, [1.0, 3.0, 5.0, np.nan, 7.0])
+
+    assert len(out) == 4 and out["count"].sum() == 5
+    origin = out[(out["lon"] == 0) & (out["lat"] == 0)].iloc[0]
+    assert origin["count"] == 2 and origin["mean"] == 2.0
+    assert out["mean"].isna().sum() == 1  # (0, 1) only holds a NaN value
+    expected = pd.DataFrame([_centre(q, r) for q, r in set(cells)], columns=["lon", "lat"]).round(9)
+    pd.testing.assert_frame_equal(out[["lon", "lat"]], expected.sort_values(["lat", "lon"]).reset_index(drop=True))
+
+
+@pytest.mark.parametrize("toward", [(1, 0), (0, 1), (1, -1)])
+def test_points_just_past_an_edge_change_hexagon(toward):
+    x1, y1 = _centre(*toward)
+    # Just inside the origin hexagon, then just past the edge it shares with `toward`;
+    # mirrored points keep the mean latitude at 0
+    lon = [0.49 * x1, 0.51 * x1, -0.49 * x1, -0.51 * x1]
+    lat = [0.49 * y1, 0.51 * y1, -0.49 * y1, -0.51 * y1]
+    out = _bin(lon, lat)
+
+    centres = set(zip(out["lon"], out["lat"]))
+    assert centres == {(0.0, 0.0), (round(x1, 9), round(y1, 9)), (round(-x1, 9), round(-y1, 9))}
+    assert out.set_index(["lon", "lat"]).loc[(0.0, 0.0), "count"] == 2
+
+
+def test_cube_rounding_matches_the_nearest_centre():
+    rng = np.random.default_rng(0)
+    lon, lat = rng.uniform(-3, 3, 2000), rng.uniform(40, 50, 2000)
+    out = hexbin(lon, lat, np.ones(len(lon)), SIZE)
+
+    # Hexagons are the Voronoi cells of their centres: compare with a brute-force nearest centre
+    lat0 = np.deg2rad(lat.mean())
+    qs, rs = np.meshgrid(np.arange(-40, 41), np.arange(20, 80))
+    cx, cy = _centre(qs.ravel(), rs.ravel())
+    px = lon * np.cos(lat0)
+    nearest = np.argmin((px[:, None] - cx[None]) ** 2 + (lat[:, None] - cy[None]) ** 2, axis=1)
+    counts = np.bincount(nearest, minlength=len(cx))
+    expected = pd.DataFrame({"lon": cx / np.cos(lat0), "lat": cy, "count": counts})
+    expected = expected[expected["count"] > 0].round(6).sort_values(["lat", "lon"]).reset_index(drop=True)
+    got = out[["lon", "lat", "count"]].round(6).sort_values(["lat", "lon"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_school_bins_count_each_school_once(monkeypatch):
+    rows = pd.DataFrame({
+        "uai": ["A", "A", "A", "B"],
+        "session_str": ["2021", "2022", "2023", "2023"],
+        "valeur_ajoutee": [1.0, 2.0, 6.0, 4.0],
+        "lon": [0.0, 0.0, 5.0, 0.0],  # A moved commune in 2023
+        "lat": [45.0, 45.0, 45.0, 45.0],
+    })
+    monkeypatch.setattr(points, "school_points", lambda source: rows)
+    bins = points.school_bins.__wrapped__(4)
+
+    assert bins["count"].sum() == 2
+    moved = bins.loc[(bins["lon"] - 5).abs().idxmin()]
+    assert moved["count"] == 1 and moved["mean"] == 3.0
+    assert points.school_bins.__wrapped__(4, ("2021",))["count"].sum() == 1
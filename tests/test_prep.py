@@ -0,0 +1,33 @@
+# tests/test_prep.py
+import numpy as np
+import pandas as pd
+
+from utils.prep import impute_grouped
+
+
+def test_impute_grouped_only_rewrites_columns_with_gaps():
+    df = pd.DataFrame({
+        "effectif": pd.array([10, 20, 30], dtype="Int64"),
+        "taux": np.array([80.0, 90.0, 70.0], dtype="float32"),
+        "valeur_ajoutee": [1.0, np.nan, 3.0],
+        "academie": ["A", "A", "B"],
+    })
+    out = impute_grouped(df, ["effectif", "taux", "valeur_ajoutee"], ["academie"])
+
+    assert out["effectif"].dtype == "Int64"
+    assert out["taux"].dtype == "float32"
+    assert out["valeur_ajoutee"].tolist() == [1.0, 1.0, 3.0]
+    assert df["valeur_ajoutee"].isna().sum() == 1
+
+
+def test_knn_impute_only_rewrites_columns_with_gaps():
+    from utils.knn import knn_impute
+
+    df = pd.DataFrame({
+        "effectif": pd.array([10, 20, 30, 40], dtype="Int64"),
+        "valeur_ajoutee": [1.0, np.nan, 3.0, 4.0],
+    })
+    out = knn_impute(df, ["effectif", "valeur_ajoutee"], n_neighbors=2)
+
+    assert out["effectif"].dtype == "Int64"
+    assert not out["valeur_ajoutee"].isna().any()
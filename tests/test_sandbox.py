@@ -0,0 +1,57 @@
+# tests/test_sandbox.py
+"""
+Sandbox state stays a few bytes of op descriptors per session: Save and a reload of the
+saved preview put no DataFrame into session state or the session store.
+"""
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utils.io import DATA_SOURCE
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+pytestmark = pytest.mark.skipif(not Path(DATA_SOURCE).exists(), reason="IVAC CSV not available")
+
+
+def _click(at, label: str) -> None:
+    next(b for b in at.button if b.label == label).click().run()
+
+
+def _frames(values) -> list:
+    return [v for v in values if isinstance(v, (pd.DataFrame, pd.Series))]
+
+
+def test_save_keeps_only_op_descriptors(monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    from sections import profiling
+    from utils import oplog, warmup
+    from utils.shared import load_tables
+
+    monkeypatch.setattr(warmup, "ENABLED", False)
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    at.sidebar.radio(key="nav_page").set_value("Data Quality & Profiling").run()
+    at.selectbox(key="sandbox_strategy").set_value("median")
+    _click(at, "Apply cleaning steps")
+    for _ in range(100):
+        if profiling.JOB_KEY not in at.session_state:
+            break
+        time.sleep(0.2)
+        at.run()
+    _click(at, "Save preview (session)")
+
+    store = at.session_state["_ivac_store"]
+    saved = store.get(profiling.SAVED_KEY)
+    assert isinstance(saved, tuple) and saved
+    # Reload, as saved_preview() does: replay of the saved log, served by the shared cache
+    preview = oplog.replay(DATA_SOURCE, load_tables()["cleaned"], saved, profiling.apply_op)
+    assert len(preview)
+    at.run()
+
+    assert not _frames(at.session_state.values())
+    assert not _frames(value for value, _ in store._mem.values())
+    assert not store._disk
@@ -0,0 +1,47 @@
+# tests/test_search.py
+import pandas as pd
+import pytest
+
+from utils.search import MIN_SCORE, SearchIndex, build_search_docs, fold, trigrams
+
+
+@pytest.fixture(scope="module")
+def index() -> SearchIndex:
+    rows = pd.DataFrame({
+        "uai": ["0750001A", "0750001A", "0690002B", "0130003C", "0750004D"],
+        "nom_de_l_etablissement": ["Collège Émile Zola", "Collège Émile Zola", "Collège Jean Moulin",
+                                   "Collège Marcel Pagnol", "Collège Victor Hugo"],
+        "commune": ["Paris", "Paris", "Lyon", "Marseille", "Paris"],
+        "session_str": ["2022", "2023", "2023", "2023", "2023"],
+    })
+    return SearchIndex(build_search_docs(rows))
+
+
+def test_fold_removes_accents_and_case():
+    assert fold("Collège ÉMILE-Zola") == "college emile zola"
+    assert trigrams(fold("Émile")) == trigrams("emile")
+
+
+def test_one_document_per_school(index):
+    assert len(index) == 4
+    assert index.label_of("0750001A") == "Collège Émile Zola – Paris (0750001A)"
+
+
+@pytest.mark.parametrize("query", ["emile zola", "ÉMILE ZOLA", "Emil Zolla", "zola"])
+def test_accents_case_and_typos_find_the_school(index, query):
+    assert index.search(query)["uai"].iloc[0] == "0750001A"
+
+
+def test_uai_prefix_overrides_the_trigram_score(index):
+    hits = index.search("0750")
+    assert set(hits["uai"]) == {"0750001A", "0750004D"}
+    assert (hits["score"] == 2.0).all()
+    assert index.search("0690002b")["uai"].iloc[0] == "0690002B"
+
+
+def test_min_score_cuts_weak_matches(index):
+    hits = index.search("pagnol")
+    assert list(hits["uai"]) == ["0130003C"]
+    assert (hits["score"] >= MIN_SCORE).all()
+    assert index.search("xylophone").empty
+    assert index.search("   ").empty
@@ -0,0 +1,30 @@
+# tests/test_session_store.py
+import numpy as np
+import pandas as pd
+
+from utils.oplog import OpLog
+from utils.session_store import SessionStore, sizeof
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"uai": [f"0{i:06d}A" for i in range(rows)], "valeur_ajoutee": np.arange(rows, dtype="float64")})
+
+
+def test_frames_spill_over_budget_and_reload():
+    frame = _frame(20_000)
+    store = SessionStore(budget=sizeof(frame) // 2, spill=True)
+    store.put("sandbox_log", OpLog())
+    store.put("frame", frame)
+
+    stats = store.stats()
+    assert stats["spills"] >= 1 and stats["spilled_bytes"] > 0
+    assert store.memory_bytes <= store.budget
+    pd.testing.assert_frame_equal(store.get("frame"), frame)
+
+
+def test_entries_are_dropped_when_spill_is_off():
+    store = SessionStore(budget=1, spill=False)
+    store.put("frame", _frame(100))
+
+    assert store.get("frame") is None
+    assert store.stats()["evictions"] == 1
@@ -0,0 +1,61 @@
+# tests/test_spatial.py
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from utils.spatial import Weights, moran
+
+
+def _lattice(side: int) -> Weights:
+    """Rook contiguity on a side x side grid, cells coded 'r-c'."""
+    n = side * side
+    rows, cols = [], []
+    for r in range(side):
+        for c in range(side):
+            i = r * side + c
+            for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                if 0 <= r + dr < side and 0 <= c + dc < side:
+                    rows.append(i)
+                    cols.append((r + dr) * side + c + dc)
+    codes = np.array([f"{r}-{c}" for r in range(side) for c in range(side)], dtype=object)
+    return Weights(codes, sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n)))
+
+
+def test_checkerboard_is_negative_and_blocks_positive():
+    side = 6
+    weights = _lattice(side)
+    r, c = np.divmod(np.arange(side * side), side)
+
+    checker = moran(((r + c) % 2).astype(float), weights, permutations=199)
+    assert checker["I"] < -0.9 and checker["p"] < 0.05
+
+    blocks = moran((c < side // 2).astype(float), weights, permutations=199)
+    assert blocks["I"] > 0.5 and blocks["p"] < 0.05
+
+
+def test_permutations_are_deterministic_for_a_seed():
+    weights = _lattice(5)
+    values = np.random.default_rng(1).normal(size=25)
+    a, b = moran(values, weights, permutations=99, seed=7), moran(values, weights, permutations=99, seed=7)
+    assert a["p"] == b["p"]
+    pd.testing.assert_frame_equal(a["local"], b["local"])
+
+
+def test_lisa_quadrants():
+    side = 8
+    weights = _lattice(side)
+    r, c = np.divmod(np.arange(side * side), side)
+    noise = np.random.default_rng(0).normal(scale=0.1, size=side * side)
+    values = np.where((r < side // 2) & (c < side // 2), 10.0, 0.0) + noise
+    local = moran(values, weights, permutations=499)["local"]
+
+    z = values - values.mean()
+    lag = weights.standardized() @ z
+    expected = np.select([(z > 0) & (lag > 0), (z <= 0) & (lag > 0), (z <= 0) & (lag <= 0)], ["HH", "LH", "LL"], "HL")
+    significant = local["cluster"] != "ns"
+    assert significant.any()
+    assert (local.loc[significant, "cluster"] == expected[significant]).all()
+    # The high block's core is a hot spot; the far corner of the low area a cold spot
+    assert local.set_index("code").loc["1-1", "cluster"] == "HH"
+    assert local.set_index("code").loc["7-7", "cluster"] in ("LL", "ns")
+    assert {"HH", "LL"} <= set(local["cluster"])
@@ -0,0 +1,67 @@
+# tests/test_territory.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.territory import TerritoryTree
+
+
+@pytest.fixture(scope="module")
+def df() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 400
+    acad = rng.choice(["Lyon", "Grenoble", "Paris"], n)
+    region = np.where(acad == "Paris", "Ile-de-France", "Auvergne-Rhone-Alpes")
+    dep = np.array([f"{a[:2]}{d}" for a, d in zip(acad, rng.integers(1, 3, n))])
+    commune = np.array([f"{d}-c{c}" for d, c in zip(dep, rng.integers(1, 4, n))])
+    uai = np.array([f"{c}-s{s}" for c, s in zip(commune, rng.integers(1, 3, n))])
+    va = rng.normal(size=n)
+    va[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "region_academique": region, "academie": acad, "code_departement": dep,
+        "commune": commune, "uai": uai, "nom_de_l_etablissement": "College " + pd.Series(uai),
+        "session_str": rng.choice(["2022", "2023"], n),
+        "valeur_ajoutee": va, "taux_reussite_g": rng.uniform(60, 100, n),
+    }).sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def tree(df) -> TerritoryTree:
+    return TerritoryTree(df)
+
+
+@pytest.mark.parametrize("level", ["academie", "code_departement", "uai"])
+def test_node_ranges_and_means_match_groupby(df, tree, level):
+    nodes = tree.at(level).set_index("name")
+    expected = df.groupby(level).agg(n_rows=("uai", "size"), valeur_ajoutee=("valeur_ajoutee", "mean"),
+                                     taux_reussite_g=("taux_reussite_g", "mean"), n_schools=("uai", "nunique"))
+    pd.testing.assert_series_equal(nodes["n_rows"].sort_index(), expected["n_rows"], check_names=False, check_dtype=False)
+    pd.testing.assert_series_equal(nodes["n_schools"].sort_index(), expected["n_schools"], check_names=False, check_dtype=False)
+    for metric in ("valeur_ajoutee", "taux_reussite_g"):
+        np.testing.assert_allclose(nodes[metric].sort_index(), expected[metric])
+    # Each node's range covers exactly its rows
+    for node in tree.at(level)["node"].head(5):
+        name = tree.nodes.at[node, "name"]
+        assert set(tree.rows(node)) == set(np.flatnonzero(df[level].to_numpy() == name))
+
+
+def test_per_session_stats_match_groupby(df, tree):
+    nodes = tree.stats(tree.at("academie"), session="2023").set_index("name")
+    expected = df[df["session_str"] == "2023"].groupby("academie")["valeur_ajoutee"].mean()
+    np.testing.assert_allclose(nodes["valeur_ajoutee"].sort_index(), expected)
+
+
+def test_path_and_children_of_a_leaf(df, tree):
+    leaf = int(tree.at("uai")["node"].iloc[0])
+    path = tree.path(leaf)
+    assert len(path) == len(tree.levels) and path[-1] == leaf
+    assert list(tree.nodes.loc[path, "level"]) == list(tree.levels)
+    assert tree.children(leaf).empty
+    assert leaf in set(tree.children(path[-2])["node"])
+    row = df.iloc[tree.rows(leaf)[0]]
+    assert list(tree.nodes.loc[path, "name"]) == [str(row[c]) for c in tree.levels]
+
+
+def test_select_by_name(df, tree):
+    rows = tree.select("academie", ["Lyon", "Paris"])
+    assert np.array_equal(rows, np.flatnonzero(df["academie"].isin(["Lyon", "Paris"]).to_numpy()))
@@ -0,0 +1,81 @@
+# utils/artifacts.py
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+import streamlit as st
+
+# Prebuilt bundle produced by `python -m utils.build`: either a bundle directory
+# (holding manifest.json) or an artifacts root whose `LATEST` file names the bundle
+ARTIFACTS = os.environ.get("IVAC_ARTIFACTS", "")
+SCHEMA_VERSION = 1
+MANIFEST = "manifest.json"
+LATEST = "LATEST"
+
+
+def resolve_bundle(path: str | Path) -> Optional[Path]:
+    """Bundle directory for `path` (a bundle or an artifacts root), or None."""
+    path = Path(path)
+    if (path / MANIFEST).exists():
+        return path
+    latest = path / LATEST
+    if latest.exists():
+        bundle = path / latest.read_text(encoding="utf-8").strip()
+        if (bundle / MANIFEST).exists():
+            return bundle
+    return None
+
+
+def read_manifest(bundle: Path) -> dict:
+    return json.loads((bundle / MANIFEST).read_text(encoding="utf-8"))
+
+
+def active_bundle() -> Optional[Path]:
+    """The bundle served by this process (IVAC_ARTIFACTS), if any and schema-compatible."""
+    if not ARTIFACTS:
+        return None
+    bundle = resolve_bundle(ARTIFACTS)
+    if bundle is None or read_manifest(bundle).get("schema_version") != SCHEMA_VERSION:
+        return None
+    return bundle
+
+
+def bundle_file(name: str) -> Optional[Path]:
+    """Path of one artifact of the active bundle, or None when not serving artifacts."""
+    bundle = active_bundle()
+    if bundle is None:
+        return None
+    path = bundle / read_manifest(bundle)["files"].get(name, {}).get("path", name)
+    return path if path.exists() else None
+
+
+def read_tables(bundle: Path) -> Dict[str, pd.DataFrame]:
+    """Same dict as `utils.prep.build_tables`, read from the bundle's Parquet files."""
+    manifest = read_manifest(bundle)
+    tables = {
+        name: pd.read_parquet(bundle / manifest["files"][f"{name}.parquet"]["path"])
+        for name in manifest["tables"]
+    }
+    tables["overview"] = tables["cleaned"]
+    return tables
+
+
+@st.cache_resource(show_spinner=False)
+def _figure_json(name: str) -> Optional[dict]:
+    path = bundle_file(f"figures/{name}.json")
+    if path is None:
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_figure(name: str):
+    """Prebuilt Plotly figure `name` from the active bundle, or None (callers then build it live)."""
+    spec = _figure_json(name)
+    if spec is None:
+        return None
+    import plotly.graph_objects as go
+    return go.Figure(spec)
@@ -0,0 +1,136 @@
+# utils/build.py
+"""
+Offline artifact builder.
+
+    python -m utils.build --out artifacts [--source path-or-url] [--tolerance 0.005]
+
+Runs the whole pipeline once (load -> clean -> validity checks -> tables -> cube ->
+panel -> indexes -> simplified GeoJSON + WKB geometry stores -> figures) and writes a versioned bundle
+`<out>/<timestamp>-<source hash>/` with a manifest, then points `<out>/LATEST` at it.
+Start the app with IVAC_ARTIFACTS=<out> to serve the bundle instead of recomputing.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from utils.artifacts import LATEST, MANIFEST, SCHEMA_VERSION
+from utils.http import fetch_to_cache
+from utils.io import DATA_SOURCE, is_url, load_data
+from utils.prep import build_cube, build_indexes, build_panel, build_tables, clean_ivac, rollup_cube, validity_checks
+from utils.viz import TREND_TEXTS, trend_figure
+
+TABLES = ("cleaned", "timeseries", "by_region", "by_departement")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_file(source: str) -> Path:
+    return fetch_to_cache(source) if is_url(source) else Path(source)
+
+
+def _write_json(path: Path, obj) -> None:
+    path.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8")
+
+
+def build_bundle(out: str | Path, source: str = DATA_SOURCE, tolerance: float = 0.005) -> Path:
+    """Build one bundle under `out` and return its directory."""
+    from utils.departments import build_department_dim, join_features
+    from utils.geo import GEOJSON_SOURCE, MAP_HEIGHT, RESOLUTIONS, animated_map_figure, load_geojson, resolution_for, simplify_geojson
+    from utils.geostore import GeometryStore, write_store
+
+    out = Path(out)
+    source_sha = _sha256(_source_file(source))
+    version = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{source_sha[:8]}"
+    bundle = out / version
+    tmp = out / f".{version}.tmp"
+    (tmp / "figures").mkdir(parents=True)
+    timings = {}
+
+    def step(name, func, *args):
+        t0 = time.perf_counter()
+        result = func(*args)
+        timings[name] = round(time.perf_counter() - t0, 3)
+        print(f"{name:<12} {timings[name]:6.2f}s")
+        return result
+
+    raw = step("load", load_data.__wrapped__, source)
+    cleaned = step("clean", clean_ivac, raw)
+    checks = step("validity", validity_checks, cleaned)
+    tables = step("tables", build_tables, cleaned)
+    cube = step("cube", build_cube, cleaned)
+    panel = step("panel", build_panel, cleaned)
+    indexes = step("indexes", build_indexes, cleaned)
+
+    frames = {f"{name}.parquet": tables[name] for name in TABLES}
+    frames["raw.parquet"] = raw
+    frames["cube.parquet"] = cube
+    frames["panel.parquet"] = panel.reset_index()
+    frames.update({f"index_{col}.parquet": idx for col, idx in indexes.items()})
+    for name, frame in frames.items():
+        frame.to_parquet(tmp / name, index=False)
+    _write_json(tmp / "checks.json", {
+        "raw_duplicates": int(raw.duplicated().sum()),
+        "validity": checks["summary"],
+    })
+
+    geojson = load_geojson(GEOJSON_SOURCE)
+    if geojson:
+        simplified = step("geojson", simplify_geojson, geojson, tolerance, 4)
+        _write_json(tmp / "departements.geojson", simplified)
+        for level, (level_tolerance, decimals) in RESOLUTIONS.items():
+            write_store(simplify_geojson(geojson, level_tolerance, decimals), tmp / "geometry" / f"{level}.parquet")
+        store = GeometryStore(tmp / "geometry" / f"{resolution_for(MAP_HEIGHT)}.parquet")
+        by_session = rollup_cube(cube, ["session_str", "code_departement"])
+        value_col = "taux_reussite_g" if "taux_reussite_g" in by_session.columns else "valeur_ajoutee"
+        if not by_session.empty and value_col in by_session.columns:
+            dim = build_department_dim(cleaned["code_departement"].unique(), store.codes)
+            by_session, _ = join_features(by_session, dim)
+            fig = animated_map_figure(by_session, store.geojson(by_session["code_departement"].unique()), value_col=value_col)
+            (tmp / "figures" / "map.json").write_text(fig.to_json(), encoding="utf-8")
+    ts = tables["timeseries"]
+    if ts is not None and len(ts.dropna(subset=["valeur_ajoutee"])) >= 2:
+        for lang in TREND_TEXTS:
+            (tmp / "figures" / f"trend_{lang}.json").write_text(trend_figure(ts, lang).to_json(), encoding="utf-8")
+
+    files = {}
+    for path in sorted(p for p in tmp.rglob("*") if p.is_file()):
+        rel = path.relative_to(tmp).as_posix()
+        files[rel] = {"path": rel, "bytes": path.stat().st_size, "sha256": _sha256(path)}
+    _write_json(tmp / MANIFEST, {
+        "version": version,
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source,
+        "source_sha256": source_sha,
+        "rows": {"raw": len(raw), "cleaned": len(cleaned), "cube": len(cube), "panel": len(panel)},
+        "tables": list(TABLES),
+        "timings": timings,
+        "files": files,
+    })
+
+    os.replace(tmp, bundle)
+    latest_tmp = out / f"{LATEST}.tmp"
+    latest_tmp.write_text(version, encoding="utf-8")
+    os.replace(latest_tmp, out / LATEST)
+    return bundle
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed IVAC artifact bundle.")
+    parser.add_argument("--out", default="artifacts", help="artifacts root (default: artifacts)")
+    parser.add_argument("--source", default=DATA_SOURCE, help="IVAC CSV path or URL")
+    parser.add_argument("--tolerance", type=float, default=0.005, help="GeoJSON simplification tolerance (degrees)")
+    args = parser.parse_args()
+    print(build_bundle(args.out, args.source, args.tolerance))
@@ -0,0 +1,67 @@
+# utils/cache.py
+"""
+Process-wide caching of data frames for all sessions.
+
+Importing this module turns on pandas copy-on-write (`mode.copy_on_write`) for the whole
+process, not just for the data layer: any code that relied on writes through a slice or
+a shallow copy reaching the parent frame no longer does (pandas 3 makes it the default).
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+from typing import Any, Callable
+
+import pandas as pd
+import streamlit as st
+
+from utils.telemetry import count_rows, marks_miss, span
+
+# Copy-on-write: slicing, shallow copies and column assignment share buffers until a write.
+# The whole data layer relies on it to hand out cached frames without defensive `.copy()`.
+pd.set_option("mode.copy_on_write", True)
+
+
+def cow_view(obj: Any) -> Any:
+    """
+    Return a lazily-copied view of a cached result.
+    Frames/Series get a new object sharing the same buffers; any write on it copies first,
+    so the cached object itself is never mutated by callers. Dicts/lists are viewed element-wise.
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.copy(deep=False)
+    if isinstance(obj, dict):
+        return {k: cow_view(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(cow_view(v) for v in obj)
+    return obj
+
+
+def frame_resource(func: Callable | None = None, *, max_entries: int | None = None) -> Callable:
+    """
+    Like `st.cache_resource`, but every hit returns a copy-on-write view.
+
+    `st.cache_data` unpickles a full copy of the frame on every hit; here all sessions
+    share one object per process and pay nothing per rerun.
+    Each call is recorded as a telemetry span (hit, or miss when the body ran).
+    Use `@frame_resource(max_entries=N)` for results keyed by user filters.
+    Arguments are bound to the signature (defaults filled in) before hashing, so
+    `load_data()` and `load_data(DATA_SOURCE)` share one cache entry.
+    """
+    if func is None:
+        return functools.partial(frame_resource, max_entries=max_entries)
+    cached = st.cache_resource(show_spinner=False, max_entries=max_entries)(marks_miss(func))
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        with span(name, cached=True) as s:
+            result = cow_view(cached(*bound.args, **bound.kwargs))
+            s["rows"] = count_rows(result)
+        return result
+
+    wrapper.clear = cached.clear
+    return wrapper
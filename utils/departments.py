@@ -0,0 +1,87 @@
+# utils/departments.py
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import frame_resource
+from utils.geo import GEOJSON_SOURCE, geometry_store
+from utils.io import DATA_SOURCE
+
+# Corsica is coded 201 / 202 or 20A / 20B in some exports, 2A / 2B in the GeoJSON. A bare
+# "20" (before the 1976 split) cannot be assigned to either and stays unmatched
+CORSICA = {"201": "2A", "202": "2B", "20A": "2A", "20B": "2B"}
+
+
+def canonical_code(raw) -> str:
+    """'1.0' -> '01', '075' -> '75', '201' -> '2A'; overseas 3-digit codes (971...) are kept."""
+    code = str(raw).strip().upper()
+    if code.endswith(".0"):
+        code = code[:-2]
+    code = CORSICA.get(code, code)
+    if code.isdigit():
+        if len(code) < 2:
+            code = code.zfill(2)
+        elif len(code) == 3 and code.startswith("0"):
+            code = code[1:]
+    return code
+
+
+def is_overseas(code) -> bool:
+    """Overseas departments and collectivities (971-976, 98x): not drawn on the metropolitan map."""
+    code = str(code)
+    return len(code) == 3 and code.isdigit() and code[:2] in ("97", "98")
+
+
+def build_department_dim(raw_codes: Iterable, feature_ids: Iterable[str]) -> pd.DataFrame:
+    """
+    Department dimension: one row per raw code spelling, with its canonical code, an
+    integer key per canonical department and the matching GeoJSON feature (row, id),
+    or feature_row = -1 when the shapes have no such department.
+    """
+    raw = sorted({str(c) for c in raw_codes if pd.notna(c)})
+    codes = [canonical_code(c) for c in raw]
+    feature_rows = {str(f): i for i, f in enumerate(feature_ids)}
+    dim = pd.DataFrame({
+        "raw_code": raw,
+        "code": codes,
+        "dep_key": pd.factorize(pd.Series(codes, dtype=object), sort=True)[0].astype("int32"),
+        "feature_row": np.array([feature_rows.get(c, -1) for c in codes], dtype="int32"),
+    })
+    dim["feature_id"] = dim["code"].where(dim["feature_row"] >= 0)
+    return dim
+
+
+@frame_resource
+def department_dim(source: str = DATA_SOURCE, geo_source: str = GEOJSON_SOURCE) -> pd.DataFrame:
+    """Dimension table for the dataset's department codes, built once per process."""
+    from utils.shared import load_tables
+
+    cleaned = load_tables(source)["cleaned"]
+    store = geometry_store("medium", geo_source)
+    feature_ids = store.codes if store is not None else []
+    raw = cleaned["code_departement"].dropna().unique() if "code_departement" in cleaned.columns else []
+    return build_department_dim(raw, feature_ids)
+
+
+def join_features(frame: pd.DataFrame, dim: pd.DataFrame, col: str = "code_departement") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Replace raw department codes with GeoJSON feature ids: one hash lookup per row from the
+    raw spelling to its integer `dep_key`, then integer takes into per-department arrays.
+    Returns (matched rows, unmatched rows with their canonical code), so callers can report
+    what the map cannot show.
+    """
+    spelling = pd.Categorical(frame[col].astype(str), categories=dim["raw_code"]).codes
+    known = spelling >= 0
+    keys = dim["dep_key"].to_numpy()[spelling[known]]
+    per_key = dim.drop_duplicates("dep_key").sort_values("dep_key")
+    rows = np.full(len(frame), -1, dtype="int32")
+    rows[known] = per_key["feature_row"].to_numpy()[keys]
+    codes = np.full(len(frame), None, dtype=object)
+    codes[known] = per_key["code"].to_numpy()[keys]
+    codes[~known] = frame[col].astype(str).to_numpy()[~known]
+    out = frame.assign(**{col: codes})
+    matched = rows >= 0
+    return out[matched], out[~matched]
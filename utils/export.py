@@ -0,0 +1,103 @@
+# utils/export.py
+from __future__ import annotations
+
+import gzip
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from utils.telemetry import span
+
+# Exported files, one per (selection, format); reused by repeat downloads
+CACHE_DIR = Path(os.environ.get("IVAC_EXPORT_CACHE", "data/.cache/exports"))
+MAX_FILES = int(os.environ.get("IVAC_EXPORT_FILES", 32))
+CHUNK_ROWS = 50_000
+# Files are scoped to this process run: a restart (possibly on newer data) never serves stale exports
+_RUN = f"{os.getpid()}-{int(time.time())}"
+
+# format -> (extension, MIME type)
+FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "csv.gz": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _write_csv(df: pd.DataFrame, fh) -> None:
+    """CSV written chunk by chunk: memory stays at one chunk, not the whole encoded file."""
+    for start in range(0, max(len(df), 1), CHUNK_ROWS):
+        df.iloc[start:start + CHUNK_ROWS].to_csv(fh, index=False, header=start == 0, encoding="utf-8")
+
+
+def _write(df: pd.DataFrame, fmt: str, path: Path) -> None:
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for start in range(0, max(len(df), 1), CHUNK_ROWS):
+                chunk = df.iloc[start:start + CHUNK_ROWS]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    elif fmt == "csv.gz":
+        with gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6) as fh:
+            _write_csv(df, fh)
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            _write_csv(df, fh)
+
+
+def _prune() -> None:
+    """Keep the MAX_FILES most recently used exports."""
+    files = sorted(CACHE_DIR.glob("*.export"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[MAX_FILES:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def export_file(key: str, frame: Callable[[], pd.DataFrame], fmt: str = "csv") -> Path:
+    """
+    Path of the `fmt` export for selection `key`, written on first request only.
+    `frame()` is called on a miss; files are written to a temp name then renamed,
+    so concurrent sessions never read a partial export.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    path = CACHE_DIR / f"{_RUN}-{key}-{fmt}.export"
+    with span("export.file", cached=True, fmt=fmt) as s:
+        if path.exists():
+            os.utime(path)
+            return path
+        s["cache"] = "miss"
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df = frame()
+        s["rows"] = len(df)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".part")
+        os.close(fd)
+        try:
+            _write(df, fmt, Path(tmp))
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        _prune()
+        return path
+
+
+def download_data(key: str, frame: Callable[[], pd.DataFrame], fmt: str = "csv") -> Callable[[], bytes]:
+    """Deferred `data=` for `st.download_button`: nothing is serialized until the click."""
+    return lambda: export_file(key, frame, fmt).read_bytes()
+
+
+def file_name(stem: str, fmt: str) -> str:
+    return stem + FORMATS[fmt][0]
+
+
+def mime(fmt: str) -> str:
+    return FORMATS[fmt][1]
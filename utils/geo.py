@@ -1,17 +1,40 @@
 # utils/geo.py 
+import hashlib
 import json
+import os
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-import requests
+
+from utils.artifacts import bundle_file
+from utils.geostore import GeometryStore, write_store
+from utils.http import cache_path_for, fetch_to_cache
+from utils.io import is_url
+
+# Department shapes: local path by default, or an HTTP(S) URL (simplified bundle copy when serving artifacts)
+GEOJSON_SOURCE = os.environ.get("IVAC_GEOJSON_URL") or str(
+    bundle_file("departements.geojson") or "assets/assets/fr_departements.geojson"
+)
+
+# Map geometry levels: (coverage_simplify tolerance in degrees, coordinate decimals).
+# 4 decimals ~ 10 m: a 100 m grid already pulls narrow shared borders (estuaries) apart.
+RESOLUTIONS = {"low": (0.04, 4), "medium": (0.02, 4), "high": (0.01, 4)}
+# Simplified shapes (WKB Parquet), one store per source version and level
+GEO_CACHE_DIR = Path(os.environ.get("IVAC_GEO_CACHE", "data/.cache/geo"))
+MAP_HEIGHT = 600
+# Latitude span of a department map (metropolitan France + margins), used to size a pixel
+MAP_SPAN_DEG = 11.0
 
 
 @st.cache_data(show_spinner=False)
-def load_geojson(path: str) -> Optional[dict]:
-    """Load GeoJSON file from local path with error handling."""
+def load_geojson(path: str = GEOJSON_SOURCE) -> Optional[dict]:
+    """Load GeoJSON file from local path (or remote URL) with error handling."""
+    if is_url(path):
+        return fetch_geojson(path)
     geo_path = Path(path)
     if not geo_path.exists():
         st.warning(f"🌍 GeoJSON file not found at: {path}")
@@ -26,16 +49,64 @@ def load_geojson(path: str) -> Optional[dict]:
 
 @st.cache_data(show_spinner=False)
 def fetch_geojson(url: str) -> Optional[dict]:
-    """Fetch GeoJSON from remote URL (cached)."""
+    """Fetch GeoJSON from remote URL (cached in memory and revalidated on disk)."""
     try:
-        r = requests.get(url, timeout=60)
-        r.raise_for_status()
-        return r.json()
+        with open(fetch_to_cache(url, timeout=60), "r", encoding="utf-8") as f:
+            return json.load(f)
     except Exception as e:
         st.warning(f"⚠️ Could not fetch GeoJSON from {url}: {e}")
         return None
 
 
+def resolution_for(height_px: int = MAP_HEIGHT) -> str:
+    """Coarsest level whose tolerance stays within ~1.5 px at `height_px`."""
+    max_tolerance = 1.5 * MAP_SPAN_DEG / max(height_px, 1)
+    fitting = [name for name, (tol, _) in RESOLUTIONS.items() if tol <= max_tolerance]
+    return max(fitting, key=lambda name: RESOLUTIONS[name][0]) if fitting else "high"
+
+
+def _source_key(source: str) -> str:
+    path = cache_path_for(source) if is_url(source) else Path(source)
+    try:
+        stat = path.stat()
+        signature = f"{source}|{stat.st_mtime_ns}|{stat.st_size}"
+    except OSError:
+        signature = source
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+
+
+def _store_path(resolution: str, source: str) -> Path:
+    """Prebuilt store of the active bundle when serving its shapes, else the local cache file."""
+    bundled = bundle_file(f"geometry/{resolution}.parquet")
+    if bundled is not None and source == str(bundle_file("departements.geojson")):
+        return bundled
+    tolerance, decimals = RESOLUTIONS[resolution]
+    return GEO_CACHE_DIR / f"{_source_key(source)}-{resolution}-{tolerance}-{decimals}.parquet"
+
+
+@st.cache_resource(show_spinner=False)
+def geometry_store(resolution: str = "medium", source: str = GEOJSON_SOURCE) -> Optional[GeometryStore]:
+    """
+    Department shapes simplified and quantized for display at `resolution` (see
+    `RESOLUTIONS`), as a WKB Parquet store. Computed once per source version, then
+    memory-mapped; one shared object per process.
+    """
+    path = _store_path(resolution, source)
+    if not path.exists():
+        geojson = load_geojson(source)
+        if geojson is None:
+            return None
+        tolerance, decimals = RESOLUTIONS[resolution]
+        write_store(simplify_geojson(geojson, tolerance, decimals=decimals), path)
+    return GeometryStore(path)
+
+
+def load_map_geojson(resolution: str = "medium", source: str = GEOJSON_SOURCE, codes=None) -> Optional[dict]:
+    """FeatureCollection at `resolution`, optionally limited to department `codes` (shared, read-only)."""
+    store = geometry_store(resolution, source)
+    return store.geojson(codes) if store is not None else None
+
+
 def map_chart(
     by_departement: pd.DataFrame,
     geojson: Optional[dict],
@@ -44,6 +115,7 @@ def map_chart(
     value_col: str = "taux_reussite_g",
     title: str | None = None,
     alt_text: str | None = None,
+    height: int = MAP_HEIGHT,
 ):
     """
     Render choropleth map with Plotly.
@@ -56,6 +128,7 @@ def map_chart(
         value_col: Column name for values to visualize
         title: Chart title
         alt_text: Alternative text for accessibility (screen readers)
+        height: Map height in pixels (pick the geometry with `resolution_for(height)`)
     """
     # Validation
     if by_departement is None or by_departement.empty:
@@ -68,9 +141,23 @@ def map_chart(
         st.warning(f"⚠️ Required columns missing: {dep_code_col}, {value_col}")
         return
 
+    fig = map_figure(by_departement, geojson, featureidkey, dep_code_col, value_col, title, alt_text, height)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def map_figure(
+    by_departement: pd.DataFrame,
+    geojson: dict,
+    featureidkey: str = "properties.code",
+    dep_code_col: str = "code_departement",
+    value_col: str = "taux_reussite_g",
+    title: str | None = None,
+    alt_text: str | None = None,
+    height: int = MAP_HEIGHT,
+):
+    """Build the choropleth figure (no Streamlit calls, usable offline)."""
     # Prepare data
-    df = by_departement.copy()
-    df[dep_code_col] = df[dep_code_col].astype(str)
+    df = by_departement.assign(**{dep_code_col: by_departement[dep_code_col].astype(str)})
 
     # Create choropleth
     fig = px.choropleth(
@@ -87,7 +174,7 @@ def map_chart(
     fig.update_geos(fitbounds="locations", visible=False)
     fig.update_layout(
         margin=dict(l=10, r=10, t=40, b=10),
-        height=600,
+        height=height,
     )
     
     # Accessibility: add alt text as hidden annotation
@@ -99,5 +186,92 @@ def map_chart(
             x=0, y=-0.15,
             font=dict(size=0),  
         )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def animated_map_figure(
+    by_session: pd.DataFrame,
+    geojson: dict,
+    session_col: str = "session_str",
+    featureidkey: str = "properties.code",
+    dep_code_col: str = "code_departement",
+    value_col: str = "taux_reussite_g",
+    title: str | None = None,
+    height: int = MAP_HEIGHT,
+    session_label: str = "Session",
+):
+    """
+    Choropleth with one Plotly frame per session. The geometry is sent once, in the base
+    trace; frames only carry the values (same department order, NaN where a session has
+    no data) and the colour scale is fixed across sessions, so the slider and the play
+    button step through years in the browser without a server rerun.
+    """
+    import plotly.graph_objects as go
+
+    df = by_session.assign(**{dep_code_col: by_session[dep_code_col].astype(str)})
+    wide = df.pivot_table(index=dep_code_col, columns=session_col, values=value_col, aggfunc="mean")
+    sessions = [str(s) for s in wide.columns]
+    locations = wide.index.to_list()
+    zmin, zmax = float(np.nanmin(wide.to_numpy())), float(np.nanmax(wide.to_numpy()))
+    last = sessions[-1]
+
+    fig = go.Figure(
+        go.Choropleth(
+            geojson=geojson,
+            featureidkey=featureidkey,
+            locations=locations,
+            z=wide[last].to_numpy(),
+            zmin=zmin,
+            zmax=zmax,
+            colorscale="RdYlGn",
+            colorbar=dict(title=value_col),
+            hovertemplate="%{location}<br>%{z:.2f}<extra></extra>",
+        ),
+        frames=[go.Frame(name=s, data=[go.Choropleth(z=wide[s].to_numpy())], traces=[0]) for s in sessions],
+    )
+    step_args = dict(mode="immediate", frame=dict(duration=0, redraw=True), transition=dict(duration=0))
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(
+        title=title,
+        margin=dict(l=10, r=10, t=40, b=10),
+        height=height,
+        sliders=[dict(
+            active=len(sessions) - 1,
+            currentvalue=dict(prefix=f"{session_label}: "),
+            steps=[dict(label=s, method="animate", args=[[s], step_args]) for s in sessions],
+        )],
+        updatemenus=[dict(
+            type="buttons", direction="left", x=0, y=0, xanchor="left", yanchor="top", showactive=False,
+            buttons=[
+                dict(label="▶", method="animate",
+                     args=[None, {**step_args, "frame": dict(duration=900, redraw=True), "fromcurrent": True}]),
+                dict(label="❚❚", method="animate", args=[[None], step_args]),
+            ],
+        )],
+    )
+    return fig
+
+
+def simplify_geojson(geojson: dict, tolerance: float, decimals: int | None = None) -> dict:
+    """
+    Simplify every feature geometry (shapely). Shared borders stay shared when
+    `shapely.coverage_simplify` is available (shapely >= 2.1), otherwise each
+    polygon is simplified on its own with topology preserved.
+    With `decimals`, coordinates are snapped to that grid (valid geometries, short JSON numbers).
+    """
+    import shapely
+    from shapely.geometry import mapping, shape
+
+    features = geojson.get("features", [])
+    geoms = [shape(f["geometry"]) for f in features]
+    if hasattr(shapely, "coverage_simplify"):
+        simplified = shapely.coverage_simplify(geoms, tolerance)
+    else:
+        simplified = [g.simplify(tolerance, preserve_topology=True) for g in geoms]
+    if decimals is not None:
+        simplified = shapely.set_precision(simplified, 10.0 ** -decimals)
+        simplified = shapely.transform(simplified, lambda c: np.round(c, decimals))
+    return {
+        **geojson,
+        "features": [{**f, "geometry": mapping(g)} for f, g in zip(features, simplified)],
+    }
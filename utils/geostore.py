@@ -0,0 +1,76 @@
+# utils/geostore.py
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Feature property holding the department code (the choropleth's featureidkey)
+CODE_PROPERTY = "code"
+
+
+def write_store(geojson: dict, path: Path) -> Path:
+    """
+    Write a FeatureCollection as Parquet: one row per feature with its code, its
+    properties (JSON text) and its geometry as WKB. Uncompressed, so reads can be mmapped.
+    """
+    import shapely
+    from shapely.geometry import shape
+
+    features = geojson.get("features", [])
+    geoms = [shape(f["geometry"]) for f in features]
+    table = pa.table({
+        "code": [str(f.get("properties", {}).get(CODE_PROPERTY, "")) for f in features],
+        "properties": [json.dumps(f.get("properties", {}), ensure_ascii=False) for f in features],
+        "wkb": shapely.to_wkb(geoms, output_dimension=2),
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp, compression="none")
+    os.replace(tmp, path)
+    return path
+
+
+class GeometryStore:
+    """
+    Department geometries read from a WKB Parquet store, with a code -> row index.
+    The Plotly-ready FeatureCollection is built once and shared (treat it as read-only).
+    """
+
+    def __init__(self, path: Path):
+        import shapely
+
+        table = pq.read_table(path, memory_map=True)
+        self.path = path
+        self.codes = np.asarray(table.column("code").to_pylist(), dtype=object)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self._properties = table.column("properties").to_pylist()
+        self.geometries = shapely.from_wkb(table.column("wkb").to_numpy(zero_copy_only=False))
+        self._features: Optional[list[dict]] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def features(self) -> list[dict]:
+        if self._features is None:
+            import shapely
+
+            geometries = shapely.to_geojson(self.geometries)
+            self._features = [
+                {"type": "Feature", "properties": json.loads(props), "geometry": json.loads(geom)}
+                for props, geom in zip(self._properties, geometries)
+            ]
+        return self._features
+
+    def geojson(self, codes: Iterable[str] | None = None) -> dict:
+        """FeatureCollection of all departments, or only of `codes` (unknown codes are skipped)."""
+        features = self.features()
+        if codes is not None:
+            rows = sorted({self.index[c] for c in codes if c in self.index})
+            features = [features[i] for i in rows]
+        return {"type": "FeatureCollection", "features": features}
@@ -0,0 +1,229 @@
+# utils/http.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Where remote files are mirrored (one file + one `.meta.json` sidecar per URL)
+CACHE_DIR = Path(os.environ.get("IVAC_HTTP_CACHE", "data/.cache/http"))
+CHUNK_SIZE = 1 << 16
+RETRIES = 3
+BACKOFF = 0.5
+# Statuses retried by `fetch_to_cache` (the only retry layer: the adapter itself never retries)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_AFTER = 30.0
+# Copies revalidated less than FRESH_FOR seconds ago are served without a round trip
+FRESH_FOR = float(os.environ.get("IVAC_HTTP_FRESH_FOR", 60))
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_url_locks: dict[str, threading.Lock] = {}
+
+
+def build_session(pool_size: int = 8) -> requests.Session:
+    """
+    Create a pooled session:
+    - keep-alive connection pool shared by all fetches
+    - no adapter-level retries: `fetch_to_cache` retries whole round trips, so that a
+      transfer cut mid-stream resumes from its partial file
+    - gzip/deflate negotiation (decoded transparently by requests)
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "User-Agent": "ivac-dashboard"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide shared session (created lazily, thread-safe)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def cache_path_for(url: str, cache_dir: str | Path | None = None) -> Path:
+    """Stable on-disk location for a URL (hash + original suffix)."""
+    base = Path(cache_dir) if cache_dir else CACHE_DIR
+    suffix = Path(urlparse(url).path).suffix[:10]
+    return base / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}{suffix}"
+
+
+def _meta_path(dest: Path) -> Path:
+    return dest.with_name(dest.name + ".meta.json")
+
+
+def _part_path(dest: Path) -> Path:
+    return dest.with_name(dest.name + ".part")
+
+
+def _read_meta(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path: Path, meta: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _validators(resp: requests.Response) -> dict:
+    return {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+
+
+def _retry_after(resp: requests.Response) -> float:
+    """Seconds asked by a numeric Retry-After header (0 when absent), capped at MAX_RETRY_AFTER."""
+    try:
+        return min(float(resp.headers.get("Retry-After", 0)), MAX_RETRY_AFTER)
+    except ValueError:
+        return 0.0
+
+
+def _url_lock(url: str) -> threading.Lock:
+    with _session_lock:
+        return _url_locks.setdefault(url, threading.Lock())
+
+
+def fetch_to_cache(
+    url: str,
+    dest: str | Path | None = None,
+    timeout: int = 60,
+    session: requests.Session | None = None,
+    retries: int = RETRIES,
+    backoff: float = BACKOFF,
+    revalidate: bool = True,
+    stale_ok: bool = True,
+    max_age: float = 0,
+) -> Path:
+    """
+    Mirror `url` to disk and return the local path.
+
+    - Known file: conditional GET (If-None-Match / If-Modified-Since); a 304 keeps the local copy
+    - Interrupted download: resumed with `Range` + `If-Range` when the partial body was not
+      content-encoded (byte offsets are only meaningful on the identity encoding)
+    - Connect errors, timeouts, transfers cut mid-stream and 429/5xx answers are retried
+      `retries` times with exponential backoff (or the server's Retry-After, capped)
+    - If the server cannot be reached and a copy exists, the stale copy is returned (`stale_ok`)
+    - A copy checked less than `max_age` seconds ago is returned without any request
+    """
+    session = session or get_session()
+    dest = Path(dest) if dest else cache_path_for(url)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    meta_path, part = _meta_path(dest), _part_path(dest)
+
+    with _url_lock(str(dest)):
+        if dest.exists() and not revalidate:
+            return dest
+        if dest.exists() and max_age > 0:
+            checked_at = _read_meta(meta_path).get("checked_at", 0)
+            if time.time() - checked_at < max_age:
+                return dest
+
+        last_error: Exception | None = None
+        wait = 0.0
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(max(backoff * (2 ** (attempt - 1)), wait))
+            wait = 0.0
+            try:
+                if _download(session, url, dest, meta_path, part, timeout):
+                    return dest
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                last_error = e
+            except requests.exceptions.HTTPError as e:
+                last_error = e
+                if e.response is None or e.response.status_code not in RETRY_STATUSES:
+                    break
+                wait = _retry_after(e.response)
+
+        if stale_ok and dest.exists():
+            return dest
+        raise last_error if last_error else ConnectionError(f"Could not fetch {url}")
+
+
+def _download(session: requests.Session, url: str, dest: Path, meta_path: Path, part: Path, timeout: int) -> bool:
+    """One GET round trip (conditional and/or ranged). Returns True when `dest` is up to date."""
+    meta = _read_meta(meta_path) if dest.exists() else {}
+    part_meta = _read_meta(_meta_path(part)) if part.exists() else {}
+    offset = part.stat().st_size if (part.exists() and part_meta.get("resumable")) else 0
+
+    headers = {}
+    if offset:
+        validator = part_meta.get("etag") or part_meta.get("last_modified")
+        headers["Range"] = f"bytes={offset}-"
+        headers["Accept-Encoding"] = "identity"
+        if validator:
+            headers["If-Range"] = validator
+    elif meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as resp:
+        if resp.status_code == 304:
+            meta["checked_at"] = time.time()
+            _write_meta(meta_path, meta)
+            return True
+        if resp.status_code == 416:
+            # Stale partial file: drop it and start over on the next attempt
+            part.unlink(missing_ok=True)
+            _meta_path(part).unlink(missing_ok=True)
+            return False
+        resp.raise_for_status()
+
+        if resp.status_code == 206 and offset:
+            mode = "ab"
+        else:
+            # Full body: (re)start the partial file and remember whether it can be resumed
+            mode, offset = "wb", 0
+            _write_meta(_meta_path(part), {
+                **_validators(resp),
+                "resumable": not resp.headers.get("Content-Encoding")
+                and resp.headers.get("Accept-Ranges", "").lower() == "bytes",
+            })
+
+        with open(part, mode) as fh:
+            for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    fh.write(chunk)
+
+        os.replace(part, dest)
+        _meta_path(part).unlink(missing_ok=True)
+        _write_meta(meta_path, {
+            "url": url,
+            **(_validators(resp) if resp.status_code == 200 else {
+                "etag": part_meta.get("etag"), "last_modified": part_meta.get("last_modified"),
+            }),
+            "size": dest.stat().st_size,
+            "checked_at": time.time(),
+        })
+    return True
+
+
+def fetch_bytes(url: str, timeout: int = 60, session: requests.Session | None = None) -> bytes:
+    """Return the body of `url`, revalidated against the disk cache."""
+    return fetch_to_cache(url, timeout=timeout, session=session, max_age=FRESH_FOR).read_bytes()
+
+
+def fetch_text(url: str, timeout: int = 60, encoding: str = "utf-8-sig", session: requests.Session | None = None) -> str:
+    """Return the body of `url` as text (UTF-8 BOM handled like local files)."""
+    return fetch_to_cache(url, timeout=timeout, session=session, max_age=FRESH_FOR).read_text(encoding=encoding)
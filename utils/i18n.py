@@ -0,0 +1,64 @@
+# utils/i18n.py
+from __future__ import annotations
+
+import streamlit as st
+
+LANGS = ("en", "fr")
+DEFAULT_LANG = "en"
+# One language for the whole app, kept in session state and mirrored to ?lang=
+_STATE_KEY = "lang"
+
+# Strings shared by every page (merged into each section catalog)
+COMMON = {
+    "en": {"language": "Language", "en": "English", "fr": "Français"},
+    "fr": {"language": "Langue", "en": "English", "fr": "Français"},
+}
+
+
+def compile_catalog(texts: dict) -> dict:
+    """
+    Prepare a section's TEXTS once, at import: shared strings are merged in and every
+    language gets every key (English fallback), so lookups never miss at render time.
+    The per-language dicts are updated in place and keep their identity.
+    """
+    base = {**COMMON[DEFAULT_LANG], **texts[DEFAULT_LANG]}
+    for lang in LANGS:
+        table = texts.setdefault(lang, {})
+        for key, value in base.items():
+            table.setdefault(key, COMMON[lang].get(key, value))
+    return texts
+
+
+def current_lang() -> str:
+    """Active language (seeded from ?lang= on the first run of a session)."""
+    if _STATE_KEY not in st.session_state:
+        lang = st.query_params.get("lang", DEFAULT_LANG)
+        st.session_state[_STATE_KEY] = lang if lang in LANGS else DEFAULT_LANG
+    return st.session_state[_STATE_KEY]
+
+
+def _sync_query_param() -> None:
+    try:
+        st.query_params["lang"] = st.session_state[_STATE_KEY]
+    except Exception:
+        pass
+
+
+def language_selector(texts: dict) -> dict:
+    """
+    Sidebar en/fr switch; returns the catalog for the active language.
+    The radio writes the language before the script runs, so switching needs no
+    `st.rerun()`: the single rerun only re-renders text, cached results are reused.
+    """
+    lang = current_lang()
+    st.sidebar.subheader(COMMON[lang]["language"])
+    st.sidebar.radio(
+        label=" ",
+        options=list(LANGS),
+        format_func=lambda x: COMMON[x][x],
+        horizontal=True,
+        key=_STATE_KEY,
+        label_visibility="collapsed",
+        on_change=_sync_query_param,
+    )
+    return texts[st.session_state[_STATE_KEY]]
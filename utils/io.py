@@ -2,12 +2,28 @@
 from __future__ import annotations
 
 import io
+import os
 from pathlib import Path
 
 import pandas as pd
 import requests
 import streamlit as st
 
+from utils.artifacts import bundle_file
+from utils.cache import frame_resource
+from utils.http import fetch_bytes, fetch_text, fetch_to_cache
+
+# IVAC CSV location: local path by default, or an HTTP(S) URL (e.g. data.gouv.fr export).
+# When serving a prebuilt bundle (IVAC_ARTIFACTS), its raw Parquet copy is the default.
+DATA_SOURCE = os.environ.get("IVAC_DATA_URL") or str(
+    bundle_file("raw.parquet") or "data/fr-en-indicateurs-valeur-ajoutee-colleges.csv"
+)
+
+
+def is_url(path_or_url: str) -> bool:
+    return path_or_url.startswith("http://") or path_or_url.startswith("https://")
+
+
 def _read_text_local(path: str | Path) -> str:
     """Read text from a local file handling potential UTF-8 BOM."""
     path = Path(path)
@@ -18,17 +34,17 @@ def _read_text_local(path: str | Path) -> str:
 
 
 def _read_text_url(url: str, timeout: int = 60) -> str:
-    """Read text from a remote URL (CSV) with comprehensive error handling."""
+    """Read text from a remote URL (CSV) through the shared, disk-cached fetch layer."""
     try:
-        resp = requests.get(url, timeout=timeout)
-        resp.raise_for_status()
-        return resp.text
+        return fetch_text(url, timeout=timeout)
     except requests.exceptions.Timeout:
         raise ConnectionError(f"Timeout while fetching data from {url}")
     except requests.exceptions.ConnectionError:
         raise ConnectionError(f"Could not connect to {url}")
     except requests.exceptions.HTTPError as e:
         raise ConnectionError(f"HTTP error {e.response.status_code} when fetching {url}")
+    except requests.exceptions.RetryError:
+        raise ConnectionError(f"Too many failed attempts when fetching {url}")
 
 
 def _detect_header_index(raw_text: str) -> int:
@@ -52,7 +68,7 @@ def _coerce_and_sort(df: pd.DataFrame) -> pd.DataFrame:
     - Session/session -> Int64 (keeps friendly display with column_config)
     - UAI -> string trimmed
     """
-    d = df.copy()
+    d = df.copy(deep=False)
 
     if "num_ligne" in d.columns:
         d["num_ligne"] = pd.to_numeric(d["num_ligne"], errors="coerce").astype("Int64")
@@ -71,21 +87,24 @@ def _coerce_and_sort(df: pd.DataFrame) -> pd.DataFrame:
     return d
 
 
-@st.cache_data(show_spinner=False)
+@frame_resource
 def load_data(
-    path_or_url: str = "data/fr-en-indicateurs-valeur-ajoutee-colleges.csv",
+    path_or_url: str = DATA_SOURCE,
     sep: str = ";",
 ) -> pd.DataFrame:
     """
     Robust CSV loader for the IVAC dataset.
 
-    - Accepts a local path or an HTTP(S) URL
+    - Accepts a local path or an HTTP(S) URL (`.parquet` files are read as-is)
     - Handles UTF-8 BOM and stray lines before header
     - Uses `;` as the default separator (data.gouv.fr export)
     - Coerces useful dtypes and sorts by `num_ligne` (if present)
-    - Cached with Streamlit for performance
+    - Cached once per process; callers get copy-on-write views
     """
-    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
+    if not is_url(path_or_url) and path_or_url.endswith(".parquet"):
+        return pd.read_parquet(path_or_url)
+
+    if is_url(path_or_url):
         raw_text = _read_text_url(path_or_url)
     else:
         raw_text = _read_text_local(path_or_url)
@@ -100,24 +119,17 @@ def load_data(
 @st.cache_data(show_spinner=False)
 def fetch_csv(url: str, sep: str = ";", encoding: str = "utf-8") -> pd.DataFrame:
     """
-    Simple network fetcher (no disk), cached by Streamlit.
-    Use when you want *live* reads without storing the file.
+    Network fetcher cached by Streamlit.
+    Reads are revalidated against the HTTP disk cache (304 when unchanged).
     """
-    resp = requests.get(url, timeout=60)
-    resp.raise_for_status()
-    return pd.read_csv(io.StringIO(resp.text), sep=sep, encoding=encoding)
+    return pd.read_csv(io.BytesIO(fetch_bytes(url, timeout=60)), sep=sep, encoding=encoding)
 
 
-def fetch_and_cache_to_disk(url: str, dest_path: str) -> str:
+def fetch_and_cache_to_disk(url: str, dest_path: str, revalidate: bool = True) -> str:
     """
-    Download a file once and keep it on disk (idempotent).
-    Returns the destination path as string.
+    Download a file and keep it on disk (idempotent).
+    - revalidate=True: conditional GET, a 304 keeps the local copy
+    - revalidate=False: never touch the network once the file exists
+    Interrupted downloads are resumed. Returns the destination path as string.
     """
-    dest = Path(dest_path)
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    if dest.exists() and dest.stat().st_size > 0:
-        return str(dest)
-    resp = requests.get(url, timeout=120)
-    resp.raise_for_status()
-    dest.write_bytes(resp.content)
-    return str(dest)
\ No newline at end of file
+    return str(fetch_to_cache(url, dest=dest_path, timeout=120, revalidate=revalidate))
\ No newline at end of file
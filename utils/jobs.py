@@ -0,0 +1,86 @@
+# utils/jobs.py
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from utils.telemetry import span
+
+# Heavy per-session work (sandbox cleaning, KNN) runs here instead of in the script threads.
+# Shared by every session of the process; extra jobs wait in the executor queue.
+MAX_WORKERS = int(os.environ.get("IVAC_JOB_WORKERS", 2))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ivac-job")
+_ids = itertools.count(1)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its owner asked for cancellation."""
+
+
+class Job:
+    """
+    Handle on a background job: progress, cancellation and result.
+    The job function receives the handle and calls `report()` between steps;
+    `report()` raises `JobCancelled` once `cancel()` was called.
+    """
+
+    def __init__(self, name: str):
+        self.id = next(_ids)
+        self.name = name
+        self.state = "queued"      # queued -> running -> done | failed | cancelled
+        self.progress = 0.0
+        self.step: str | None = None
+        self.result: Any = None
+        self.error: str | None = None
+        self.submitted_at = time.time()
+        self.finished_at: float | None = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    def report(self, progress: float, step: str | None = None) -> None:
+        """Record progress in [0, 1]; raises `JobCancelled` when cancellation was requested."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if step is not None:
+            self.step = step
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():  # still queued: never starts
+            self.state, self.finished_at = "cancelled", time.time()
+
+    @property
+    def cancelling(self) -> bool:
+        return self._cancel.is_set() and not self.finished
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    def _run(self, func: Callable, args: tuple, kwargs: dict) -> None:
+        if self._cancel.is_set():
+            self.state, self.finished_at = "cancelled", time.time()
+            return
+        self.state = "running"
+        try:
+            with span(f"job.{self.name}"):
+                self.result = func(self, *args, **kwargs)
+            self.progress, self.state = 1.0, "done"
+        except JobCancelled:
+            self.state = "cancelled"
+        except Exception as e:
+            self.error, self.state = f"{type(e).__name__}: {e}", "failed"
+        self.finished_at = time.time()
+
+
+def submit(name: str, func: Callable, *args, **kwargs) -> Job:
+    """Run `func(job, *args, **kwargs)` in the shared job pool and return its handle."""
+    job = Job(name)
+    job._future = _executor.submit(job._run, func, args, kwargs)
+    return job
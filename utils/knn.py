@@ -0,0 +1,190 @@
+# utils/knn.py
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Blocks processed in worker processes only above this many rows in total
+PARALLEL_MIN_ROWS = 100_000
+# Upper bound for the memory used by all workers together (MB)
+MEMORY_CAP_MB = int(os.environ.get("IVAC_KNN_MEMORY_MB", 1024))
+QUERY_BATCH = 4096
+
+
+def _nan_stats(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        return np.nanmean(values, axis=0), np.nanstd(values, axis=0)
+
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    mean, std = _nan_stats(values)
+    std[~np.isfinite(std) | (std == 0)] = 1.0
+    mean[~np.isfinite(mean)] = 0.0
+    return (values - mean) / std
+
+
+def knn_impute_block(values: np.ndarray, n_neighbors: int = 5) -> np.ndarray:
+    """
+    KNN-impute one block (rows x numeric columns, NaN = missing).
+
+    Rows are grouped by missingness pattern; for each pattern and each missing column,
+    donors are the rows that observe that column and all of the pattern's observed
+    columns. Neighbours come from a KD-tree on the standardized observed features and
+    are averaged with inverse-distance weights (like `KNNImputer(weights="distance")`).
+    Cells without any usable donor are left missing (the caller falls back to wider blocks).
+    """
+    out = values.copy()
+    missing = np.isnan(values)
+    if not missing.any():
+        return out
+    scaled = _standardize(values)
+    patterns, inverse = np.unique(missing, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    for p, pattern in enumerate(patterns):
+        if not pattern.any():
+            continue
+        rows = np.flatnonzero(inverse == p)
+        observed = np.flatnonzero(~pattern)
+        if observed.size == 0:
+            continue
+        base_donors = ~missing[:, observed].any(axis=1)
+        for col in np.flatnonzero(pattern):
+            donors = np.flatnonzero(base_donors & ~missing[:, col])
+            if donors.size == 0:
+                continue
+            k = min(n_neighbors, donors.size)
+            tree = cKDTree(scaled[np.ix_(donors, observed)])
+            for start in range(0, rows.size, QUERY_BATCH):
+                batch = rows[start:start + QUERY_BATCH]
+                dist, idx = tree.query(scaled[np.ix_(batch, observed)], k=k)
+                dist, idx = dist.reshape(len(batch), k), idx.reshape(len(batch), k)
+                weights = 1.0 / np.maximum(dist, 1e-12)
+                neighbours = values[donors[idx], col]
+                out[batch, col] = (weights * neighbours).sum(axis=1) / weights.sum(axis=1)
+    return out
+
+
+def _block_bytes(rows: int, cols: int) -> int:
+    # values + scaled + output + masks, plus query scratch
+    return rows * cols * 8 * 4 + QUERY_BATCH * 64
+
+
+def _workers_for(largest_block: int, cols: int, max_workers: Optional[int], memory_cap_mb: int) -> int:
+    by_memory = max(1, (memory_cap_mb * 2**20) // max(_block_bytes(largest_block, cols), 1))
+    cpus = os.cpu_count() or 1
+    return int(max(1, min(max_workers or cpus, cpus, by_memory)))
+
+
+def _pool_context():
+    # Streamlit serves from threads: never fork the live server process
+    methods = mp.get_all_start_methods()
+    return mp.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _groups_with_missing(d: pd.DataFrame, blocks: list[str], values: np.ndarray) -> list[np.ndarray]:
+    """Row positions of each block that still has a missing cell."""
+    if not blocks:
+        return [np.arange(len(d))] if np.isnan(values).any() else []
+    codes = d.groupby(blocks, dropna=False, sort=False).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    return [g for g in np.split(order, bounds) if np.isnan(values[g]).any()]
+
+
+def _run_blocks(
+    values: np.ndarray,
+    groups: list[np.ndarray],
+    n_neighbors: int,
+    max_workers: Optional[int],
+    memory_cap_mb: int,
+    progress: Optional[Callable[[int, int], None]],
+) -> None:
+    """Impute every block of `values` in place (inline, or in a memory-capped process pool)."""
+    total = len(groups)
+    if progress:
+        progress(0, total)
+    if not total:
+        return
+    workers = _workers_for(max(len(g) for g in groups), values.shape[1], max_workers, memory_cap_mb)
+    if workers == 1 or sum(len(g) for g in groups) < PARALLEL_MIN_ROWS:
+        for i, g in enumerate(groups, 1):
+            values[g] = knn_impute_block(values[g], n_neighbors)
+            if progress:
+                progress(i, total)
+        return
+
+    # At most two blocks per worker in flight, so pending inputs stay within the cap too
+    pending, queue, done = {}, iter(groups), 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        def submit_next():
+            g = next(queue, None)
+            if g is not None:
+                pending[pool.submit(knn_impute_block, values[g], n_neighbors)] = g
+
+        try:
+            for _ in range(2 * workers):
+                submit_next()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    values[pending.pop(fut)] = fut.result()
+                    done += 1
+                    if progress:
+                        progress(done, total)
+                    submit_next()
+        except BaseException:
+            # e.g. the progress callback cancelled the job: drop the queued blocks
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def knn_impute(
+    df: pd.DataFrame,
+    cols: list[str],
+    blocks: list[str] | None = None,
+    n_neighbors: int = 5,
+    max_workers: Optional[int] = None,
+    memory_cap_mb: int = MEMORY_CAP_MB,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> pd.DataFrame:
+    """
+    Scalable KNN imputation of `cols`, blocked by `blocks` (e.g. academie x session).
+
+    Each block is imputed independently with a KD-tree neighbour search, so the cost is
+    ~ n log n per block instead of quadratic in the whole selection. Large inputs run the
+    blocks in a process pool whose size is capped by `memory_cap_mb`.
+    `progress(done, total)` is called after each block of the main pass.
+    Columns without missing values are returned untouched.
+    """
+    d = df.copy(deep=False)
+    cols = [c for c in cols if c in d.columns]
+    if not cols:
+        return d
+    values = d[cols].apply(pd.to_numeric, errors="coerce").astype("float64").to_numpy(copy=True)
+    imputed = np.isnan(values).any(axis=0)
+    blocks = [b for b in (blocks or []) if b in d.columns]
+
+    # Finest blocks first; cells left without donors retry on coarser blocks (academie x session
+    # -> academie -> whole frame), then get the column mean
+    for depth in range(len(blocks), -1, -1):
+        if not np.isnan(values).any():
+            break
+        groups = _groups_with_missing(d, blocks[:depth], values)
+        _run_blocks(values, groups, n_neighbors, max_workers, memory_cap_mb, progress if depth == len(blocks) else None)
+    if np.isnan(values).any():
+        col_mean, _ = _nan_stats(values)
+        values = np.where(np.isnan(values), col_mean, values)
+
+    # Only columns that had gaps are written back; the others keep their dtype
+    for i in np.flatnonzero(imputed):
+        d[cols[i]] = values[:, i]
+    return d
@@ -0,0 +1,180 @@
+# utils/loadtest.py
+"""
+Headless load test: N concurrent sessions click through the app pages.
+
+    python -m utils.loadtest --sessions 8 --rounds 2 --clicks 3 [--source data.csv] [--json out.json]
+
+Each session is a Streamlit `AppTest` (the real `app.py`, same process and caches as a
+replica). It visits the five menu pages in order, then changes random filters on each
+page (`--clicks` times). Reported: rerun latency p50/p95/p99 (overall, per page and for
+navigation vs. filter changes), throughput in reruns/s, peak RSS and failed reruns.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+PAGES = ["Introduction", "Data Quality & Profiling", "Overview & Analysis", "Deep Dives", "Conclusions"]
+# Widgets left alone: the menu itself and the language toggles
+SKIP_KEYS = ("nav_page", "lang")
+
+
+class _PeakRss:
+    """Samples the process RSS in a background thread and keeps the maximum."""
+
+    def __init__(self, interval: float = 0.05):
+        from utils.telemetry import rss_bytes
+        self._rss = rss_bytes
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ivac-loadtest-rss", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _failed(at) -> bool:
+    return bool(at.exception) or any("error occurred" in e.value for e in at.error)
+
+
+def _filter_widgets(at) -> list:
+    widgets = [*at.selectbox, *at.multiselect, *at.slider, *at.radio]
+    return [w for w in widgets if not (w.key or "").startswith(SKIP_KEYS) and getattr(w, "options", True)]
+
+
+def _randomize(widget, rng: random.Random) -> None:
+    """Give one widget a random value (selectbox / multiselect / slider / radio)."""
+    kind = type(widget).__name__
+    if kind == "Selectbox":
+        widget.select_index(rng.randrange(len(widget.options)))
+    elif kind == "Multiselect":
+        widget.set_value(rng.sample(list(widget.options), k=rng.randint(1, min(5, len(widget.options)))))
+    elif kind == "Slider":
+        lo, hi, step = widget.min, widget.max, widget.step or 1
+        widget.set_value(lo + step * rng.randrange(int((hi - lo) / step) + 1))
+    elif kind == "Radio":
+        widget.set_value(rng.choice(list(widget.options)))
+
+
+def run_session(session_id: int, rounds: int, clicks: int, seed: int, timeout: float) -> list[dict]:
+    """One simulated user; returns one record per rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    samples = []
+
+    def rerun(at, page: str, action: str):
+        t0 = time.perf_counter()
+        at.run(timeout=timeout)
+        samples.append({
+            "session": session_id, "page": page, "action": action,
+            "latency_ms": (time.perf_counter() - t0) * 1000, "failed": _failed(at),
+        })
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    rerun(at, "Introduction", "open")
+    for _ in range(rounds):
+        for page in PAGES:
+            at.sidebar.radio(key="nav_page").set_value(page)
+            rerun(at, page, "navigate")
+            for _ in range(clicks):
+                widgets = _filter_widgets(at)
+                if not widgets:
+                    break
+                try:
+                    _randomize(rng.choice(widgets), rng)
+                except Exception:  # stale or unsupported widget: skip this click
+                    continue
+                rerun(at, page, "filter")
+    return samples
+
+
+def _percentiles(latencies: pd.Series) -> dict:
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"reruns": int(latencies.size), "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "p99_ms": round(p99, 1)}
+
+
+def run_loadtest(sessions: int = 4, rounds: int = 1, clicks: int = 3, seed: int = 0,
+                 timeout: float = 120, warm: bool = True) -> dict:
+    """Drive `sessions` concurrent users and return the aggregated report."""
+    from utils import warmup
+    from utils.io import DATA_SOURCE
+    from utils.shared import raw_stats
+
+    if warm:
+        warmup.run_warmup()
+    else:
+        # Cold run: pages compute on first use instead of rendering the warm-up placeholder
+        os.environ["IVAC_WARMUP"] = "0"
+        warmup.ENABLED = False
+    t0 = time.perf_counter()
+    with _PeakRss() as rss, ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(run_session, i, rounds, clicks, seed, timeout) for i in range(sessions)]
+        df = pd.DataFrame([s for f in futures for s in f.result()])
+    wall = time.perf_counter() - t0
+
+    return {
+        "source": DATA_SOURCE,
+        "rows": raw_stats(DATA_SOURCE)["rows"],
+        "sessions": sessions,
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(df) / wall, 2),
+        "peak_rss_mb": round(rss.peak / 2**20, 1),
+        "failed": int(df["failed"].sum()),
+        "overall": _percentiles(df["latency_ms"]),
+        "by_action": {a: _percentiles(g["latency_ms"]) for a, g in df.groupby("action")},
+        "by_page": {p: _percentiles(g["latency_ms"]) for p, g in df.groupby("page")},
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"source      {report['source']} ({report['rows']:,} rows)")
+    print(f"sessions    {report['sessions']}   wall {report['wall_s']}s   "
+          f"throughput {report['throughput_rps']} reruns/s   peak RSS {report['peak_rss_mb']} MB   "
+          f"failed {report['failed']}")
+    rows = [("overall", report["overall"])]
+    rows += [(f"[{k}]", v) for k, v in report["by_action"].items()]
+    rows += list(report["by_page"].items())
+    print(f"{'':<28}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, p in rows:
+        print(f"{name:<28}{p['reruns']:>8}{p['p50_ms']:>10}{p['p95_ms']:>10}{p['p99_ms']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the IVAC app.")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated users")
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the five pages per user")
+    parser.add_argument("--clicks", type=int, default=3, help="random filter changes per page visit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout (s)")
+    parser.add_argument("--source", help="dataset path or URL (sets IVAC_DATA_URL)")
+    parser.add_argument("--cold", action="store_true", help="no cache warm-up: pages compute on first use")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+    if args.source:
+        os.environ["IVAC_DATA_URL"] = args.source
+
+    report = run_loadtest(args.sessions, args.rounds, args.clicks, args.seed, args.timeout, warm=not args.cold)
+    _print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
@@ -0,0 +1,144 @@
+# utils/oplog.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import pandas as pd
+
+from utils.cache import cow_view
+from utils.telemetry import note_miss, span
+
+# Results of replayed logs, shared by all sessions (LRU, one entry per log prefix)
+RESULT_CACHE_SIZE = int(os.environ.get("IVAC_SANDBOX_CACHE", 16))
+
+Op = tuple  # (kind, ((param, value), ...)), hashable and JSON-friendly
+
+_results: OrderedDict[str, pd.DataFrame] = OrderedDict()
+_lock = threading.Lock()
+
+
+def make_op(kind: str, **params) -> Op:
+    """Normalized op descriptor: sequences become tuples, params are sorted by name."""
+    norm = {k: tuple(v) if isinstance(v, (list, tuple)) else v for k, v in params.items()}
+    return (kind, tuple(sorted(norm.items())))
+
+
+def describe(op: Op) -> str:
+    kind, params = op
+    shown = [f"{k}={'/'.join(map(str, v)) if isinstance(v, tuple) else v}" for k, v in params if v not in (None, (), False)]
+    return f"{kind}({', '.join(shown)})" if shown else kind
+
+
+def log_hash(base_key: str, ops: tuple[Op, ...]) -> str:
+    """Stable digest of a base + op sequence (the cache key)."""
+    payload = json.dumps([base_key, ops], default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class OpLog:
+    """
+    Per-session sandbox state: steps of ops (one per user action) and an undo cursor.
+    Immutable: every edit returns a new log, so session state only holds descriptors.
+    """
+
+    steps: tuple[tuple[Op, ...], ...] = ()
+    cursor: int = 0
+
+    @property
+    def ops(self) -> tuple[Op, ...]:
+        """Active ops, flattened (undone steps excluded)."""
+        return tuple(op for step in self.steps[:self.cursor] for op in step)
+
+    @property
+    def can_undo(self) -> bool:
+        return self.cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self.cursor < len(self.steps)
+
+    def push(self, ops: list[Op]) -> OpLog:
+        """Append one step; anything that was undone is dropped."""
+        if not ops:
+            return self
+        return OpLog(self.steps[:self.cursor] + (tuple(ops),), self.cursor + 1)
+
+    def undo(self) -> OpLog:
+        return OpLog(self.steps, max(self.cursor - 1, 0))
+
+    def redo(self) -> OpLog:
+        return OpLog(self.steps, min(self.cursor + 1, len(self.steps)))
+
+
+def _get(key: str) -> Optional[pd.DataFrame]:
+    with _lock:
+        df = _results.get(key)
+        if df is not None:
+            _results.move_to_end(key)
+        return df
+
+
+def _put(key: str, df: pd.DataFrame) -> None:
+    with _lock:
+        _results[key] = df
+        _results.move_to_end(key)
+        while len(_results) > RESULT_CACHE_SIZE:
+            _results.popitem(last=False)
+
+
+def cache_info() -> dict:
+    """Entries and deep bytes held by the shared result cache."""
+    with _lock:
+        frames = list(_results.values())
+    return {
+        "entries": len(frames),
+        "max_entries": RESULT_CACHE_SIZE,
+        "bytes": int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames)),
+    }
+
+
+def cached(base_key: str, ops: tuple[Op, ...]) -> Optional[pd.DataFrame]:
+    """Cached result of `ops`, or None (never computes)."""
+    df = _get(log_hash(base_key, ops))
+    return cow_view(df) if df is not None else None
+
+
+def replay(
+    base_key: str,
+    base: pd.DataFrame,
+    ops: tuple[Op, ...],
+    apply: Callable[[pd.DataFrame, Op, Optional[Callable]], pd.DataFrame],
+    report: Optional[Callable[[float, str], None]] = None,
+) -> pd.DataFrame:
+    """
+    Apply `ops` to `base`, starting from the longest cached prefix. Every intermediate
+    result is cached, so undo and edits at the end of the log only recompute the tail.
+    `apply(df, op, progress)` runs one op; `report(fraction, step)` follows the replay.
+    """
+    with span("oplog.replay", cached=True, ops=len(ops)) as s:
+        start, df = 0, base
+        for i in range(len(ops), 0, -1):
+            hit = _get(log_hash(base_key, ops[:i]))
+            if hit is not None:
+                start, df = i, hit
+                break
+        todo = len(ops) - start
+        if todo:
+            note_miss()
+        for i in range(start, len(ops)):
+            done = i - start
+            progress = None
+            if report:
+                report(done / todo, describe(ops[i]))
+                progress = lambda d, t, done=done: report((done + d / max(t, 1)) / todo, None)
+            df = apply(df, ops[i], progress)
+            _put(log_hash(base_key, ops[:i + 1]), df)
+        s["rows"] = len(df)
+        return cow_view(df)
@@ -0,0 +1,99 @@
+# utils/paging.py
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.artifacts import active_bundle, read_manifest
+from utils.cache import frame_resource
+from utils.io import DATA_SOURCE
+from utils.prep import build_indexes
+
+PAGE_SIZE = 200
+
+
+@frame_resource
+def positional_indexes(source: str = DATA_SOURCE) -> Dict[str, pd.DataFrame]:
+    """Row positions per key value of the cleaned frame (from the bundle when one is served)."""
+    bundle = active_bundle()
+    if bundle is not None:
+        files = read_manifest(bundle)["files"]
+        return {
+            name[len("index_"):-len(".parquet")]: pd.read_parquet(bundle / entry["path"])
+            for name, entry in files.items()
+            if name.startswith("index_")
+        }
+    from utils.shared import load_tables
+    return build_indexes(load_tables(source)["cleaned"])
+
+
+def select_positions(df: pd.DataFrame, indexes: Dict[str, pd.DataFrame], filters: dict) -> Optional[np.ndarray]:
+    """
+    Sorted row positions matching `filters` ({column: values}, empty values = no filter).
+    Indexed columns are resolved from the positional index without scanning the frame;
+    the others fall back to a mask. None means "all rows".
+    """
+    positions = None
+    for col, values in filters.items():
+        if not values:
+            continue
+        if col in indexes:
+            idx = indexes[col]
+            hits = idx.loc[idx["value"].isin([str(v) for v in values]), "rows"]
+            rows = np.sort(np.concatenate([np.asarray(r) for r in hits])) if len(hits) else np.empty(0, dtype="int64")
+        elif col in df.columns:
+            rows = np.flatnonzero(df[col].isin(values).to_numpy())
+        else:
+            continue
+        positions = rows if positions is None else np.intersect1d(positions, rows, assume_unique=True)
+    return positions
+
+
+@frame_resource(max_entries=64)
+def sorted_positions(cache_key: str, by: Optional[str], ascending: bool, _df: pd.DataFrame,
+                     _positions: Optional[np.ndarray]) -> np.ndarray:
+    """Positions of the selection `cache_key` in display order (computed once per sort)."""
+    positions = np.arange(len(_df)) if _positions is None else np.asarray(_positions)
+    if by is None or by not in _df.columns:
+        return positions
+    values = _df[by].iloc[positions].reset_index(drop=True)
+    order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+    return positions[order]
+
+
+def fetch_page(df: pd.DataFrame, order: np.ndarray, page: int, size: int = PAGE_SIZE) -> pd.DataFrame:
+    """Rows of page `page` (1-based) only."""
+    start = (page - 1) * size
+    return df.iloc[order[start:start + size]]
+
+
+def paged_table(df: pd.DataFrame, T: dict, widget_key: str, cache_key: str,
+                positions: Optional[np.ndarray] = None, page_size: int = PAGE_SIZE) -> None:
+    """
+    Server-side sorted and paginated `st.dataframe`: only the visible page and the total
+    count are sent to the browser, whatever the size of the selection.
+    `T` provides the sort_by / sort_none / descending / page / rows_of labels.
+    """
+    total = len(df) if positions is None else len(positions)
+    n_pages = max(1, -(-total // page_size))
+    page_key = f"{widget_key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    by = c1.selectbox(T["sort_by"], [None, *df.columns], format_func=lambda c: c or T["sort_none"], key=f"{widget_key}_sort")
+    descending = c2.toggle(T["descending"], key=f"{widget_key}_desc", disabled=by is None)
+    page = c3.number_input(T["page"], min_value=1, max_value=n_pages, value=1, step=1, key=page_key)
+
+    order = sorted_positions(cache_key, by, not descending, df, positions)
+    view = fetch_page(df, order, int(page), page_size)
+    start = (int(page) - 1) * page_size
+    st.dataframe(view, use_container_width=True, hide_index=True)
+    st.caption(T["rows_of"].format(
+        start=f"{min(start + 1, total):,}".replace(",", " "),
+        end=f"{start + len(view):,}".replace(",", " "),
+        total=f"{total:,}".replace(",", " "),
+    ))
@@ -0,0 +1,146 @@
+# utils/points.py
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import frame_resource
+from utils.io import DATA_SOURCE
+
+# Commune centroid reference: CSV with code_departement, commune, lat, lon. The dataset
+# has no coordinates, so the school map is only offered when this file is installed.
+COMMUNES_SOURCE = os.environ.get("IVAC_COMMUNES", "assets/communes_centroids.csv")
+# Target hexagon width on screen; the bin size in degrees follows the zoom level
+HEX_PX = 36
+TILE_PX = 256
+FRANCE_CENTER = {"lat": 46.6, "lon": 2.4}
+
+
+def _commune_key(s: pd.Series) -> pd.Series:
+    from utils.prep import _to_snake
+    return s.astype(str).map(_to_snake)
+
+
+def load_commune_centroids(path: str = COMMUNES_SOURCE) -> pd.DataFrame | None:
+    """Commune reference table (None when not installed)."""
+    if not Path(path).exists():
+        return None
+    from utils.departments import canonical_code
+
+    ref = pd.read_csv(path, dtype={"code_departement": str})
+    ref = ref.assign(code_departement=ref["code_departement"].map(canonical_code), commune_key=_commune_key(ref["commune"]))
+    return ref[["code_departement", "commune_key", "lat", "lon"]].drop_duplicates(["code_departement", "commune_key"])
+
+
+@frame_resource
+def school_points(source: str = DATA_SOURCE) -> pd.DataFrame:
+    """
+    One row per school and session placed at its commune centroid. Schools whose commune
+    is not in the reference table are left out (`unplaced_schools` counts them); empty
+    when no reference table is installed.
+    """
+    from utils.departments import department_dim, join_features
+    from utils.shared import load_tables
+
+    ref = load_commune_centroids()
+    df = load_tables(source)["cleaned"]
+    cols = [c for c in ("uai", "nom_de_l_etablissement", "commune", "code_departement", "session_str", "valeur_ajoutee") if c in df.columns]
+    if ref is None or not {"commune", "code_departement"}.issubset(cols):
+        return pd.DataFrame(columns=[*cols, "lon", "lat"])
+    # Canonical department codes (2A / 2B, no leading-zero variants), as in the reference table
+    matched, unmatched = join_features(df[cols], department_dim(source))
+    pts = pd.concat([matched, unmatched])
+    hit = pts.assign(commune_key=_commune_key(pts["commune"])).merge(ref, on=["code_departement", "commune_key"], how="inner")
+    return hit.drop(columns="commune_key").reset_index(drop=True)
+
+
+@frame_resource
+def unplaced_schools(source: str = DATA_SOURCE) -> int:
+    """Number of schools (UAI) with no commune centroid, hence missing from the school map."""
+    from utils.shared import load_tables
+
+    placed = school_points(source)
+    schools = load_tables(source)["cleaned"]["uai"].nunique()
+    return int(schools - placed["uai"].nunique()) if "uai" in placed.columns else int(schools)
+
+
+def hex_size_for_zoom(zoom: float) -> float:
+    """Hexagon size (degrees) that is about HEX_PX wide at web-map `zoom`."""
+    return HEX_PX * 360.0 / (TILE_PX * 2.0 ** zoom)
+
+
+def hexbin(lon: np.ndarray, lat: np.ndarray, values: np.ndarray, size: float) -> pd.DataFrame:
+    """
+    Aggregate points into pointy-top hexagons of `size` degrees (NumPy only): axial
+    coordinates with cube rounding on a local equirectangular projection, then one
+    bincount per statistic. Returns centre lon/lat, point count and mean value per bin.
+    """
+    if len(lon) == 0:
+        return pd.DataFrame(columns=["lon", "lat", "count", "mean"])
+    lat0 = np.deg2rad(np.nanmean(lat))
+    x, y = lon * np.cos(lat0), lat
+
+    # Pixel -> fractional axial (q, r), then round in cube space (x + y + z = 0)
+    q = (np.sqrt(3) / 3 * x - y / 3) / size
+    r = (2 / 3 * y) / size
+    cx, cz = q, r
+    cy = -cx - cz
+    rx, ry, rz = np.round(cx), np.round(cy), np.round(cz)
+    dx, dy, dz = np.abs(rx - cx), np.abs(ry - cy), np.abs(rz - cz)
+    fix_x = (dx > dy) & (dx > dz)
+    fix_z = ~fix_x & (dz >= dy)
+    rx = np.where(fix_x, -ry - rz, rx)
+    rz = np.where(fix_z, -rx - ry, rz)
+    q_i, r_i = rx.astype("int64"), rz.astype("int64")
+
+    keys, bins = np.unique(np.stack([q_i, r_i], axis=1), axis=0, return_inverse=True)
+    bins = bins.ravel()
+    count = np.bincount(bins, minlength=len(keys))
+    valid = ~np.isnan(values)
+    total = np.bincount(bins[valid], weights=values[valid], minlength=len(keys))
+    n_valid = np.bincount(bins[valid], minlength=len(keys))
+
+    cx = size * (np.sqrt(3) * keys[:, 0] + np.sqrt(3) / 2 * keys[:, 1])
+    cy = size * (1.5 * keys[:, 1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n_valid > 0, total / n_valid, np.nan)
+    return pd.DataFrame({"lon": cx / np.cos(lat0), "lat": cy, "count": count, "mean": mean})
+
+
+@frame_resource(max_entries=64)
+def school_bins(zoom: int, sessions: tuple[str, ...] = (), source: str = DATA_SOURCE) -> pd.DataFrame:
+    """
+    Hex bins of the schools of `sessions` (all when empty) sized for `zoom`, cached per view.
+    Each school counts once: its rows are averaged first, placed at its latest commune.
+    """
+    pts = school_points(source)
+    if sessions and "session_str" in pts.columns:
+        pts = pts[pts["session_str"].isin(sessions)]
+    if "session_str" in pts.columns:
+        pts = pts.sort_values("session_str", kind="stable")
+    agg = {"lon": "last", "lat": "last"}
+    if "valeur_ajoutee" in pts.columns:
+        agg["valeur_ajoutee"] = "mean"
+    schools = pts.groupby("uai", sort=False).agg(agg) if "uai" in pts.columns else pts
+    values = schools["valeur_ajoutee"].to_numpy(dtype="float64") if "valeur_ajoutee" in schools.columns else np.full(len(schools), np.nan)
+    return hexbin(schools["lon"].to_numpy(dtype="float64"), schools["lat"].to_numpy(dtype="float64"), values, hex_size_for_zoom(zoom))
+
+
+def points_figure(bins: pd.DataFrame, zoom: int, title: str | None = None, height: int = 600,
+                  count_label: str = "count", mean_label: str = "mean"):
+    """Bubble map of hex bins: size = number of schools, colour = mean value added."""
+    import plotly.express as px
+
+    fig = px.scatter_map(
+        bins.rename(columns={"count": count_label, "mean": mean_label}),
+        lat="lat", lon="lon", size=count_label, color=mean_label,
+        color_continuous_scale="RdYlGn", color_continuous_midpoint=0,
+        size_max=28, zoom=zoom, center=FRANCE_CENTER, map_style="carto-positron",
+        hover_data={"lat": False, "lon": False, count_label: True, mean_label: ":.2f"},
+        title=title,
+    )
+    fig.update_layout(margin=dict(l=10, r=10, t=40, b=10), height=height)
+    return fig
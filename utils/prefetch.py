@@ -0,0 +1,111 @@
+# utils/prefetch.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.http import fetch_to_cache
+from utils.io import DATA_SOURCE, is_url, load_data
+from utils.geo import GEOJSON_SOURCE, load_geojson
+
+MAX_CONCURRENCY = 4
+
+
+@dataclass
+class PrefetchResult:
+    """Outcome of one remote asset download + cache hand-off."""
+    name: str
+    url: str
+    path: Path | None = None
+    fetch_s: float = 0.0
+    load_s: float = 0.0
+    error: str | None = None
+
+
+def declared_assets() -> dict[str, str]:
+    """Remote assets the app is configured with (local paths are skipped)."""
+    sources = {"ivac_csv": DATA_SOURCE, "departements_geojson": GEOJSON_SOURCE}
+    return {name: src for name, src in sources.items() if is_url(src)}
+
+
+# Cached loader fed with each downloaded asset (reads the fresh disk copy, no extra round trip)
+LOADERS = {
+    "ivac_csv": load_data,
+    "departements_geojson": load_geojson,
+}
+
+
+async def _prefetch_one(name: str, url: str, sem: asyncio.Semaphore) -> PrefetchResult:
+    res = PrefetchResult(name=name, url=url)
+    async with sem:
+        t0 = time.perf_counter()
+        try:
+            res.path = await asyncio.to_thread(fetch_to_cache, url)
+        except Exception as e:
+            res.error = f"{type(e).__name__}: {e}"
+            return res
+        finally:
+            res.fetch_s = time.perf_counter() - t0
+
+    loader = LOADERS.get(name)
+    if loader is not None:
+        t1 = time.perf_counter()
+        try:
+            await asyncio.to_thread(loader, url)
+        except Exception as e:
+            res.error = f"{type(e).__name__}: {e}"
+        res.load_s = time.perf_counter() - t1
+    return res
+
+
+async def prefetch_all(assets: dict[str, str] | None = None, max_concurrency: int = MAX_CONCURRENCY) -> list[PrefetchResult]:
+    """Download every asset concurrently (at most `max_concurrency` in flight)."""
+    assets = declared_assets() if assets is None else assets
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    return list(await asyncio.gather(*(_prefetch_one(n, u, sem) for n, u in assets.items())))
+
+
+def prefetch(assets: dict[str, str] | None = None, max_concurrency: int = MAX_CONCURRENCY) -> list[PrefetchResult]:
+    """Blocking entry point (runs its own event loop)."""
+    return asyncio.run(prefetch_all(assets, max_concurrency))
+
+
+_state = {"started": False, "done": False, "results": []}
+_lock = threading.Lock()
+
+
+def start_background_prefetch(max_concurrency: int = MAX_CONCURRENCY) -> bool:
+    """
+    Kick off the prefetch once per process in a daemon thread.
+    Returns False if it was already started or there is nothing remote to fetch.
+    """
+    with _lock:
+        if _state["started"] or not declared_assets():
+            return False
+        _state["started"] = True
+
+    def _run():
+        _state["results"] = prefetch(max_concurrency=max_concurrency)
+        _state["done"] = True
+
+    threading.Thread(target=_run, name="ivac-prefetch", daemon=True).start()
+    return True
+
+
+def prefetch_report() -> list[PrefetchResult]:
+    """Per-asset timings of the process-start prefetch (empty until it completes)."""
+    return list(_state["results"])
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    results = prefetch()
+    if not results:
+        print("No remote assets configured (set IVAC_DATA_URL / IVAC_GEOJSON_URL).")
+    for r in results:
+        status = r.error or str(r.path)
+        print(f"{r.name:<22} fetch {r.fetch_s:6.2f}s  load {r.load_s:6.2f}s  {status}")
+    print(f"total {time.perf_counter() - t0:.2f}s")
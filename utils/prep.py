@@ -1,9 +1,11 @@
 # utils/prep.py
 import re
 from typing import Dict, Tuple
+import numpy as np
 import pandas as pd
-import streamlit as st
 
+import utils.cache  # noqa: F401  - enables pandas copy-on-write for the data layer
+from utils.telemetry import traced
 
 
 def _ensure_session_str(df: pd.DataFrame | None) -> pd.DataFrame | None:
@@ -14,7 +16,7 @@ def _ensure_session_str(df: pd.DataFrame | None) -> pd.DataFrame | None:
     if df is None or df.empty:
         return df
     if "session" in df.columns and "session_str" not in df.columns:
-        df = df.copy()
+        df = df.copy(deep=False)
         df["session"] = df["session"].astype("Int64")
         df["session_str"] = df["session"].astype(str)
     return df
@@ -44,13 +46,16 @@ def _to_snake(s: str) -> str:
     s = re.sub(r"_+", "_", s).strip("_")
     return s
 
-@st.cache_data(show_spinner=False)
+@traced()
 def clean_ivac(df: pd.DataFrame) -> pd.DataFrame:
-    """Cleans and standardizes the raw IVAC dataframe."""
+    """
+    Cleans and standardizes the raw IVAC dataframe.
+    Not cached itself: use `utils.shared.load_tables()["cleaned"]` for the per-process copy.
+    """
     if df is None or df.empty:
         return df
     
-    d = df.copy()
+    d = df.copy(deep=False)
     d.columns = [_to_snake(c) for c in d.columns]
 
     # Define numeric columns with better organization
@@ -97,12 +102,16 @@ def clean_ivac(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # data aggregation functions
+@traced()
 def make_tables(df_raw: pd.DataFrame) -> Dict[str, pd.DataFrame]:
     """Builds pre-aggregated tables used by the dashboard."""
-    df = clean_ivac(df_raw.copy())
+    return build_tables(clean_ivac(df_raw))
+
 
-    # Return full cleaned data, not just latest session
-    df_latest = df.copy()
+def build_tables(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Builds the pre-aggregated tables from an already cleaned dataframe."""
+    # Return full cleaned data, not just latest session (same buffers under copy-on-write)
+    df_latest = df
 
     timeseries_cols = [c for c in ["taux_reussite_g", "valeur_ajoutee"] if c in df.columns]
     ts = pd.DataFrame()
@@ -137,6 +146,57 @@ def make_tables(df_raw: pd.DataFrame) -> Dict[str, pd.DataFrame]:
     }
 
 
+CUBE_DIMS = ["session_str", "region_academique", "academie", "code_departement", "departement", "secteur"]
+CUBE_METRICS = ["valeur_ajoutee", "taux_reussite_g", "nb_candidats_total"]
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregation cube at the finest territorial grain (session x ... x departement x secteur).
+    Stores sums and counts so any roll-up (e.g. by session x departement) is an exact mean.
+    """
+    dims = [c for c in CUBE_DIMS if c in df.columns]
+    metrics = [c for c in CUBE_METRICS if c in df.columns]
+    if not dims or not metrics:
+        return pd.DataFrame()
+    grouped = df.groupby(dims, dropna=False, observed=True)[metrics]
+    cube = grouped.sum(min_count=1).add_suffix("_sum").join(grouped.count().add_suffix("_n"))
+    cube["n_schools"] = df.groupby(dims, dropna=False, observed=True).size()
+    return cube.reset_index()
+
+
+def rollup_cube(cube: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
+    """Roll the cube up to `dims`, returning exact means per metric."""
+    metrics = [c[:-4] for c in cube.columns if c.endswith("_sum")]
+    agg = cube.groupby(dims, dropna=False, observed=True)[[f"{m}_sum" for m in metrics] + [f"{m}_n" for m in metrics] + ["n_schools"]].sum()
+    out = pd.DataFrame({m: agg[f"{m}_sum"] / agg[f"{m}_n"].replace(0, np.nan) for m in metrics})
+    out["n_schools"] = agg["n_schools"]
+    return out.reset_index()
+
+
+def build_panel(df: pd.DataFrame, value: str = "valeur_ajoutee") -> pd.DataFrame:
+    """School x session panel (one row per UAI, one column per session)."""
+    if not {"uai", "session_str", value}.issubset(df.columns):
+        return pd.DataFrame()
+    return df.pivot_table(index="uai", columns="session_str", values=value, aggfunc="mean")
+
+
+def build_indexes(df: pd.DataFrame, cols: tuple[str, ...] = ("session_str", "region_academique", "academie", "code_departement")) -> Dict[str, pd.DataFrame]:
+    """Positional indexes: for each key value, the row positions holding it."""
+    indexes = {}
+    for col in cols:
+        if col not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[col], sort=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        indexes[col] = pd.DataFrame({
+            "value": np.asarray(uniques, dtype=object).astype(str),
+            "rows": [order[bounds[i]:bounds[i + 1]].astype("int32") for i in range(len(uniques))],
+        })
+    return indexes
+
+
 def compute_kpis(df_latest: pd.DataFrame) -> Tuple[str, str, str]:
     """Computes three simple KPIs from the latest session dataframe."""
     kpi1 = "N/A"
@@ -164,10 +224,15 @@ def info_table(df: pd.DataFrame) -> pd.DataFrame:
     .assign(Null_Pct=lambda d: (d["Null Count"] / len(df) * 100).round(2))
     .sort_values(["Null_Pct", "Dtype"], ascending=[False, True]))
 
+def is_clean(df: pd.DataFrame) -> bool:
+    """True when the frame already went through `clean_ivac` (snake_case columns)."""
+    return "session_str" in df.columns and all(c == _to_snake(c) for c in df.columns)
+
+
 def validity_checks(df: pd.DataFrame) -> dict:
-    """Performs data validity checks specific to the IVAC dataset."""
+    """Performs data validity checks specific to the IVAC dataset (raw or cleaned input)."""
     issues = {}
-    clean_df = clean_ivac(df.copy()) 
+    clean_df = df if is_clean(df) else clean_ivac(df)
 
     if "taux_reussite_g" in clean_df.columns:
         bad = ~clean_df["taux_reussite_g"].between(0, 100) & clean_df["taux_reussite_g"].notna()
@@ -194,7 +259,7 @@ def validity_checks(df: pd.DataFrame) -> dict:
 
 def profile_dataframe(df_raw: pd.DataFrame) -> dict:
     """Generates a basic profile of the raw dataframe."""
-    df_clean = clean_ivac(df_raw.copy())
+    df_clean = clean_ivac(df_raw)
     return {
         "shape_rows": int(df_raw.shape[0]),
         "shape_cols": int(df_raw.shape[1]),
@@ -239,7 +304,7 @@ def diff_columns_breakdown(df_raw: pd.DataFrame, df_clean: pd.DataFrame) -> dict
 #in
 def impute_numeric(df: pd.DataFrame, cols: list[str], strategy: str = "median") -> pd.DataFrame:
     """Imputes missing numeric values."""
-    d = df.copy()
+    d = df.copy(deep=False)
     for c in cols:
         if c in d.columns:
             if strategy == "median":
@@ -248,9 +313,58 @@ def impute_numeric(df: pd.DataFrame, cols: list[str], strategy: str = "median")
                 d[c] = d[c].fillna(d[c].mean())
     return d
 
+# Territorial nesting used for imputation fallback (finest first, then national)
+GROUP_HIERARCHY = ("departement", "academie", "region_academique")
+
+
+def group_levels(group_by: str) -> list[str]:
+    """Fallback chain starting at `group_by` (e.g. academie -> region_academique)."""
+    if group_by in GROUP_HIERARCHY:
+        return list(GROUP_HIERARCHY[GROUP_HIERARCHY.index(group_by):])
+    return [group_by]
+
+
+def impute_grouped(df: pd.DataFrame, cols: list[str], levels: list[str], strategy: str = "median") -> pd.DataFrame:
+    """
+    Vectorized group-wise imputation of several numeric columns at once.
+
+    For each level (finest first) all group statistics are computed in one `groupby` and
+    broadcast back through the group codes; values still missing (group entirely NaN, or
+    no group key) fall back to the next level, then to the national statistic.
+    Columns without missing values are returned untouched.
+    """
+    d = df.copy(deep=False)
+    cols = [c for c in cols if c in d.columns]
+    if not cols or strategy not in {"median", "mean"}:
+        return d
+    values = d[cols].apply(pd.to_numeric, errors="coerce").astype("float64")
+    out = values.to_numpy(copy=True)
+    missing = np.isnan(out)
+    imputed = missing.any(axis=0)
+
+    for level in (lv for lv in levels if lv in d.columns):
+        if not missing.any():
+            break
+        codes, uniques = pd.factorize(d[level])
+        stats = values.groupby(codes).agg(strategy).reindex(range(len(uniques))).to_numpy()
+        # Rows without a group key (code -1) get NaN and keep falling back
+        fill = np.vstack([stats, np.full((1, len(cols)), np.nan)])[codes]
+        out = np.where(missing, fill, out)
+        missing = np.isnan(out)
+
+    if missing.any():
+        national = values.agg(strategy).to_numpy()
+        out = np.where(missing, national, out)
+
+    # Only columns that had gaps are written back; the others keep their dtype
+    for i in np.flatnonzero(imputed):
+        d[cols[i]] = out[:, i]
+    return d
+
+
 def impute_categorical(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
     """Imputes missing categorical values with the mode."""
-    d = df.copy()
+    d = df.copy(deep=False)
     for c in cols:
         if c in d.columns:
             mode_val = d[c].mode()
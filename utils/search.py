@@ -0,0 +1,106 @@
+# utils/search.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import frame_resource
+from utils.io import DATA_SOURCE
+from utils.prep import _to_snake
+
+# Fields searched, in display order; each school (UAI) is one document
+FIELDS = ("nom_de_l_etablissement", "commune", "uai")
+# Share of the query's trigrams a document must contain to be returned
+MIN_SCORE = 0.5
+
+
+def fold(text) -> str:
+    """Accent-folded, lower-case words ('Collège Émile' -> 'college emile'), as `_to_snake` normalizes column names."""
+    return _to_snake(text if isinstance(text, str) else str(text)).replace("_", " ")
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of each folded word, padded so that word starts weigh like in a prefix search."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    Trigram inverted index over schools. Postings are stored CSR-style (one sorted array
+    of document ids per trigram), so a query is a few dictionary lookups, one
+    concatenation and one `np.bincount` over the documents.
+    """
+
+    def __init__(self, docs: pd.DataFrame):
+        self.docs = docs.reset_index(drop=True)
+        folded = self.docs["text"].to_list()
+        vocab: dict[str, int] = {}
+        gram_ids, doc_ids = [], []
+        for doc, text in enumerate(folded):
+            for gram in trigrams(text):
+                gram_ids.append(vocab.setdefault(gram, len(vocab)))
+                doc_ids.append(doc)
+        gram_ids = np.asarray(gram_ids, dtype="int32")
+        order = np.argsort(gram_ids, kind="stable")
+        self.vocab = vocab
+        self.postings = np.asarray(doc_ids, dtype="int32")[order]
+        self.offsets = np.searchsorted(gram_ids[order], np.arange(len(vocab) + 1)).astype("int64")
+        self.uai = self.docs["uai"].str.upper().to_numpy().astype(str)
+        self._labels = dict(zip(self.docs["uai"], self.docs["label"]))
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def label_of(self, uai: str) -> str:
+        return self._labels.get(uai, uai)
+
+    def search(self, query: str, limit: int = 20) -> pd.DataFrame:
+        """Best matches for `query` (typos tolerated), UAI prefix matches first."""
+        text = fold(query)
+        if not text:
+            return self.docs.iloc[:0]
+        query_grams = trigrams(text)
+        grams = [self.vocab[g] for g in query_grams if g in self.vocab]
+        scores = np.zeros(len(self.docs))
+        if grams:
+            hits = np.concatenate([self.postings[self.offsets[g]:self.offsets[g + 1]] for g in grams])
+            scores = np.bincount(hits, minlength=len(self.docs)) / len(query_grams)
+        # A UAI typed from its start is an exact lookup, whatever its trigram score
+        code = query.strip().upper()
+        if len(code) >= 3:
+            scores = np.where(np.char.startswith(self.uai, code), 2.0, scores)
+
+        candidates = np.flatnonzero(scores >= MIN_SCORE)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+        best = candidates[np.lexsort((self.docs["label"].to_numpy()[candidates], -scores[candidates]))]
+        return self.docs.iloc[best].assign(score=scores[best])
+
+
+def build_search_docs(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per UAI with its latest name, commune and académie, a display label and the folded text."""
+    cols = [c for c in (*FIELDS, "academie", "session_str") if c in df.columns]
+    if "uai" not in cols:
+        return pd.DataFrame(columns=["uai", "label", "text"])
+    latest = df[cols].dropna(subset=["uai"])
+    if "session_str" in latest.columns:
+        latest = latest.sort_values("session_str", kind="stable")
+    docs = latest.drop_duplicates("uai", keep="last").drop(columns=["session_str"], errors="ignore")
+    docs = docs.assign(uai=docs["uai"].astype(str)).fillna({c: "" for c in cols if c != "uai"})
+    searchable = [c for c in FIELDS if c in docs.columns]
+    label = docs["uai"]
+    if "nom_de_l_etablissement" in docs.columns:
+        label = docs["nom_de_l_etablissement"].astype(str) + (" – " + docs["commune"].astype(str) if "commune" in docs.columns else "") + " (" + docs["uai"] + ")"
+    text = docs[searchable].astype(str).agg(" ".join, axis=1).map(fold)
+    return docs.assign(label=label, text=text).sort_values("label", kind="stable")
+
+
+@frame_resource
+def search_index(source: str = DATA_SOURCE) -> SearchIndex:
+    """National school search index, built once per process (about a millisecond per query afterwards)."""
+    from utils.shared import load_tables
+    return SearchIndex(build_search_docs(load_tables(source)["cleaned"]))
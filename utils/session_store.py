@@ -0,0 +1,170 @@
+# utils/session_store.py
+from __future__ import annotations
+
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import Any
+
+import pandas as pd
+import streamlit as st
+
+# Per-session byte budget for objects kept through this store
+BUDGET_BYTES = int(float(os.environ.get("IVAC_SESSION_BUDGET_MB", 32)) * 2**20)
+# Over budget, least recently used entries are spilled to compressed files ("disk") or dropped ("off")
+SPILL = os.environ.get("IVAC_SESSION_SPILL", "disk") != "off"
+
+_STATE_KEY = "_ivac_store"
+_stores: "weakref.WeakSet[SessionStore]" = weakref.WeakSet()
+_stores_lock = threading.Lock()
+_MISSING = object()
+
+
+def sizeof(obj: Any) -> int:
+    """Approximate bytes held by `obj` (deep for frames, pickled size otherwise)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(obj)
+
+
+class SessionStore:
+    """
+    Key/value storage for one session with a byte budget.
+    Entries are kept in LRU order; when the total exceeds the budget the oldest ones
+    are pickled + zlib-compressed to a per-session temp directory (or dropped) and
+    transparently reloaded by `get()`.
+    """
+
+    def __init__(self, budget: int = BUDGET_BYTES, spill: bool = SPILL):
+        self.budget = budget
+        self.spill = spill
+        self._mem: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._disk: dict[str, tuple[str, int]] = {}
+        self._lock = threading.RLock()
+        self._dir: str | None = None
+        self._seq = 0
+        self.evictions = 0
+        self.spills = 0
+        with _stores_lock:
+            _stores.add(self)
+
+    def _spill_dir(self) -> str:
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="ivac-session-")
+            weakref.finalize(self, shutil.rmtree, self._dir, True)
+        return self._dir
+
+    def _evict(self, key: str, value: Any, size: int) -> None:
+        if self.spill:
+            try:
+                blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+                self._seq += 1
+                path = os.path.join(self._spill_dir(), f"{self._seq}.pkl.z")
+                with open(path, "wb") as fh:
+                    fh.write(blob)
+                self._disk[key] = (path, len(blob))
+                self.spills += 1
+                return
+            except Exception:  # unpicklable or disk error: drop it instead
+                pass
+        self.evictions += 1
+
+    def _enforce(self) -> None:
+        while self.memory_bytes > self.budget and self._mem:
+            key, (value, size) = self._mem.popitem(last=False)
+            self._evict(key, value, size)
+
+    def _drop_disk(self, key: str) -> None:
+        path, _ = self._disk.pop(key)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._mem.pop(key, None)
+            if key in self._disk:
+                self._drop_disk(key)
+            self._mem[key] = (value, sizeof(value))
+            self._enforce()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key][0]
+            if key in self._disk:
+                path, _ = self._disk[key]
+                try:
+                    with open(path, "rb") as fh:
+                        value = pickle.loads(zlib.decompress(fh.read()))
+                except (OSError, zlib.error, pickle.UnpicklingError):
+                    self._drop_disk(key)
+                    self.evictions += 1
+                    return default
+                self._drop_disk(key)
+                self._mem[key] = (value, sizeof(value))
+                self._enforce()
+                return value
+            return default
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self.get(key, _MISSING)
+            self._mem.pop(key, None)
+            return default if value is _MISSING else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._mem or key in self._disk
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(size for _, size in self._mem.values())
+
+    @property
+    def spilled_bytes(self) -> int:
+        return sum(size for _, size in self._disk.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "keys": len(self._mem) + len(self._disk),
+                "memory_bytes": self.memory_bytes,
+                "spilled_bytes": self.spilled_bytes,
+                "spills": self.spills,
+                "evictions": self.evictions,
+            }
+
+
+def session_store() -> SessionStore:
+    """The current session's store (created on first use, released with the session)."""
+    if _STATE_KEY not in st.session_state:
+        st.session_state[_STATE_KEY] = SessionStore()
+    return st.session_state[_STATE_KEY]
+
+
+def totals() -> dict:
+    """Process-wide accounting over all live sessions (for the Performance page / telemetry export)."""
+    with _stores_lock:
+        stats = [s.stats() for s in list(_stores)]
+    return {
+        "sessions": len(stats),
+        "budget_bytes": BUDGET_BYTES,
+        "memory_bytes": sum(s["memory_bytes"] for s in stats),
+        "max_session_bytes": max((s["memory_bytes"] for s in stats), default=0),
+        "spilled_bytes": sum(s["spilled_bytes"] for s in stats),
+        "spills": sum(s["spills"] for s in stats),
+        "evictions": sum(s["evictions"] for s in stats),
+    }
@@ -0,0 +1,49 @@
+# utils/shared.py
+from __future__ import annotations
+
+from typing import Dict
+
+import pandas as pd
+
+from utils.artifacts import active_bundle, bundle_file, read_tables
+from utils.cache import frame_resource
+from utils.io import DATA_SOURCE, load_data
+from utils.prep import build_cube, make_tables
+
+
+def raw_profile(df_raw: pd.DataFrame) -> dict:
+    """Raw-level figures the pages show (shape, column names, duplicates, missing values per column)."""
+    return {
+        "rows": len(df_raw),
+        "columns": [str(c) for c in df_raw.columns],
+        "duplicates": int(df_raw.duplicated().sum()),
+        "missing": {str(c): int(n) for c, n in df_raw.isna().sum().items()},
+    }
+
+
+@frame_resource
+def raw_stats(source: str = DATA_SOURCE) -> dict:
+    """`raw_profile` of the source, computed once per process."""
+    return raw_profile(load_data(source))
+
+
+@frame_resource
+def load_tables(source: str = DATA_SOURCE) -> Dict[str, pd.DataFrame]:
+    """
+    Dataset-level tables, built once per process and shared by all sessions
+    (each call returns copy-on-write views, see `utils.cache.frame_resource`).
+    With IVAC_ARTIFACTS the tables are read from the prebuilt bundle (`python -m utils.build`).
+    """
+    bundle = active_bundle()
+    if bundle is not None:
+        return read_tables(bundle)
+    return make_tables(load_data(source))
+
+
+@frame_resource
+def load_cube(source: str = DATA_SOURCE) -> pd.DataFrame:
+    """Aggregation cube (sums and counts, see `utils.prep.build_cube`), from the bundle when one is served."""
+    path = bundle_file("cube.parquet")
+    if path is not None:
+        return pd.read_parquet(path)
+    return build_cube(load_tables(source)["cleaned"])
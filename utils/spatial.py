@@ -0,0 +1,147 @@
+# utils/spatial.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import streamlit as st
+
+from utils.geo import GEOJSON_SOURCE, MAP_HEIGHT, geometry_store
+
+PERMUTATIONS = 999
+SIGNIFICANCE = 0.05
+# LISA quadrant of (value, spatial lag) relative to the mean; "ns" when not significant
+CLUSTERS = ("HH", "LH", "LL", "HL")
+CLUSTER_COLORS = {"HH": "#1a9641", "LL": "#d7191c", "HL": "#a6d96a", "LH": "#fdae61", "ns": "#e0e0e0"}
+
+
+@dataclass(frozen=True)
+class Weights:
+    """Binary contiguity between departments: `codes[i]` touches `codes[j]` when matrix[i, j] = 1."""
+    codes: np.ndarray
+    matrix: sp.csr_matrix
+
+    def subset(self, codes: Sequence[str]) -> "Weights":
+        """Weights restricted to `codes` (in that order); unknown codes get no neighbours."""
+        index = {c: i for i, c in enumerate(self.codes)}
+        rows = np.array([index.get(c, -1) for c in codes], dtype="int64")
+        known = np.flatnonzero(rows >= 0)
+        pick = sp.csr_matrix((np.ones(len(known)), (known, rows[known])), shape=(len(codes), len(self.codes)))
+        return Weights(np.asarray(codes, dtype=object), (pick @ self.matrix @ pick.T).tocsr())
+
+    def standardized(self) -> sp.csr_matrix:
+        """Row-standardized matrix (rows sum to 1; islands stay all-zero)."""
+        card = np.asarray(self.matrix.sum(axis=1)).ravel()
+        inv = np.divide(1.0, card, out=np.zeros_like(card, dtype="float64"), where=card > 0)
+        return (sp.diags(inv) @ self.matrix).tocsr()
+
+
+def contiguity(geometries, codes: Sequence[str]) -> Weights:
+    """Queen contiguity (shared border or corner) from one STRtree query over all shapes."""
+    import shapely
+
+    tree = shapely.STRtree(geometries)
+    left, right = tree.query(geometries, predicate="intersects")
+    keep = left != right
+    n = len(codes)
+    matrix = sp.csr_matrix((np.ones(keep.sum()), (left[keep], right[keep])), shape=(n, n))
+    matrix.data[:] = 1.0  # duplicates (multi-part shapes) collapse to one link
+    return Weights(np.asarray(codes, dtype=object), matrix)
+
+
+@st.cache_resource(show_spinner=False)
+def department_weights(source: str = GEOJSON_SOURCE) -> Optional[Weights]:
+    """Contiguity of the department shapes, built once per process from the geometry store."""
+    store = geometry_store("medium", source)
+    if store is None:
+        return None
+    return contiguity(store.geometries, store.codes)
+
+
+def _pseudo_p(observed: np.ndarray, simulated: np.ndarray) -> np.ndarray:
+    """Folded pseudo p-value: share of permutations at least as extreme on the observed side."""
+    mean = simulated.mean(axis=-1)
+    above = observed[..., None] <= simulated
+    larger = np.where(observed >= mean, above.sum(axis=-1), (~above).sum(axis=-1))
+    return (larger + 1) / (simulated.shape[-1] + 1)
+
+
+def moran(values: np.ndarray, weights: Weights, permutations: int = PERMUTATIONS, seed: int = 0) -> dict:
+    """
+    Global Moran's I and local (LISA) statistics on row-standardized weights, with
+    conditional permutation inference batched in NumPy: one (permutations x max
+    neighbours) draw shared by every department, as in the usual `crand` scheme.
+    Returns I, its pseudo p-value, and per department the local I, p-value and cluster.
+    """
+    x = np.asarray(values, dtype="float64")
+    n = len(x)
+    W = weights.standardized()
+    z = x - x.mean()
+    m2 = (z ** 2).sum() / n
+    lag = W @ z
+    s0 = W.sum()
+    rng = np.random.default_rng(seed)
+
+    # Global: permute the whole vector, all permutations in one sparse product
+    perms = rng.random((permutations, n)).argsort(axis=1)
+    zp = z[perms]
+    global_i = n / s0 * (z @ lag) / (z @ z)
+    sim_global = n / s0 * (zp * (W @ zp.T).T).sum(axis=1) / (z @ z)
+
+    # Local: hold z_i fixed, draw its k_i neighbours among the n - 1 other departments
+    local_i = z * lag / m2
+    card = np.diff(W.indptr)
+    k_max = max(int(card.max()), 1) if n else 1
+    draws = rng.random((permutations, n - 1)).argsort(axis=1)[:, :k_max]
+    ids = draws[None, :, :] + (draws[None, :, :] >= np.arange(n)[:, None, None])  # skip i itself
+    used = np.arange(k_max)[None, None, :] < card[:, None, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lag_sim = np.where(used, z[ids], 0.0).sum(axis=2) / np.where(card > 0, card, 1)[:, None]
+    sim_local = z[:, None] * lag_sim / m2
+    local_p = _pseudo_p(local_i, sim_local)
+
+    quadrant = np.select([(z > 0) & (lag > 0), (z <= 0) & (lag > 0), (z <= 0) & (lag <= 0)], [0, 1, 2], 3)
+    significant = (local_p <= SIGNIFICANCE) & (card > 0)
+    cluster = np.where(significant, np.asarray(CLUSTERS, dtype=object)[quadrant], "ns")
+    return {
+        "I": float(global_i),
+        "p": float(_pseudo_p(np.array(global_i), sim_global)),
+        "local": pd.DataFrame({"code": weights.codes, "local_i": local_i, "p": local_p, "cluster": cluster}),
+    }
+
+
+def department_clusters(frame: pd.DataFrame, value_col: str, dep_code_col: str = "code_departement",
+                        permutations: int = PERMUTATIONS) -> Optional[dict]:
+    """Moran's I and LISA clusters of `value_col` over the departments present in `frame`."""
+    weights = department_weights()
+    data = frame[[dep_code_col, value_col]].dropna()
+    if weights is None or len(data) < 3:
+        return None
+    data = data.groupby(dep_code_col, as_index=False)[value_col].mean()
+    return moran(data[value_col].to_numpy(), weights.subset(data[dep_code_col].astype(str).to_list()), permutations)
+
+
+def cluster_map_figure(local: pd.DataFrame, geojson: dict, labels: dict | None = None,
+                       title: str | None = None, height: int = MAP_HEIGHT):
+    """Choropleth layer of LISA clusters (HH / LL hot and cold spots, HL / LH outliers)."""
+    import plotly.express as px
+
+    labels = labels or {}
+    df = local.assign(cluster=local["cluster"].map(lambda c: labels.get(c, c)))
+    fig = px.choropleth(
+        df,
+        geojson=geojson,
+        locations="code",
+        featureidkey="properties.code",
+        color="cluster",
+        color_discrete_map={labels.get(k, k): v for k, v in CLUSTER_COLORS.items()},
+        category_orders={"cluster": [labels.get(k, k) for k in (*CLUSTERS, "ns")]},
+        hover_data={"code": True, "local_i": ":.2f", "p": ":.3f"},
+        title=title,
+    )
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(margin=dict(l=10, r=10, t=40, b=10), height=height)
+    return fig
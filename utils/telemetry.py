@@ -0,0 +1,171 @@
+# utils/telemetry.py
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+# Last N spans kept in memory (process-wide, shared by all sessions)
+BUFFER_SIZE = int(os.environ.get("IVAC_TELEMETRY_SIZE", 5000))
+ENABLED = os.environ.get("IVAC_TELEMETRY", "1") != "0"
+
+_buffer: deque[dict] = deque(maxlen=BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+_local = threading.local()
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (0 when unavailable)."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # peak RSS, the best portable approximation
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return 0
+
+
+def _stack() -> list[dict]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def count_rows(obj: Any) -> int | None:
+    """Rows in a frame, or summed over a dict/list of frames."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    if isinstance(obj, dict):
+        counts = [count_rows(v) for v in obj.values()]
+    elif isinstance(obj, (list, tuple)):
+        counts = [count_rows(v) for v in obj]
+    else:
+        return None
+    counts = [c for c in counts if c is not None]
+    return sum(counts) if counts else None
+
+
+@contextmanager
+def span(name: str, cached: bool = False, **attrs):
+    """
+    Time a block and record it. The yielded dict can be filled in by the caller
+    (e.g. `s["rows"] = len(df)`). With `cached=True` the span counts as a cache hit
+    unless `note_miss()` is called while it is open.
+    """
+    if not ENABLED:
+        yield dict(attrs)
+        return
+    stack = _stack()
+    record = {
+        "name": name,
+        "parent": stack[-1]["name"] if stack else None,
+        "cache": "hit" if cached else None,
+        "rows": None,
+        **attrs,
+    }
+    stack.append(record)
+    rss0, t0 = rss_bytes(), time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["wall_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        record["rss_delta_kb"] = (rss_bytes() - rss0) // 1024
+        record["ts"] = time.time()
+        stack.pop()
+        with _buffer_lock:
+            _buffer.append(record)
+
+
+def note_miss() -> None:
+    """Mark the innermost open span as a cache miss (called from inside cached bodies)."""
+    stack = _stack()
+    if stack:
+        stack[-1]["cache"] = "miss"
+
+
+def marks_miss(func: Callable) -> Callable:
+    """Wrap the body of a cached function so running it flags the caller's span as a miss."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        note_miss()
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def traced(name: str | None = None, cached: bool = False) -> Callable:
+    """Decorator form of `span`; rows are counted from the returned frame(s), else the first frame argument."""
+    def decorate(func: Callable) -> Callable:
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label, cached=cached) as s:
+                result = func(*args, **kwargs)
+                rows = count_rows(result)
+                if rows is None and args:
+                    rows = count_rows(args[0])
+                s["rows"] = rows
+                return result
+        return wrapper
+    return decorate
+
+
+def records() -> list[dict]:
+    """Snapshot of the ring buffer (oldest first)."""
+    with _buffer_lock:
+        return list(_buffer)
+
+
+def clear() -> None:
+    with _buffer_lock:
+        _buffer.clear()
+
+
+def summary(spans: list[dict] | None = None) -> pd.DataFrame:
+    """Per-span statistics: calls, p50/p95 wall time, rows, cache hit ratio, RSS delta."""
+    df = pd.DataFrame(spans if spans is not None else records())
+    if df.empty:
+        return pd.DataFrame(columns=["name", "calls", "p50_ms", "p95_ms", "max_ms", "rows", "hit_ratio", "rss_delta_kb"])
+    df["rows"] = pd.to_numeric(df["rows"], errors="coerce")
+    grouped = df.groupby("name")
+    out = pd.DataFrame({
+        "calls": grouped.size(),
+        "p50_ms": grouped["wall_ms"].quantile(0.50),
+        "p95_ms": grouped["wall_ms"].quantile(0.95),
+        "max_ms": grouped["wall_ms"].max(),
+        "rows": grouped["rows"].median(),
+        "hit_ratio": grouped["cache"].agg(
+            lambda c: (c == "hit").sum() / c.notna().sum() if c.notna().any() else np.nan
+        ),
+        "rss_delta_kb": grouped["rss_delta_kb"].sum(),
+    })
+    return out.round(2).sort_values("p95_ms", ascending=False).reset_index()
+
+
+def export_json(spans: list[dict] | None = None, extra: dict | None = None) -> str:
+    """Spans + summary (+ `extra` process gauges, e.g. memory accounting) as a JSON document."""
+    spans = spans if spans is not None else records()
+    return json.dumps({
+        "exported_at": time.time(),
+        "pid": os.getpid(),
+        "rss_bytes": rss_bytes(),
+        **(extra or {}),
+        "summary": json.loads(summary(spans).to_json(orient="records")),
+        "spans": spans,
+    }, default=str)
@@ -0,0 +1,153 @@
+# utils/territory.py
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import frame_resource
+from utils.io import DATA_SOURCE
+
+# Drill-down levels, coarsest first; each node covers one contiguous range of `order`
+LEVELS = ("region_academique", "academie", "code_departement", "commune", "uai")
+METRICS = ("valeur_ajoutee", "taux_reussite_g")
+
+
+def _range_means(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Mean of the non-NaN `values` in each [starts[i], starts[i + 1]) range (one reduceat)."""
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    counts = np.add.reduceat(valid.astype("int64"), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+class TerritoryTree:
+    """
+    Region -> académie -> département -> commune -> UAI tree over the cleaned rows.
+    Rows are sorted once by the level keys (`order` holds their positions); every node
+    points to its [start, stop) range of `order`, so a node's rows, its children and its
+    number of schools are slices and binary searches, never a scan of the frame.
+    Aggregates are materialized per node for all sessions and per session. A school that
+    changed commune between sessions is one leaf per commune.
+    """
+
+    def __init__(self, df: pd.DataFrame, levels: Sequence[str] = LEVELS):
+        self.levels = [c for c in levels if c in df.columns]
+        keys = [df[c].astype(str).where(df[c].notna(), "") for c in self.levels]
+        codes = [pd.factorize(k, sort=True)[0] for k in keys]
+        self.order = np.lexsort(codes[::-1]) if codes else np.arange(len(df))
+        n = len(self.order)
+
+        sorted_codes = [c[self.order] for c in codes]
+        changed = np.zeros(max(n - 1, 0), dtype=bool)
+        starts_by_depth = []
+        for depth, col_codes in enumerate(sorted_codes):
+            changed |= col_codes[1:] != col_codes[:-1]
+            starts_by_depth.append(np.concatenate([[0], np.flatnonzero(changed) + 1]) if n else np.empty(0, dtype="int64"))
+
+        frames, offset = [], 0
+        leaf_starts = starts_by_depth[-1] if starts_by_depth else np.empty(0, dtype="int64")
+        names = {c: k.to_numpy()[self.order] for c, k in zip(self.levels, keys)}
+        school_names = df["nom_de_l_etablissement"].astype(str).to_numpy()[self.order] if "nom_de_l_etablissement" in df.columns else None
+        for depth, starts in enumerate(starts_by_depth):
+            stops = np.append(starts[1:], n)
+            if depth == 0:
+                parent = np.full(len(starts), -1, dtype="int64")
+            else:
+                prev = starts_by_depth[depth - 1]
+                parent = np.searchsorted(prev, starts, side="right") - 1 + frames[-1]["node"].iloc[0]
+            level = self.levels[depth]
+            label = names[level][starts]
+            if level == "uai" and school_names is not None:
+                label = school_names[stops - 1] + " (" + label + ")"
+            frames.append(pd.DataFrame({
+                "node": np.arange(offset, offset + len(starts)),
+                "depth": depth,
+                "level": level,
+                "name": names[level][starts],
+                "label": label,
+                "parent": parent,
+                "start": starts,
+                "stop": stops,
+                "n_rows": stops - starts,
+                "n_schools": np.searchsorted(leaf_starts, stops) - np.searchsorted(leaf_starts, starts),
+            }))
+            offset += len(starts)
+        self.nodes = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=["node", "depth", "level", "name", "label", "parent", "start", "stop", "n_rows", "n_schools"])
+        self._materialize(df)
+
+    def _materialize(self, df: pd.DataFrame) -> None:
+        """Per-node means of METRICS, over all sessions and for each session."""
+        metrics = [m for m in METRICS if m in df.columns]
+        starts = self.nodes.groupby("depth")["start"].apply(np.asarray)
+        for m in metrics:
+            values = df[m].to_numpy(dtype="float64")[self.order]
+            self.nodes[m] = np.concatenate([_range_means(values, s) for s in starts]) if len(starts) else []
+        rows = []
+        if "session_str" in df.columns and len(starts):
+            sessions = df["session_str"].astype(str).to_numpy()[self.order]
+            for session in sorted(set(sessions)):
+                in_session = sessions == session
+                count = np.concatenate([np.add.reduceat(in_session.astype("int64"), s) for s in starts])
+                stats = {"node": self.nodes["node"].to_numpy(), "session_str": session, "n_rows": count}
+                for m in metrics:
+                    values = np.where(in_session, df[m].to_numpy(dtype="float64")[self.order], np.nan)
+                    stats[m] = np.concatenate([_range_means(values, s) for s in starts])
+                rows.append(pd.DataFrame(stats))
+        self.session_stats = pd.concat(rows, ignore_index=True).set_index(["session_str", "node"]) if rows else None
+
+    def names(self, level: str, within: Optional[int] = None) -> List[str]:
+        """Sorted distinct names at `level`, optionally under node `within`."""
+        nodes = self.at(level, within)
+        return sorted(set(nodes["name"]) - {""})
+
+    def at(self, level: str, within: Optional[int] = None) -> pd.DataFrame:
+        """Nodes of `level` (under node `within` when given), found by range containment."""
+        nodes = self.nodes[self.nodes["level"] == level]
+        if within is not None:
+            start, stop = self.nodes.loc[within, ["start", "stop"]]
+            nodes = nodes[(nodes["start"] >= start) & (nodes["stop"] <= stop)]
+        return nodes
+
+    def children(self, node: Optional[int] = None) -> pd.DataFrame:
+        """Child nodes (top-level nodes when `node` is None)."""
+        return self.nodes[self.nodes["parent"] == (-1 if node is None else node)]
+
+    def path(self, node: int) -> List[int]:
+        """Node ids from the root down to `node` (breadcrumb)."""
+        trail = []
+        while node >= 0:
+            trail.append(int(node))
+            node = int(self.nodes.at[node, "parent"])
+        return trail[::-1]
+
+    def rows(self, nodes) -> np.ndarray:
+        """Sorted frame positions of the rows under `nodes` (one id or several)."""
+        ranges = self.nodes.loc[np.atleast_1d(nodes), ["start", "stop"]].to_numpy()
+        if not len(ranges):
+            return np.empty(0, dtype="int64")
+        return np.sort(np.concatenate([self.order[a:b] for a, b in ranges]))
+
+    def select(self, level: str, names: Sequence[str]) -> np.ndarray:
+        """Positions of the rows whose `level` is one of `names`."""
+        nodes = self.nodes[(self.nodes["level"] == level) & self.nodes["name"].isin([str(n) for n in names])]
+        return self.rows(nodes["node"].to_numpy())
+
+    def stats(self, nodes: pd.DataFrame, session: Optional[str] = None) -> pd.DataFrame:
+        """`nodes` with their materialized aggregates for `session` (all sessions when None)."""
+        if session is None or self.session_stats is None:
+            return nodes
+        per_session = self.session_stats.loc[str(session)].reindex(nodes["node"])
+        return nodes.drop(columns=[c for c in per_session.columns if c in nodes.columns]).assign(
+            **{c: per_session[c].to_numpy() for c in per_session.columns}
+        )
+
+
+@frame_resource
+def territory_tree(source: str = DATA_SOURCE) -> TerritoryTree:
+    """Territory tree of the cleaned dataset, built once per process."""
+    from utils.shared import load_tables
+    return TerritoryTree(load_tables(source)["cleaned"])
@@ -1,8 +1,11 @@
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
 import plotly.io as pio
 
+from utils.telemetry import traced
+
 
 PRIMARY_BLUE = "#2563eb"
 NEGATIVE_RED = "#e11d48"
@@ -46,6 +49,7 @@ def _apply_common_layout(fig, xaxis_title=None, yaxis_title=None):
     fig.update_layout(**layout_params)
 
 
+@traced()
 def line_chart(df: pd.DataFrame, x: str, y: str, color: str | None = None, title: str | None = None, ref_y: float | None = None, ref_label: str | None = None, download_name: str | None = None, threshold_zones: list[dict] | None = None, annotations: list[dict] | None = None, xaxis_title: str | None = None, yaxis_title: str | None = None):
     """Create an interactive line chart with enhanced validation and error handling."""
     # Enhanced validation
@@ -108,11 +112,12 @@ def line_chart(df: pd.DataFrame, x: str, y: str, color: str | None = None, title
         st.caption("Vérifiez que les colonnes existent et contiennent des données valides.")
 
 
+@traced()
 def bar_chart(df: pd.DataFrame, x: str, y: str, color: str | None = None, title: str | None = None, ref_y: float | None = None, ref_label: str | None = None, download_name: str | None = None, sign_color: bool = False, threshold_zones: list[dict] | None = None, annotations: list[dict] | None = None, xaxis_title: str | None = None, yaxis_title: str | None = None):
     if df is None or df.empty or x not in df.columns or y not in df.columns:
         st.info("Aucune donnée à afficher pour l'histogramme.")
         return
-    plot_df = df.copy()
+    plot_df = df.copy(deep=False)
     color_arg = color
     color_map = None
     if sign_color:
@@ -162,6 +167,7 @@ def bar_chart(df: pd.DataFrame, x: str, y: str, color: str | None = None, title:
             st.caption("Astuce: installe kaleido pour activer l'export PNG.")
 
 
+@traced()
 def histogram(df: pd.DataFrame, x: str, nbins: int = 40, title: str | None = None, ref_x: float | None = None, ref_label: str | None = None, download_name: str | None = None, threshold_zones: list[dict] | None = None, annotations: list[dict] | None = None, xaxis_title: str | None = None, yaxis_title: str | None = None):
     if df is None or df.empty or x not in df.columns:
         st.info("Aucune donnée à afficher pour la distribution.")
@@ -208,6 +214,7 @@ def histogram(df: pd.DataFrame, x: str, nbins: int = 40, title: str | None = Non
             st.caption("Astuce: installe kaleido pour activer l'export PNG.")
 
 
+@traced()
 def boxplot(df: pd.DataFrame, x: str | None, y: str, color: str | None = None, title: str | None = None, download_name: str | None = None, xaxis_title: str | None = None, yaxis_title: str | None = None):
     if df is None or df.empty or y not in df.columns:
         st.info("Aucune donnée pour le boxplot.")
@@ -225,6 +232,7 @@ def boxplot(df: pd.DataFrame, x: str | None, y: str, color: str | None = None, t
             st.caption("Astuce: installe kaleido pour activer l'export PNG.")
 
 
+@traced()
 def scatter(df: pd.DataFrame, x: str, y: str, color: str | None = None, size: str | None = None, trendline: str | None = None, title: str | None = None, download_name: str | None = None, xaxis_title: str | None = None, yaxis_title: str | None = None):
     if df is None or df.empty or x not in df.columns or y not in df.columns:
         st.info("Aucune donnée pour le nuage de points.")
@@ -254,6 +262,7 @@ def scatter(df: pd.DataFrame, x: str, y: str, color: str | None = None, size: st
             st.caption("Astuce: installe kaleido pour activer l'export PNG.")
 
 
+@traced()
 def correlation_heatmap(df: pd.DataFrame, cols: list[str], title: str | None = None, download_name: str | None = None):
     if df is None or df.empty:
         st.info("Aucune donnée pour la matrice de corrélation.")
@@ -286,3 +295,46 @@ def make_color_map(categories):
     flat = [c for bank in banks for c in bank]
     return {cat: flat[i % len(flat)] for i, cat in enumerate(categories)}
 
+
+# Labels of the national trend figure, per language (also baked into prebuilt bundles)
+TREND_TEXTS = {
+    "en": {"va": " Avg value added", "rate": " Avg pass rate", "title": "Joint evolution: VA & Pass rate"},
+    "fr": {"va": "📈 VA moyenne", "rate": "🎓 Taux moyen", "title": "Évolution conjointe : VA & Taux de réussite"},
+}
+
+
+def trend_figure(ts: pd.DataFrame, lang: str) -> go.Figure:
+    """National VA / pass-rate trend (pure figure builder, shared by the overview and the artifact builder)."""
+    T = TREND_TEXTS[lang]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=ts["session_str"], y=ts["valeur_ajoutee"],
+        name=T["va"], mode="lines+markers",
+        line=dict(color="#3b82f6", width=4), marker=dict(size=10, line=dict(width=2, color='white'))
+    ))
+    if "taux_reussite_g" in ts.columns:
+        fig.add_trace(go.Scatter(
+            x=ts["session_str"], y=ts["taux_reussite_g"],
+            name=T["rate"], mode="lines+markers",
+            line=dict(color="#10b981", width=4, dash="dash"),
+            marker=dict(size=8), yaxis="y2"
+        ))
+    
+    fig.update_layout(
+        title=T["title"],
+        yaxis=dict(title=T["va"], side="left", color="#2E86AB"),
+        yaxis2=dict(title=T["rate"], side="right", overlaying="y", color="#A23B72"),
+        hovermode="x unified", height=450,
+        annotations=[
+            dict(
+                x=0.02, y=0.98,
+                xref="paper", yref="paper",
+                text="📈 Rising = Improvement<br>📉 Falling = Decline",
+                showarrow=False,
+                bgcolor="rgba(255,255,255,0.8)",
+                bordercolor="gray",
+                borderwidth=1
+            )
+        ]
+    )
+    return fig
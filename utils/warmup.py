@@ -0,0 +1,92 @@
+# utils/warmup.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+# IVAC_WARMUP=0 disables the background warm-up (pages then compute on first use)
+ENABLED = os.environ.get("IVAC_WARMUP", "1") != "0"
+
+_lock = threading.Lock()
+_status = {
+    "state": "idle",      # idle -> running -> ready | failed
+    "step": None,
+    "total": 0,
+    "timings": {},
+    "error": None,
+    "started_at": None,
+    "finished_at": None,
+}
+
+
+def _steps():
+    """Ordered (name, callable) pairs covering every dataset-level cached artifact."""
+    from utils.shared import load_tables, raw_stats
+    from utils.departments import department_dim
+    from utils.search import search_index
+    from utils.territory import territory_tree
+    from utils.geo import MAP_HEIGHT, load_map_geojson, resolution_for
+    from sections.conclusions import conclusion_metrics
+    from sections.intro import dataset_summary
+    from sections.profiling import dataset_checks
+
+    return [
+        ("raw_stats", raw_stats),
+        ("load_tables", load_tables),
+        ("map_geojson", lambda: load_map_geojson(resolution_for(MAP_HEIGHT))),
+        ("department_dim", department_dim),
+        ("search_index", search_index),
+        ("territory_tree", territory_tree),
+        ("profiling_checks", dataset_checks),
+        ("intro_summary", dataset_summary),
+        ("conclusion_metrics", conclusion_metrics),
+    ]
+
+
+def run_warmup() -> dict:
+    """Compute every artifact synchronously, recording per-step timings."""
+    with _lock:
+        _status.update(state="running", started_at=time.time(), error=None)
+    try:
+        steps = _steps()
+        _status["total"] = len(steps)
+        for name, step in steps:
+            _status["step"] = name
+            t0 = time.perf_counter()
+            step()
+            _status["timings"][name] = round(time.perf_counter() - t0, 3)
+        _status.update(state="ready", step=None)
+    except Exception as e:
+        _status.update(state="failed", error=f"{type(e).__name__}: {e}")
+    _status["finished_at"] = time.time()
+    return status()
+
+
+def start_warmup() -> bool:
+    """Start the warm-up in a daemon thread, once per process. Returns True if it was started now."""
+    if not ENABLED:
+        return False
+    with _lock:
+        if _status["state"] != "idle":
+            return False
+        _status["state"] = "running"
+    threading.Thread(target=run_warmup, name="ivac-warmup", daemon=True).start()
+    return True
+
+
+def is_ready() -> bool:
+    """True once warm-up finished (a failed warm-up also releases the pages)."""
+    return not ENABLED or _status["state"] in ("ready", "failed")
+
+
+def status() -> dict:
+    """Snapshot of the warm-up status (state, current step, per-step timings, error)."""
+    return {**_status, "timings": dict(_status["timings"])}
+
+
+if __name__ == "__main__":
+    result = run_warmup()
+    for name, seconds in result["timings"].items():
+        print(f"{name:<18} {seconds:6.2f}s")
+    print(result["state"], result["error"] or "")